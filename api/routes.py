@@ -1,9 +1,29 @@
-from fastapi import APIRouter, HTTPException, UploadFile, File
-from models.schemas import AnalyzeRequest, ChatRequest
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Query, Request
+from typing import List, Optional
+from fastapi.responses import StreamingResponse
+from models.schemas import (
+    AnalyzeRequest, ChatRequest, StudentMockTest, BatchAnalyzeRequest, PlanBatchRequest, ScoreSheetsRequest
+)
 from services.analyzer import analyze_topics
-from services.gemini_service import generate_plan, chat_with_ai
-from services.ocr_service import process_omr_image
-from services.study_agent import analyze_and_plan
+from services.gemini_service import (
+    generate_plan_stream, generate_plans_batch, plan_parse_stats, coalescing_stats,
+    chat_with_ai_async, chat_with_ai_stream
+)
+from services.ocr_pipeline import run_ocr, ocr_uploads_stream
+from services.ocr_service import OMR_MODES, score_answer_strings, score_sheets
+from services.answer_keys import answer_key_store
+from services import performance_history
+from services.topic_ranking import classroom_weak_topics
+from services.gemini_scheduler import scheduler
+from services.plan_cache import plan_cache
+from services.plan_engine import PLAN_ENGINES, plan_for
+from services.chat_cache import chat_cache
+from services.study_agent import StudyAgent, analyze_and_plan, questions_from_topics
+from services.batch_service import BatchJob
+from services.report_serializer import encode, report_response
+from config import settings
+from database import db_session
+import json
 import logging
 
 # Configure logging
@@ -38,6 +58,20 @@ FALLBACK_RESPONSES = {
     "default": "Great question! Here are some general tips:\n\n1. Focus on your weak topics first\n2. Practice regularly with mock tests\n3. Review mistakes and understand concepts\n4. Stay consistent with your study schedule\n\nKeep pushing forward - every step counts towards your goal! 💪"
 }
 
+# Common student questions answered straight from the chat cache
+CHAT_CACHE_SEEDS = {
+    "What is thermodynamics?": "thermodynamics",
+    "Why do I keep getting Thermodynamics wrong?": "thermodynamics",
+    "What is the Carnot cycle?": "carnot",
+    "Explain Carnot cycle simply": "carnot",
+    "Best trick for Organic Chemistry reactions?": "organic",
+    "How many hours should I study?": "hours",
+    "How many hours should I study today?": "hours",
+    "Give me practice tips": "practice",
+}
+
+chat_cache.seed({q: FALLBACK_RESPONSES[key] for q, key in CHAT_CACHE_SEEDS.items()})
+
 def get_fallback_response(message):
     """Get a smart fallback response based on keywords."""
     lower = message.lower()
@@ -55,7 +89,7 @@ def get_fallback_response(message):
     else:
         return FALLBACK_RESPONSES["default"]
 
-@router.post("/analyze")
+@router.post("/analyze", dependencies=[Depends(db_session)])
 def analyze(data: AnalyzeRequest):
     """
     Analyze topics endpoint
@@ -64,43 +98,151 @@ def analyze(data: AnalyzeRequest):
     
     try:
         analysis = analyze_topics(data.topics)
-        logger.info(f"Analysis result: {analysis}")
+        logger.info(f"Analysis complete: {len(analysis['weak_topics'])} weak, "
+                    f"{len(analysis['strong_topics'])} strong, score {analysis['overall_score']}")
+        if data.student_id and data.mock_test_id:
+            performance_history.record_attempt(
+                data.student_id, data.exam, data.topics, mock_test_id=data.mock_test_id
+            )
         return analysis
     except Exception as e:
         logger.error(f"Error in analyze endpoint: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
-@router.post("/plan")
-def plan(data: AnalyzeRequest):
+@router.post("/plan", dependencies=[Depends(db_session)])
+async def plan(data: AnalyzeRequest, engine: Optional[str] = None):
     """
     Generate study plan endpoint
+    engine: "gemini", "local" or "hybrid" (default PLAN_ENGINE); see
+    services/plan_engine.py. The response's source says which produced the plan.
     """
-    logger.info(f"Received plan request with {len(data.topics)} topics for exam: {data.exam}")
+    engine = engine or settings.PLAN_ENGINE
+    if engine not in PLAN_ENGINES:
+        raise HTTPException(status_code=422, detail=f"engine must be one of {', '.join(PLAN_ENGINES)}")
+    logger.info(f"Received plan request with {len(data.topics)} topics for exam: {data.exam} (engine: {engine})")
     
     try:
         analysis = analyze_topics(data.topics)
-        
-        try:
-            plan = generate_plan(analysis["weak_topics"], data.exam)
-            logger.info(f"Plan generated successfully from AI")
-            return {"plan": plan}
-        except Exception as e:
-            logger.warning(f"Gemini API failed, using fallback plan: {str(e)}")
-            return {"plan": FALLBACK_PLAN}
+        plan, source = await plan_for(analysis["weak_topics"], data.exam, engine)
+        logger.info(f"Plan generated from {source} engine")
+        return {"plan": plan, "source": source}
             
     except Exception as e:
         logger.error(f"Error in plan endpoint: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+async def _plan_events(weak_topics, exam):
+    """
+    Forward plan days as SSE events as soon as each one is validated.
+    If Gemini fails before the first day, the static fallback plan is
+    sent instead.
+    """
+    sent_any = False
+    try:
+        async for day in generate_plan_stream(weak_topics, exam):
+            sent_any = True
+            yield _sse_event({"day": day})
+    except Exception as e:
+        logger.error(f"Error in plan stream endpoint: {str(e)}")
+        if sent_any:
+            yield _sse_event({"error": "Plan interrupted"})
+        else:
+            for day in FALLBACK_PLAN:
+                yield _sse_event({"day": day, "fallback": True})
+    yield _sse_event({"done": True})
+
+@router.post("/plan/stream", dependencies=[Depends(db_session)])
+async def plan_stream(data: AnalyzeRequest):
+    """
+    Streaming plan endpoint (Server-Sent Events).
+    Each event is `data: {"day": {...}}`; the stream ends with `data: {"done": true}`.
+    """
+    logger.info(f"Received streaming plan request with {len(data.topics)} topics for exam: {data.exam}")
+    
+    try:
+        analysis = analyze_topics(data.topics)
+    except Exception as e:
+        logger.error(f"Error in plan stream endpoint: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+    
+    return StreamingResponse(
+        _plan_events(analysis["weak_topics"], data.exam),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.post("/plan/batch", dependencies=[Depends(db_session)])
+async def plan_batch(data: PlanBatchRequest):
+    """
+    Batched plan generation, e.g. nightly regeneration for many students.
+    Identical exam and weak-topic combinations are generated once and
+    several plans share each Gemini call. Students whose plan could not be
+    generated get the static fallback plan.
+    """
+    logger.info(f"Received batched plan request for {len(data.requests)} students")
+    
+    try:
+        jobs = [(analyze_topics(r.topics)["weak_topics"], r.exam) for r in data.requests]
+    except Exception as e:
+        logger.error(f"Error in plan batch endpoint: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+    
+    try:
+        plans, summary = await generate_plans_batch(jobs)
+    except Exception as e:
+        logger.warning(f"Gemini API failed, using fallback plans: {str(e)}")
+        plans, summary = [None] * len(jobs), {"jobs": len(jobs), "failed": len(jobs)}
+    
+    return {
+        "plans": [
+            {"student_id": r.student_id, "plan": plan} if plan is not None
+            else {"student_id": r.student_id, "plan": FALLBACK_PLAN, "fallback": True}
+            for r, plan in zip(data.requests, plans)
+        ],
+        "summary": summary
+    }
+
+@router.get("/plan/parse-stats")
+def plan_parse_statistics():
+    """
+    Gemini plan responses parsed vs rejected (invalid or truncated JSON)
+    in this process; each rejected response is a wasted paid call.
+    """
+    return plan_parse_stats()
+
+@router.get("/plan/cache-stats")
+def plan_cache_stats():
+    """
+    Plan cache hit/miss counters, and misses that joined an identical
+    in-flight Gemini call instead of making their own
+    """
+    return {**plan_cache.stats(), "coalescing": coalescing_stats()["plan"]}
+
+@router.get("/chat/cache-stats")
+def chat_cache_stats():
+    """
+    Chat answer cache hit rate (each hit is one Gemini call saved), and
+    questions that joined an identical in-flight Gemini call
+    """
+    return {**chat_cache.stats(), "coalescing": coalescing_stats()["chat"]}
+
+@router.get("/gemini/scheduler-stats")
+def gemini_scheduler_stats():
+    """
+    Gemini quota scheduler state: current request rate, queued calls by
+    priority, retries, remaining retry budget and circuit breaker state
+    """
+    return scheduler.stats()
+
 @router.post("/chat")
-def chat(data: ChatRequest):
+async def chat(data: ChatRequest):
     """
     Chat with AI endpoint
     """
     logger.info(f"Received chat request: {data.message}")
     
     try:
-        reply = chat_with_ai(data.message)
+        reply = await chat_with_ai_async(data.message)
         logger.info(f"Chat reply generated")
         return {"reply": reply}
     except Exception as e:
@@ -109,19 +251,66 @@ def chat(data: ChatRequest):
         fallback_reply = get_fallback_response(data.message)
         return {"reply": fallback_reply}
 
+def _sse_event(payload):
+    """Encode a payload as a single Server-Sent Events message."""
+    return f"data: {json.dumps(payload)}\n\n"
+
+async def _chat_events(message):
+    """
+    Forward Gemini tokens as SSE events.
+    If the model fails before producing anything, the keyword fallback
+    reply is sent as a single chunk instead.
+    """
+    sent_any = False
+    try:
+        async for delta in chat_with_ai_stream(message):
+            sent_any = True
+            yield _sse_event({"delta": delta})
+    except Exception as e:
+        logger.error(f"Error in chat stream endpoint: {str(e)}")
+        if sent_any:
+            yield _sse_event({"error": "Response interrupted"})
+        else:
+            yield _sse_event({"delta": get_fallback_response(message), "fallback": True})
+    yield _sse_event({"done": True})
+
+@router.post("/chat/stream")
+async def chat_stream(data: ChatRequest):
+    """
+    Streaming chat endpoint (Server-Sent Events).
+    Each event is `data: {"delta": "..."}`; the stream ends with `data: {"done": true}`.
+    """
+    logger.info(f"Received streaming chat request: {data.message}")
+    
+    return StreamingResponse(
+        _chat_events(data.message),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 @router.post("/ocr")
-async def ocr_upload(file: UploadFile = File(...), exam_type: str = "JEE Mains"):
+async def ocr_upload(
+    file: UploadFile = File(...),
+    exam_type: str = "JEE Mains",
+    mode: Optional[str] = None,
+    paper_code: Optional[str] = None,
+    set_code: Optional[str] = None
+):
     """
-    OCR endpoint to extract answers from OMR/answer sheet images
+    OCR endpoint to extract answers from OMR/answer sheet images.
+    mode: "auto" (bubble grid, OCR fallback), "bubble" or "text".
+    paper_code / set_code select the stored answer key to score against.
     """
     logger.info(f"Received OCR request for file: {file.filename}")
+    if mode and mode not in OMR_MODES:
+        raise HTTPException(status_code=422, detail=f"mode must be one of {', '.join(OMR_MODES)}")
     
     try:
         # Read the uploaded file
         image_data = await file.read()
         
-        # Process the image
-        result = process_omr_image(image_data, exam_type)
+        # Process the image on the OCR pool so the event loop stays free
+        result = await run_ocr(image_data, exam_type, mode, paper_code, set_code)
         logger.info(f"OCR processed successfully: {result.get('total_questions')} questions found")
         
         return result
@@ -130,7 +319,79 @@ async def ocr_upload(file: UploadFile = File(...), exam_type: str = "JEE Mains")
         logger.error(f"Error in OCR endpoint: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
-@router.post("/ai-agent/analyze")
+@router.post("/ocr/batch")
+async def ocr_batch_upload(
+    files: List[UploadFile] = File(...),
+    exam_type: str = "JEE Mains",
+    mode: Optional[str] = None,
+    paper_code: Optional[str] = None,
+    set_code: Optional[str] = None
+):
+    """
+    Multi-page OCR endpoint - accepts several images, multi-page PDFs or
+    zip archives of answer sheets. Pages are OCR'd in parallel and one
+    NDJSON line is streamed back per page as it finishes, followed by a
+    summary line.
+    """
+    logger.info(f"Received OCR batch request with {len(files)} files")
+    if mode and mode not in OMR_MODES:
+        raise HTTPException(status_code=422, detail=f"mode must be one of {', '.join(OMR_MODES)}")
+    
+    uploads = [(file.filename, await file.read()) for file in files]
+    
+    return StreamingResponse(
+        _ndjson_lines(ocr_uploads_stream(uploads, exam_type, mode, paper_code, set_code)),
+        media_type="application/x-ndjson"
+    )
+
+@router.post("/answer-keys/import", dependencies=[Depends(db_session)])
+async def import_answer_keys(file: UploadFile = File(...)):
+    """
+    Bulk import answer keys from a CSV (exam_type,paper_code,set_code,
+    question,answer) or JSON file. Imported keys replace stored keys with
+    the same exam/paper/set.
+    """
+    content = (await file.read()).decode("utf-8-sig")
+    is_json = (file.filename or "").lower().endswith(".json") or content.lstrip()[:1] in ("[", "{")
+    try:
+        if is_json:
+            result = answer_key_store.import_json(json.loads(content))
+        else:
+            result = answer_key_store.import_csv(content)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    logger.info(f"Answer key import from {file.filename}: {result}")
+    return result
+
+@router.get("/answer-keys/{exam_type}/{paper_code}/{set_code}", dependencies=[Depends(db_session)])
+def get_answer_key(exam_type: str, paper_code: str, set_code: str):
+    """Stored answer key and marking scheme for one paper set"""
+    key = answer_key_store.get(exam_type, paper_code, set_code)
+    if key is None:
+        raise HTTPException(status_code=404, detail="Answer key not found")
+    return {
+        "exam_type": key.exam_type,
+        "paper_code": key.paper_code,
+        "set_code": key.set_code,
+        "answers": key.answers,
+        "marking_scheme": vars(key.scheme)
+    }
+
+@router.post("/answer-keys/score", dependencies=[Depends(db_session)])
+def score_answer_sheets(data: ScoreSheetsRequest):
+    """Score many extracted answer sheets against one stored key"""
+    key = answer_key_store.get(data.exam_type, data.paper_code, data.set_code)
+    if key is None:
+        raise HTTPException(status_code=404, detail="Answer key not found")
+    if data.answers is not None:
+        try:
+            return {"results": score_answer_strings(data.answers, key.answers, key.scheme)}
+        except ValueError as e:
+            raise HTTPException(status_code=422, detail=str(e))
+    sheets = [{q: a.strip().upper() for q, a in sheet.items()} for sheet in data.sheets]
+    return {"results": score_sheets(sheets, key.answers, key.scheme)}
+
+@router.post("/ai-agent/analyze", dependencies=[Depends(db_session)])
 def ai_agent_analyze(data: AnalyzeRequest):
     """
     AI Agent endpoint - Full analysis with error patterns, weak topics,
@@ -140,35 +401,138 @@ def ai_agent_analyze(data: AnalyzeRequest):
     
     try:
         # Convert to agent format
-        questions_data = []
-        for topic in data.topics:
-            # Generate questions from topic data
-            if topic.attempted > 0:
-                is_correct = topic.correct > (topic.attempted / 2)
-                questions_data.append({
-                    "question_id": f"Q_{topic.name}",
-                    "topic": topic.name,
-                    "subtopic": "General",
-                    "subject": topic.subject,
-                    "correct_answer": "A",
-                    "student_answer": "B" if not is_correct else "A",
-                    "is_correct": is_correct,
-                    "time_spent_seconds": topic.attempted * 60,
-                    "difficulty": "medium"
-                })
+        questions_data = questions_from_topics(data.topics)
         
         agent_data = {
-            "student_id": "student_001",
+            "student_id": data.student_id or "student_001",
             "exam_type": data.exam,
             "questions": questions_data
         }
         
         # Generate full analysis report
-        result = analyze_and_plan(agent_data)
+        result = analyze_and_plan(agent_data, formatted=False)
         logger.info(f"AI Agent analysis complete")
+        if data.student_id and data.mock_test_id:
+            performance_history.record_attempt(
+                data.student_id, data.exam, data.topics, mock_test_id=data.mock_test_id
+            )
         
-        return result
+        return report_response(result)
         
     except Exception as e:
         logger.error(f"Error in AI Agent endpoint: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/history/{student_id}", dependencies=[Depends(db_session)])
+def student_history(
+    student_id: str,
+    exam: str = "JEE Mains",
+    start: Optional[float] = None,
+    end: Optional[float] = None,
+    topic: Optional[str] = None,
+    subject: Optional[str] = None
+):
+    """
+    Stored performance history for the progress dashboard: overall score
+    per attempt and accuracy per subject, optionally limited to a time
+    range (start/end in epoch seconds) and with one topic's trend (subject
+    picks between same-named topics of different subjects).
+    """
+    return performance_history.student_history(student_id, exam, start, end, topic, subject)
+
+@router.get("/classroom/weak-topics", dependencies=[Depends(db_session)])
+def classroom_weak_topic_ranking(
+    exam: str = "JEE Mains",
+    k: int = Query(20, ge=1, le=1000),
+    student_id: Optional[List[str]] = Query(None),
+    per_student: bool = False
+):
+    """
+    Top-k weakest topics across a classroom, from the students' stored
+    incremental analysis. Pass student_id repeatedly to limit the ranking
+    to a class; per_student=true ranks (student, topic) pairs instead of
+    pooling each topic over the students.
+    """
+    return {
+        "exam": exam,
+        "per_student": per_student,
+        "topics": classroom_weak_topics(exam, k, student_id, per_student)
+    }
+
+@router.post("/ai-agent/analyze/incremental", dependencies=[Depends(db_session)])
+def ai_agent_analyze_incremental(data: StudentMockTest):
+    """
+    AI Agent endpoint for weekly mocks - send only the new mock's results.
+    The report covers the student's whole history using stored per-topic
+    aggregates; resending the same mock_test_id does not count it twice.
+    """
+    logger.info(f"Received incremental AI Agent request for {data.student_id}")
+    
+    try:
+        payload = _student_payload(data)
+        agent = StudyAgent(exam_type=payload["exam_type"])
+        result = agent.generate_incremental_report(data.student_id, payload, data.student_name, formatted=False)
+        logger.info("Incremental AI Agent analysis complete")
+        
+        return report_response(result)
+        
+    except Exception as e:
+        logger.error(f"Error in incremental AI Agent endpoint: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+def _student_payload(student: StudentMockTest):
+    """Convert a batch entry into the StudyAgent input format."""
+    return {
+        "student_id": student.student_id,
+        "student_name": student.student_name,
+        "exam_type": student.exam_type,
+        "mock_test_id": student.mock_test_id,
+        "questions": student.questions or questions_from_topics(student.topics)
+    }
+
+async def _ndjson_lines(results):
+    """Encode each result as one NDJSON line."""
+    async for result in results:
+        yield encode(result) + b"\n"
+
+@router.post("/ai-agent/analyze/batch")
+async def ai_agent_analyze_batch(request: Request):
+    """
+    Batch AI Agent endpoint for whole-classroom mock test ingestion.
+    
+    Accepts either {"students": [...]} JSON or an NDJSON stream with one
+    student per line (Content-Type: application/x-ndjson). Students are
+    analyzed on a process pool and one NDJSON line is streamed back per
+    student as reports finish, followed by a throughput summary line.
+    """
+    job = BatchJob()
+    content_type = request.headers.get("content-type", "")
+    
+    try:
+        if "ndjson" in content_type:
+            # Start analysis while the upload is still arriving
+            buffer = b""
+            async for chunk in request.stream():
+                buffer += chunk
+                *lines, buffer = buffer.split(b"\n")
+                for line in lines:
+                    if line.strip():
+                        job.submit(_student_payload(StudentMockTest.model_validate_json(line)))
+            if buffer.strip():
+                job.submit(_student_payload(StudentMockTest.model_validate_json(buffer)))
+        else:
+            batch = BatchAnalyzeRequest.model_validate(await request.json())
+            for student in batch.students:
+                job.submit(_student_payload(student))
+    except ValueError as e:
+        # Chunks submitted before the bad line would otherwise keep the pool busy
+        job.cancel()
+        logger.error(f"Invalid batch payload: {str(e)}")
+        raise HTTPException(status_code=422, detail=str(e))
+    except BaseException:
+        job.cancel()
+        raise
+    
+    logger.info(f"Received AI Agent batch request with {job.submitted} students")
+    
+    return StreamingResponse(_ndjson_lines(job.results()), media_type="application/x-ndjson")
@@ -0,0 +1,75 @@
+"""
+Benchmark: answer-key lookups (LRU vs SQLite) and batch sheet scoring
+(calculate_score per sheet vs score_sheets on dicts vs score_answer_strings
+on pre-encoded strings).
+
+Uses a throwaway database file. Run from the project root:
+    python -m benchmarks.bench_answer_scoring
+"""
+
+import os
+import random
+import tempfile
+import time
+
+import numpy as np
+
+from config import settings
+
+settings.DB_NAME = os.path.join(tempfile.mkdtemp(), "bench.db")
+
+from services.answer_keys import AnswerKeyStore  # noqa: E402
+from services.ocr_service import (  # noqa: E402
+    calculate_score, score_answer_matrix, score_answer_strings, score_sheets
+)
+
+LOOKUPS = 2000
+SHEET_COUNTS = [1_000, 10_000, 50_000]
+QUESTIONS = [90, 200]
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - start, result
+
+
+if __name__ == "__main__":
+    rng = random.Random(0)
+    store = AnswerKeyStore(cache_size=256, ttl_seconds=60)
+    store.import_rows(
+        ("JEE Mains", f"P{paper}", s, q, rng.choice("ABCD"))
+        for paper in range(50) for s in "ABCD" for q in range(1, 91)
+    )
+
+    uncached = AnswerKeyStore(cache_size=256, ttl_seconds=0)
+    db_time, _ = timed(lambda: [uncached.get("JEE Mains", "P7", "B") for _ in range(LOOKUPS)])
+    lru_time, _ = timed(lambda: [store.get("JEE Mains", "P7", "B") for _ in range(LOOKUPS)])
+    print("=" * 64)
+    print(f"Key lookup (90 questions): SQLite {db_time / LOOKUPS * 1e6:8.1f} us, "
+          f"LRU {lru_time / LOOKUPS * 1e6:6.2f} us")
+    print("=" * 64)
+
+    print(f"{'sheets':>8} {'questions':>10} {'per-sheet ms':>13} {'dict batch ms':>14} "
+          f"{'strings ms':>11} {'matrix ms':>10}  identical")
+    for questions in QUESTIONS:
+        key = {q: rng.choice("ABCD") for q in range(1, questions + 1)}
+        for count in SHEET_COUNTS:
+            sheets = [
+                {q: rng.choice("ABCD") for q in key if rng.random() < 0.9}
+                for _ in range(count)
+            ]
+            scheme = store.marking_scheme("JEE Mains")
+            loop_time, expected = timed(lambda: [calculate_score(s, key, scheme) for s in sheets])
+            batch_time, result = timed(lambda: score_sheets(sheets, key, scheme))
+            rows = ["".join(s.get(q, "-") for q in key) for s in sheets]
+            strings_time, from_strings = timed(lambda: score_answer_strings(rows, key, scheme))
+
+            # Sheets already held as option indices (as the bubble reader produces)
+            key_codes = np.array(["ABCD".index(a) for a in key.values()])
+            marked = np.array([[("ABCD".index(s[q]) if q in s else -1) for q in key] for s in sheets])
+            matrix_time, scored = timed(lambda: score_answer_matrix(marked, key_codes, scheme))
+            identical = result == expected == from_strings and scored["marks"].tolist() == [r["marks"] for r in expected]
+            print(f"{count:>8,} {questions:>10} {loop_time * 1000:13.1f} {batch_time * 1000:14.1f} "
+                  f"{strings_time * 1000:11.1f} "
+                  f"{matrix_time * 1000:10.1f}  {identical}")
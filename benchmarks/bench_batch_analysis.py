@@ -0,0 +1,52 @@
+"""
+Benchmark: sequential analyze_and_plan loop vs the batch analysis pool.
+
+Run from the project root:
+    python -m benchmarks.bench_batch_analysis [students]
+"""
+
+import asyncio
+import os
+import sys
+import time
+
+from benchmarks.synthetic import make_students
+from services.batch_service import BatchJob
+from services.study_agent import analyze_and_plan
+
+
+def run_sequential(students):
+    start = time.perf_counter()
+    for student in students:
+        analyze_and_plan(student, student["student_name"])
+    return time.perf_counter() - start
+
+
+async def run_batch(students):
+    start = time.perf_counter()
+    job = BatchJob()
+    for student in students:
+        job.submit(student)
+    summary = None
+    async for result in job.results():
+        summary = result.get("summary", summary)
+    return time.perf_counter() - start, summary
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    students = make_students(count)
+
+    print("=" * 60)
+    print(f"Batch analysis: {count} students x 90 questions, {os.cpu_count()} CPUs")
+    print("=" * 60)
+
+    sequential = run_sequential(students)
+    print(f"Sequential loop : {sequential:8.2f}s  {count / sequential:10.1f} reports/s")
+
+    # First run warms up the worker processes
+    asyncio.run(run_batch(students[:100]))
+    batch, summary = asyncio.run(run_batch(students))
+    print(f"Process pool    : {batch:8.2f}s  {count / batch:10.1f} reports/s")
+    print(f"Speedup         : {sequential / batch:8.2f}x")
+    print(f"Summary         : {summary}")
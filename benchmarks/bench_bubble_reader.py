@@ -0,0 +1,101 @@
+"""
+Benchmark: bubble-grid OMR reader latency and accuracy.
+
+Synthetic 12 MP phone photos of a filled bubble sheet (title, printed
+question numbers, several blocks, slight rotation, uneven lighting and
+noise) are read with read_bubble_grid, as are the same sheets without
+rotation (aligned scans, where the deskew search stops early).
+
+Run from the project root:
+    python -m benchmarks.bench_bubble_reader
+"""
+
+import io
+import random
+import statistics
+import time
+
+import numpy as np
+from PIL import Image, ImageDraw
+
+from benchmarks.bench_ocr_preprocess import _font
+from services.ocr_service import BUBBLE_WORK_WIDTH, read_bubble_grid
+
+SHEETS = 10
+BLOCKS = 3
+ROWS = 30
+PHOTO_SIZE = (3024, 4032)
+
+
+def make_bubble_sheet(seed: int, rotate: bool = True):
+    """A photographed bubble sheet and its answer key (some left blank)."""
+    rng = random.Random(seed)
+    width, height = PHOTO_SIZE
+    sheet = Image.new("L", PHOTO_SIZE, 255)
+    draw = ImageDraw.Draw(sheet)
+    draw.text((300, 250), "JEE MAINS - OMR ANSWER SHEET", fill=20, font=_font(110))
+
+    answers = {}
+    label_font = _font(50)
+    radius, pitch, row_pitch = 32, 110, 105
+    for block in range(BLOCKS):
+        left = 420 + block * 850
+        for row in range(ROWS):
+            q_num = block * ROWS + row + 1
+            y = 650 + row * row_pitch
+            draw.text((left - 170, y - 30), str(q_num), fill=20, font=label_font)
+            choice = rng.randrange(5)
+            for option in range(4):
+                x = left + option * pitch
+                box = (x - radius, y - radius, x + radius, y + radius)
+                draw.ellipse(box, outline=20, width=5, fill=20 if option == choice else None)
+            if choice < 4:
+                answers[q_num] = "ABCD"[choice]
+
+    angle = rng.uniform(-2, 2)
+    if rotate:
+        sheet = sheet.rotate(angle, resample=Image.BILINEAR, fillcolor=255)
+    pixels = np.asarray(sheet, dtype=np.float32)
+    shade = np.linspace(1.0, 0.75, width, dtype=np.float32)[None, :]
+    noise = np.random.default_rng(seed).normal(0, 12, pixels.shape).astype(np.float32)
+    pixels = np.clip(pixels * shade + noise, 0, 255).astype(np.uint8)
+
+    buffer = io.BytesIO()
+    Image.fromarray(pixels).convert("RGB").save(buffer, format="JPEG", quality=90)
+    return buffer.getvalue(), answers
+
+
+def run(sheets):
+    times, decode_times, exact = [], [], 0
+    for data, answers in sheets:
+        start = time.perf_counter()
+        image = Image.open(io.BytesIO(data))
+        image.draft("L", (BUBBLE_WORK_WIDTH, BUBBLE_WORK_WIDTH))
+        image.convert("L")
+        decode_times.append((time.perf_counter() - start) * 1000)
+
+        start = time.perf_counter()
+        result = read_bubble_grid(data)
+        times.append((time.perf_counter() - start) * 1000)
+        found = result["answers"] if result else {}
+        exact += found == answers
+    return times, decode_times, exact
+
+
+if __name__ == "__main__":
+    read_bubble_grid(make_bubble_sheet(0)[0])  # warm up imports and allocations
+
+    print("=" * 60)
+    print(f"Bubble reader: {SHEETS} sheets, {BLOCKS * ROWS} questions each, "
+          f"{PHOTO_SIZE[0]}x{PHOTO_SIZE[1]} px JPEG")
+    print("=" * 60)
+    for label, rotate in (("rotated photos", True), ("aligned scans", False)):
+        sheets = [make_bubble_sheet(seed, rotate) for seed in range(SHEETS)]
+        times, decode_times, exact = run(sheets)
+        after_decode = [t - d for t, d in zip(times, decode_times)]
+        print(f"{label}:")
+        print(f"  latency  : median {statistics.median(times):.1f} ms, max {max(times):.1f} ms")
+        print(f"  of which JPEG decode: median {statistics.median(decode_times):.1f} ms "
+              f"({statistics.mean(len(d) for d, _ in sheets) / 1e6:.1f} MB files), "
+              f"the rest: median {statistics.median(after_decode):.1f} ms")
+        print(f"  sheets read exactly : {exact}/{SHEETS}")
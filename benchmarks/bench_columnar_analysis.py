@@ -0,0 +1,48 @@
+"""
+Benchmark: pure-Python StudyAgent.analyze_errors vs the columnar engine.
+
+Run from the project root:
+    python -m benchmarks.bench_columnar_analysis
+"""
+
+import logging
+import time
+
+from benchmarks.synthetic import make_questions
+from services.columnar_analysis import QuestionColumns, analyze_columns
+from services.study_agent import StudyAgent
+
+SIZES = [10_000, 100_000, 1_000_000]
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - start, result
+
+
+if __name__ == "__main__":
+    logging.disable(logging.INFO)
+
+    print("=" * 78)
+    print(f"{'questions':>10} {'python':>10} {'columnar':>10} {'speedup':>8} "
+          f"{'reductions':>11} {'speedup':>8}  identical")
+    print("=" * 78)
+
+    for size in SIZES:
+        data = {"exam_type": "JEE Mains", "questions": make_questions(size, seed=size)}
+
+        agent = StudyAgent("JEE Mains")
+        agent.load_data(data)
+        python_time, expected = timed(agent.analyze_errors)
+
+        agent.engine = "columnar"
+        columnar_time, result = timed(agent.analyze_errors)
+
+        # Reductions only, for callers that already hold columns
+        columns = QuestionColumns.from_questions(agent.questions)
+        reduce_time, _ = timed(lambda: analyze_columns(columns))
+
+        print(f"{size:>10,} {python_time:>9.3f}s {columnar_time:>9.3f}s "
+              f"{python_time / columnar_time:>7.1f}x {reduce_time:>10.4f}s "
+              f"{python_time / reduce_time:>7.1f}x  {result == expected}")
@@ -0,0 +1,158 @@
+"""
+Benchmark: concurrent SQLite reads/writes with the original get_db
+(a new rollback-journal connection per call) vs the pooled WAL layer.
+
+Each worker thread runs a mix of indexed reads and single-row upserts for
+a fixed time. Reports ops/s and how many operations failed with
+"database is locked". A final run drives the real incremental-analysis
+service (apply_mock / load_topic_analysis) through the pool.
+
+Uses throwaway database files. Run from the project root:
+    python -m benchmarks.bench_db_concurrency
+"""
+
+import os
+import random
+import sqlite3
+import tempfile
+import threading
+import time
+
+from config import settings
+
+settings.DB_NAME = os.path.join(tempfile.mkdtemp(), "bench.db")
+
+import database  # noqa: E402
+from services import analysis_state  # noqa: E402
+from services.study_agent import Question  # noqa: E402
+
+WORKERS = [8, 32, 64]
+WRITE_RATIO = 0.2
+DURATION = 3.0
+STUDENTS = 500
+TOPICS = ["Optics", "Kinematics", "Thermodynamics", "Organic Chemistry", "Calculus", "Algebra"]
+
+SCHEMA = """
+    CREATE TABLE IF NOT EXISTS scores (
+        student_id TEXT NOT NULL,
+        topic TEXT NOT NULL,
+        attempted INTEGER NOT NULL,
+        correct INTEGER NOT NULL,
+        PRIMARY KEY (student_id, topic)
+    )
+"""
+READ_SQL = "SELECT topic, attempted, correct FROM scores WHERE student_id = ?"
+WRITE_SQL = (
+    "INSERT INTO scores (student_id, topic, attempted, correct) VALUES (?, ?, 1, ?) "
+    "ON CONFLICT (student_id, topic) DO UPDATE SET "
+    "attempted = attempted + 1, correct = correct + excluded.correct"
+)
+
+
+def legacy_connection(path: str):
+    """The original database.get_db: a fresh default connection per call."""
+    conn = sqlite3.connect(path)
+    conn.row_factory = sqlite3.Row
+    return conn
+
+
+def legacy_op(path: str, rng: random.Random) -> None:
+    conn = legacy_connection(path)
+    try:
+        student = f"s{rng.randrange(STUDENTS)}"
+        if rng.random() < WRITE_RATIO:
+            with conn:
+                conn.execute(WRITE_SQL, (student, rng.choice(TOPICS), rng.randint(0, 1)))
+        else:
+            conn.execute(READ_SQL, (student,)).fetchall()
+    finally:
+        conn.close()
+
+
+def pooled_op(path: str, rng: random.Random) -> None:
+    with database.connection() as conn:
+        student = f"s{rng.randrange(STUDENTS)}"
+        if rng.random() < WRITE_RATIO:
+            with conn:
+                conn.execute(WRITE_SQL, (student, rng.choice(TOPICS), rng.randint(0, 1)))
+        else:
+            conn.execute(READ_SQL, (student,)).fetchall()
+
+
+def service_op(path: str, rng: random.Random) -> None:
+    student = f"s{rng.randrange(STUDENTS)}"
+    if rng.random() < WRITE_RATIO:
+        topic = rng.choice(TOPICS)
+        analysis_state.apply_mock(student, "JEE Mains", f"m{rng.random()}", [Question(
+            question_id="q1", topic=topic, subtopic=topic, subject="Physics",
+            correct_answer="A", student_answer=rng.choice("AB"),
+            is_correct=rng.random() < 0.5, time_spent_seconds=90
+        )])
+    else:
+        analysis_state.load_topic_analysis(student, "JEE Mains")
+
+
+def run(op, path: str, workers: int):
+    """Run op from `workers` threads for DURATION seconds."""
+    counts = [0] * workers
+    locked = [0] * workers
+    other = [0] * workers
+    deadline = time.perf_counter() + DURATION
+
+    def worker(i: int) -> None:
+        rng = random.Random(i)
+        while time.perf_counter() < deadline:
+            try:
+                op(path, rng)
+                counts[i] += 1
+            except sqlite3.OperationalError as e:
+                if "locked" in str(e):
+                    locked[i] += 1
+                else:
+                    other[i] += 1
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(workers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return sum(counts) / DURATION, sum(locked), sum(other)
+
+
+def fresh_db(name: str, wal: bool) -> str:
+    path = os.path.join(os.path.dirname(settings.DB_NAME), name)
+    conn = sqlite3.connect(path)
+    if wal:
+        conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute(SCHEMA)
+    conn.executemany(
+        "INSERT INTO scores VALUES (?, ?, 1, 1)",
+        [(f"s{s}", t) for s in range(STUDENTS) for t in TOPICS]
+    )
+    conn.commit()
+    conn.close()
+    return path
+
+
+if __name__ == "__main__":
+    print(f"{DURATION:.0f}s per run, {WRITE_RATIO:.0%} writes, {os.cpu_count()} CPU(s)")
+    print("=" * 72)
+    print(f"{'workers':>8} {'legacy ops/s':>13} {'locked':>7} {'pooled WAL ops/s':>17} "
+          f"{'locked':>7} {'speedup':>8}")
+    print("=" * 72)
+    for workers in WORKERS:
+        legacy_path = fresh_db(f"legacy_{workers}.db", wal=False)
+        legacy_rate, legacy_locked, legacy_other = run(legacy_op, legacy_path, workers)
+
+        settings.DB_NAME = fresh_db(f"pooled_{workers}.db", wal=True)
+        pooled_rate, pooled_locked, pooled_other = run(pooled_op, settings.DB_NAME, workers)
+        print(f"{workers:>8} {legacy_rate:13,.0f} {legacy_locked:7} {pooled_rate:17,.0f} "
+              f"{pooled_locked:7} {pooled_rate / legacy_rate:7.2f}x")
+        if legacy_other or pooled_other:
+            print(f"         other errors: legacy {legacy_other}, pooled {pooled_other}")
+
+    settings.DB_NAME = os.path.join(os.path.dirname(settings.DB_NAME), "service.db")
+    rate, locked, other = run(service_op, settings.DB_NAME, 32)
+    print(f"\nanalysis_state via pool, 32 workers: {rate:,.0f} ops/s, "
+          f"{locked} locked, {other} other errors, "
+          f"{database.get_pool()._idle.qsize()} idle connections")
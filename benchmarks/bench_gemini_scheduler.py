@@ -0,0 +1,123 @@
+"""
+Benchmark: the Gemini quota scheduler against the local fake Gemini
+server (benchmarks/fake_gemini_server.py), with the scheduler effectively
+off (no rate limit, retries or breaker) and on (sized to the quota).
+
+- Burst: chat questions and batch plan requests arriving at 5x the quota.
+  Reports calls served vs falling back, 429s and latency per priority.
+- Outage: Gemini stops answering; reports how long each request takes to
+  reach its fallback.
+
+The fake server runs in a background thread. Run from the project root:
+    python -m benchmarks.bench_gemini_scheduler
+"""
+
+import asyncio
+import logging
+import statistics
+import threading
+import time
+
+import uvicorn
+
+from config import settings
+
+PORT = 8766
+QUOTA_RPM = 600
+QUOTA_BURST = 20
+LATENCY = 0.2
+
+settings.GEMINI_API_KEY = settings.GEMINI_API_KEY or "fake"
+settings.GEMINI_BASE_URL = f"http://127.0.0.1:{PORT}"
+
+from benchmarks.fake_gemini_server import FakeGemini, create_app  # noqa: E402
+from services import gemini_scheduler, gemini_service  # noqa: E402
+from services.gemini_scheduler import PRIORITY_BATCH, PRIORITY_CHAT  # noqa: E402
+
+CHATS = 25
+PLANS = 200
+BURST_SECONDS = 5.0
+OUTAGE_REQUESTS = 60
+OUTAGE_TIMEOUT = 1.0
+
+OFF = dict(GEMINI_REQUESTS_PER_MINUTE=1e9, GEMINI_BURST=10**6, GEMINI_MAX_RETRIES=0, GEMINI_BREAKER_FAILURES=10**6)
+ON = dict(GEMINI_REQUESTS_PER_MINUTE=QUOTA_RPM, GEMINI_BURST=QUOTA_BURST, GEMINI_MAX_RETRIES=3, GEMINI_BREAKER_FAILURES=5)
+
+
+def start_server(fake):
+    server = uvicorn.Server(uvicorn.Config(create_app(fake), host="127.0.0.1", port=PORT, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    return server
+
+
+def use_scheduler(options):
+    for name, value in options.items():
+        setattr(settings, name, value)
+    gemini_service.scheduler = gemini_scheduler.GeminiScheduler()
+    gemini_service._gemini_semaphore = None
+
+
+async def timed_call(offset, priority, n):
+    """(priority, served, seconds from arrival to answer or fallback)"""
+    await asyncio.sleep(offset)
+    start = time.perf_counter()
+    label = "chat" if priority == PRIORITY_CHAT else "plan"
+    try:
+        await gemini_service._generate_content_async(f"{label} request {n}", label, priority=priority)
+        served = True
+    except Exception:
+        served = False
+    return priority, served, time.perf_counter() - start
+
+
+async def burst():
+    calls = [(n * BURST_SECONDS / CHATS, PRIORITY_CHAT, n) for n in range(CHATS)]
+    calls += [(n * BURST_SECONDS / PLANS, PRIORITY_BATCH, n) for n in range(PLANS)]
+    return await asyncio.gather(*(timed_call(*call) for call in calls))
+
+
+async def outage():
+    return await asyncio.gather(*(timed_call(n * 0.05, PRIORITY_CHAT, n) for n in range(OUTAGE_REQUESTS)))
+
+
+def summarize(results, priority):
+    rows = [r for r in results if r[0] == priority]
+    served = [seconds for _, ok, seconds in rows if ok]
+    p50 = f"{statistics.median(served):.2f}s" if served else "-"
+    return f"{len(served):>4}/{len(rows):<4} {p50:>8}"
+
+
+async def main(fake):
+    # One event loop throughout: the SDK's pooled connections belong to it
+    print("=" * 72)
+    print(f"Burst: {CHATS} chats + {PLANS} batch plans over {BURST_SECONDS:.0f}s, "
+          f"quota {QUOTA_RPM} rpm (burst {QUOTA_BURST})")
+    print("=" * 72)
+    print(f"{'scheduler':<10} {'chat served':>11} {'chat p50':>8} {'plans served':>13} {'plan p50':>8} "
+          f"{'429s':>6} {'retries':>8}")
+    for name, options in (("off", OFF), ("on", ON)):
+        fake.reset(rpm=QUOTA_RPM, burst=QUOTA_BURST, latency=LATENCY)
+        use_scheduler(options)
+        results = await burst()
+        print(f"{name:<10} {summarize(results, PRIORITY_CHAT)}  {summarize(results, PRIORITY_BATCH)}   "
+              f"{fake.throttled:>6} {gemini_service.scheduler.retries:>8}")
+
+    settings.GEMINI_TIMEOUT_SECONDS = OUTAGE_TIMEOUT
+    print(f"\nOutage: Gemini hangs, {OUTAGE_REQUESTS} chat requests over 3s, "
+          f"{OUTAGE_TIMEOUT:.0f}s call timeout")
+    print(f"{'scheduler':<10} {'p50 to fallback':>16} {'p95 to fallback':>16} {'Gemini requests':>16}")
+    for name, options in (("off", OFF), ("on", ON)):
+        fake.reset(rpm=QUOTA_RPM, burst=QUOTA_BURST, hang=True)
+        use_scheduler(options)
+        seconds = sorted(s for _, _, s in await outage())
+        print(f"{name:<10} {statistics.median(seconds):>15.2f}s {seconds[int(len(seconds) * 0.95)]:>15.2f}s "
+              f"{fake.requests:>16}")
+
+
+if __name__ == "__main__":
+    logging.disable(logging.WARNING)
+    fake = FakeGemini(QUOTA_RPM, QUOTA_BURST, LATENCY)
+    start_server(fake)
+    asyncio.run(main(fake))
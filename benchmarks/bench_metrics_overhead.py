@@ -0,0 +1,92 @@
+"""
+Benchmark: cost of the latency instrumentation - one histogram
+observation, one stage timer decorator, a full StudyAgent report with its six
+stage timers, and a trivial ASGI request with and without
+MetricsMiddleware.
+
+Run from the project root:
+    python -m benchmarks.bench_metrics_overhead
+"""
+
+import asyncio
+import logging
+import time
+
+from fastapi import FastAPI
+
+from benchmarks.synthetic import make_students
+from services import metrics
+from services.study_agent import StudyAgent
+
+CALLS = 200_000
+REPORTS = 2_000
+REQUESTS = 20_000
+
+
+def per_call(fn, calls):
+    start = time.perf_counter()
+    for _ in range(calls):
+        fn()
+    return (time.perf_counter() - start) / calls
+
+
+def asgi_app(instrumented):
+    app = FastAPI()
+
+    @app.get("/ping")
+    def ping():
+        return {"ok": True}
+
+    if instrumented:
+        app.add_middleware(metrics.MetricsMiddleware)
+    return app
+
+
+async def drive(app, requests):
+    scope = {"type": "http", "method": "GET", "path": "/ping", "raw_path": b"/ping", "root_path": "",
+             "query_string": b"", "headers": [], "scheme": "http", "server": ("bench", 80), "client": ("bench", 1)}
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        pass
+
+    start = time.perf_counter()
+    for _ in range(requests):
+        await app(dict(scope), receive, send)
+    return (time.perf_counter() - start) / requests
+
+
+if __name__ == "__main__":
+    logging.disable(logging.INFO)
+    histogram = metrics.Histogram("bench_seconds", "benchmark", ("stage",), metrics.STAGE_BUCKETS)
+
+    observe = per_call(lambda: histogram.observe(0.0003, stage="bench"), CALLS)
+
+    @histogram.timed(stage="bench")
+    def timed():
+        pass
+    timer = per_call(timed, CALLS)
+
+    agent = StudyAgent("JEE Mains")
+    students = make_students(REPORTS)
+    start = time.perf_counter()
+    for student in students:
+        agent.generate_report(student, student["student_name"])
+    report = (time.perf_counter() - start) / REPORTS
+
+    # Interleaved runs, best of each (single requests are noisy)
+    apps = (asgi_app(False), asgi_app(True))
+    runs = [[asyncio.run(drive(app, REQUESTS // 5)) for app in apps] for _ in range(5)]
+    plain, instrumented = (min(run[i] for run in runs) for i in range(2))
+
+    print("=" * 60)
+    print(f"{'histogram observe':<36} {observe * 1e6:10.2f} us")
+    print(f"{'stage timer (decorator)':<36} {timer * 1e6:10.2f} us")
+    print(f"{'StudyAgent report (90 questions)':<36} {report * 1e6:10.1f} us  "
+          f"(6 timers = {6 * timer / report * 100:.2f}%)")
+    print(f"{'ASGI request, no middleware':<36} {plain * 1e6:10.1f} us")
+    print(f"{'ASGI request, MetricsMiddleware':<36} {instrumented * 1e6:10.1f} us  "
+          f"(+{(instrumented - plain) * 1e6:.1f} us)")
+    print("=" * 60)
@@ -0,0 +1,97 @@
+"""
+Benchmark: OCR latency and answer-extraction accuracy with and without
+the preprocessing pipeline.
+
+Synthetic answer sheets are drawn at phone-photo resolution (about 12 MP),
+slightly rotated, shaded and noised. Preprocessing step timings are always
+reported; tesseract latency and accuracy need the tesseract binary.
+
+Run from the project root:
+    python -m benchmarks.bench_ocr_preprocess
+"""
+
+import io
+import random
+import shutil
+import time
+
+import numpy as np
+from PIL import Image, ImageDraw, ImageFont
+
+from services.ocr_preprocess import PreprocessConfig, preprocess_image
+from services.ocr_service import extract_text_timed, parse_omr_answers
+
+SHEETS = 3
+QUESTIONS = 25
+PHOTO_SIZE = (3024, 4032)
+
+
+def _font(size: int):
+    try:
+        return ImageFont.truetype("DejaVuSans.ttf", size)
+    except OSError:
+        return ImageFont.load_default(size=size)
+
+
+def make_sheet(seed: int):
+    """A skewed, shaded photo of a 'Q1 A' style sheet and its answer key."""
+    rng = random.Random(seed)
+    answers = {q: rng.choice("ABCD") for q in range(1, QUESTIONS + 1)}
+
+    width, height = PHOTO_SIZE
+    sheet = Image.new("L", PHOTO_SIZE, 255)
+    draw = ImageDraw.Draw(sheet)
+    font = _font(90)
+    for q, answer in answers.items():
+        column, row = divmod(q - 1, 13)
+        draw.text((400 + column * 1200, 600 + row * 230), f"Q{q} {answer}", fill=20, font=font)
+
+    sheet = sheet.rotate(rng.uniform(-3, 3), resample=Image.BILINEAR, expand=False, fillcolor=255)
+
+    # Uneven lighting plus sensor noise, as in a phone photo
+    pixels = np.asarray(sheet, dtype=np.float32)
+    shade = np.linspace(1.0, 0.75, width, dtype=np.float32)[None, :]
+    noise = np.random.default_rng(seed).normal(0, 12, pixels.shape).astype(np.float32)
+    pixels = np.clip(pixels * shade + noise, 0, 255).astype(np.uint8)
+
+    buffer = io.BytesIO()
+    Image.fromarray(pixels).convert("RGB").save(buffer, format="JPEG", quality=90)
+    return buffer.getvalue(), answers
+
+
+def accuracy(text: str, answers) -> float:
+    found = parse_omr_answers(text)["answers"]
+    return sum(found.get(q) == a for q, a in answers.items()) / len(answers) * 100
+
+
+if __name__ == "__main__":
+    sheets = [make_sheet(seed) for seed in range(SHEETS)]
+    config = PreprocessConfig()
+
+    print("=" * 64)
+    print(f"Preprocessing {SHEETS} sheets of {PHOTO_SIZE[0]}x{PHOTO_SIZE[1]} px")
+    print("=" * 64)
+    totals = {}
+    for data, _ in sheets:
+        result = preprocess_image(Image.open(io.BytesIO(data)), config)
+        for step, ms in result.timings.items():
+            totals[step] = totals.get(step, 0.0) + ms
+    for step, ms in totals.items():
+        print(f"{step:>10}: {ms / SHEETS:8.1f} ms/sheet")
+    print(f"{'total':>10}: {sum(totals.values()) / SHEETS:8.1f} ms/sheet "
+          f"-> {result.image.width}x{result.image.height} px, skew {result.skew_degrees:+.1f} deg")
+
+    if shutil.which("tesseract") is None:
+        print("\ntesseract not found; skipping OCR latency and accuracy comparison")
+        raise SystemExit(0)
+
+    print()
+    print(f"{'pipeline':>12} {'ocr ms/sheet':>14} {'accuracy %':>12}")
+    for label, preprocess in (("raw", None), ("preprocessed", config)):
+        elapsed, correct = 0.0, 0.0
+        for data, answers in sheets:
+            start = time.perf_counter()
+            text, _ = extract_text_timed(data, preprocess)
+            elapsed += time.perf_counter() - start
+            correct += accuracy(text, answers)
+        print(f"{label:>12} {elapsed / SHEETS * 1000:14.1f} {correct / SHEETS:12.1f}")
@@ -0,0 +1,98 @@
+"""
+Benchmark: single-pass OMR text parser vs the original three regex sweeps.
+
+Builds large multi-page OCR dumps mixing every answer format with noise
+lines, checks both parsers agree on the original formats, and times them.
+
+Run from the project root:
+    python -m benchmarks.bench_omr_parser
+"""
+
+import random
+import re
+import time
+
+from services.omr_parser import parse_omr_answers
+
+LINE_COUNTS = [10_000, 100_000, 500_000]
+NOISE = [
+    "ROLL NO 2024 0187 SET B", "Page 3 of 12", "Mark only one bubble per question",
+    "JEE MAINS 2024 PAPER 1", "", "   ", "Signature of candidate ____",
+    "Use black ball point pen only", "Q. No. Response",
+]
+
+
+def legacy_parse_omr_answers(text: str) -> dict:
+    """The original implementation, kept for comparison."""
+    results = {"answers": {}, "total_questions": 0, "extracted_raw": text}
+    for q_num, answer in re.findall(r'[Qq](\d+)\s*([A-Da-d])', text):
+        results["answers"][int(q_num)] = answer.upper()
+    for line in text.split('\n'):
+        match = re.search(r'^(\d+)\.\s*([A-Da-d])', line.strip())
+        if match:
+            q_num, answer = match.groups()
+            results["answers"][int(q_num)] = answer.upper()
+    for q_num, answer in re.findall(r'[Qq]uestion\s*(\d+)[:\s]+([A-Da-d])', text):
+        results["answers"][int(q_num)] = answer.upper()
+    results["total_questions"] = len(results["answers"])
+    return results
+
+
+def make_dump(lines: int, seed: int, variants: bool = False, noise: float = 0.3) -> str:
+    """An OCR dump of many pages in mixed answer formats."""
+    rng = random.Random(seed)
+    formats = [
+        "Q{n} {a}", "Q{n}{a}", "q{n}  {a}", "{n}. {a}", "  {n}.{a}",
+        "Question {n}: {a}", "question {n} {a}", "Q{n} {a}   Q{m} {b}",
+    ]
+    if variants:
+        formats += ["{n}) {a}", "Q.{n} {a}", "{n}-{a}", "Q. {n} {a}"]
+    out = []
+    for _ in range(lines):
+        if rng.random() < noise:
+            out.append(rng.choice(NOISE))
+            continue
+        out.append(rng.choice(formats).format(
+            n=rng.randint(1, 200), m=rng.randint(1, 200),
+            a=rng.choice("ABCDabcd"), b=rng.choice("ABCD")
+        ))
+    return "\n".join(out)
+
+
+def timed(fn, text, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn(text)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+if __name__ == "__main__":
+    print("=" * 72)
+    print(f"{'lines':>8} {'legacy ms':>11} {'single-pass ms':>15} {'speedup':>8}  identical")
+    print("=" * 72)
+    for lines in LINE_COUNTS:
+        text = make_dump(lines, seed=lines)
+        legacy_time, expected = timed(legacy_parse_omr_answers, text)
+        new_time, result = timed(parse_omr_answers, text)
+        identical = list(result["answers"].items()) == list(expected["answers"].items())
+        print(f"{lines:>8,} {legacy_time * 1000:11.1f} {new_time * 1000:15.1f} "
+              f"{legacy_time / new_time:7.2f}x  {identical}")
+
+    text = make_dump(100_000, seed=3, noise=0.9)
+    legacy_time, expected = timed(legacy_parse_omr_answers, text)
+    new_time, result = timed(parse_omr_answers, text)
+    print(f"\nSparse dump (100,000 lines, 10% answers): legacy {legacy_time * 1000:.1f} ms, "
+          f"single-pass {new_time * 1000:.1f} ms ({legacy_time / new_time:.2f}x), "
+          f"identical {result['answers'] == expected['answers']}")
+
+    text = make_dump(100_000, seed=7, variants=True)
+    legacy_time, _ = timed(legacy_parse_omr_answers, text)
+    new_time, result = timed(parse_omr_answers, text)
+    sources = {}
+    for source in result["sources"].values():
+        sources[source] = sources.get(source, 0) + 1
+    print(f"With variants (100,000 lines): legacy {legacy_time * 1000:.1f} ms (misses variants), "
+          f"single-pass {new_time * 1000:.1f} ms, "
+          f"{result['total_questions']} questions, final sources {sources}")
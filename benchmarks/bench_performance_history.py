@@ -0,0 +1,90 @@
+"""
+Benchmark: performance history at scale - a year of weekly mocks for 50k
+students, inserted week by week with bulk_insert, then trend queries for
+random students.
+
+Uses a throwaway database file (about 1.7 GB; the insert takes several
+minutes). Run from the project root:
+    python -m benchmarks.bench_performance_history
+"""
+
+import os
+import random
+import statistics
+import tempfile
+import time
+
+from config import settings
+
+settings.DB_NAME = os.path.join(tempfile.mkdtemp(), "bench.db")
+
+from database import connection  # noqa: E402
+from services import performance_history  # noqa: E402
+from services.study_agent import EXAM_WEIGHTAGE  # noqa: E402
+
+STUDENTS = 50_000
+WEEKS = 52
+TOPICS_PER_MOCK = 8
+QUERIES = 1000
+WEEK = 7 * 24 * 3600
+START = 1_700_000_000.0
+
+
+def week_rows(week: int, topics, rng: random.Random):
+    taken_at = START + week * WEEK
+    for s in range(STUDENTS):
+        for subject, topic in topics:
+            attempted = rng.randint(3, 12)
+            yield (f"student_{s:05d}", "JEE Mains", topic, taken_at, subject,
+                   attempted, rng.randint(0, attempted), f"weekly_{week + 1}")
+
+
+def latency(fn, students):
+    times = []
+    for student in students:
+        start = time.perf_counter()
+        fn(student)
+        times.append((time.perf_counter() - start) * 1000)
+    times.sort()
+    return statistics.median(times), times[int(len(times) * 0.99)]
+
+
+if __name__ == "__main__":
+    rng = random.Random(0)
+    all_topics = [(subject, topic) for subject, table in EXAM_WEIGHTAGE["JEE Mains"].items() for topic in table]
+    topics = rng.sample(all_topics, TOPICS_PER_MOCK)
+
+    print(f"Inserting {STUDENTS:,} students x {WEEKS} weeks x {TOPICS_PER_MOCK} topics "
+          f"({STUDENTS * WEEKS * TOPICS_PER_MOCK:,} rows), one bulk_insert per week")
+    start = time.perf_counter()
+    for week in range(WEEKS):
+        performance_history.bulk_insert(week_rows(week, topics, rng))
+    insert_time = time.perf_counter() - start
+    rows = STUDENTS * WEEKS * TOPICS_PER_MOCK
+    print(f"Insert: {insert_time:.1f} s ({rows / insert_time:,.0f} rows/s), "
+          f"database {os.path.getsize(settings.DB_NAME) / 1e9:.2f} GB")
+
+    with connection() as conn:
+        plan = conn.execute(
+            "EXPLAIN QUERY PLAN SELECT taken_at, SUM(attempted), SUM(correct) FROM performance_history "
+            "WHERE student_id = ? AND exam = ? AND taken_at BETWEEN ? AND ? GROUP BY taken_at",
+            ("student_00001", "JEE Mains", 0, 1e12)
+        ).fetchall()
+    print("Trend query plan: " + "; ".join(row[3] for row in plan))
+
+    students = [f"student_{rng.randrange(STUDENTS):05d}" for _ in range(QUERIES)]
+    last_quarter = START + (WEEKS - 13) * WEEK
+    topic = topics[0][1]
+    cases = [
+        ("score trend, full year", lambda s: performance_history.score_trend(s, "JEE Mains")),
+        ("score trend, last 13 weeks", lambda s: performance_history.score_trend(s, "JEE Mains", start=last_quarter)),
+        ("subject breakdown, full year", lambda s: performance_history.subject_scores(s, "JEE Mains")),
+        (f"topic trend ({topic})", lambda s: performance_history.topic_trend(s, "JEE Mains", topic)),
+        ("student_history (dashboard)", lambda s: performance_history.student_history(s, "JEE Mains")),
+    ]
+    print("=" * 64)
+    print(f"{'query (' + str(QUERIES) + ' random students)':<36} {'p50 ms':>8} {'p99 ms':>8}")
+    print("=" * 64)
+    for name, fn in cases:
+        p50, p99 = latency(fn, students)
+        print(f"{name:<36} {p50:8.2f} {p99:8.2f}")
@@ -0,0 +1,88 @@
+"""
+Benchmark: nightly plan regeneration for a student base, one Gemini call
+per student vs batched generation (deduplicated jobs, PLAN_BATCH_SIZE
+plans per call, per-item fallback for invalid entries).
+
+Runs against the local fake Gemini server, which charges its latency per
+plan generated, so batching only saves round trips and repeated prompt
+instructions, not generation time. Uses a throwaway database file. Run
+from the project root:
+    python -m benchmarks.bench_plan_batch
+"""
+
+import asyncio
+import logging
+import os
+import random
+import tempfile
+import time
+
+from config import settings
+
+settings.DB_NAME = os.path.join(tempfile.mkdtemp(), "bench.db")
+settings.GEMINI_REQUESTS_PER_MINUTE = 60_000
+settings.GEMINI_BURST = 1000
+
+from benchmarks.bench_gemini_scheduler import start_server  # noqa: E402
+from benchmarks.fake_gemini_server import FakeGemini  # noqa: E402
+from services import gemini_service  # noqa: E402
+from services.plan_cache import plan_cache, make_plan_key  # noqa: E402
+
+STUDENTS = 400
+COMBINATIONS = 100
+LATENCY = 0.05
+INVALID_RATE = 0.05
+EXAMS = ["JEE Mains", "NEET"]
+TOPICS = ["Thermodynamics", "Organic Chemistry", "Integration", "Optics", "Electrostatics",
+          "Probability", "Genetics", "Chemical Bonding", "Kinematics", "Matrices"]
+
+
+def student_jobs(rng):
+    combos = set()
+    while len(combos) < COMBINATIONS:
+        combos.add((rng.choice(EXAMS), tuple(sorted(rng.sample(TOPICS, 3)))))
+    combos = sorted(combos)
+    return [([{"name": name} for name in topics], exam) for exam, topics in (rng.choice(combos) for _ in range(STUDENTS))]
+
+
+async def per_student(jobs):
+    """One plan call per student, as a plain regeneration loop would make."""
+    async def one(weak_topics, exam):
+        key = make_plan_key(exam, weak_topics, gemini_service.GEMINI_MODEL)
+        try:
+            return await gemini_service._generate_plan_item(key, weak_topics, exam)
+        except Exception:
+            return None
+    return await asyncio.gather(*(one(*job) for job in jobs)), None
+
+
+async def run(fake, generate, jobs, invalid_rate):
+    fake.reset(rpm=60_000, burst=1000, latency=LATENCY, invalid_rate=invalid_rate)
+    plan_cache.clear()
+    start = time.perf_counter()
+    plans, summary = await generate(jobs)
+    elapsed = time.perf_counter() - start
+    return sum(plan is not None for plan in plans), fake.requests, fake.prompt_chars, elapsed, summary
+
+
+async def main(fake):
+    jobs = student_jobs(random.Random(11))
+    print("=" * 74)
+    print(f"{STUDENTS} students, {COMBINATIONS} distinct exam/weak-topic combinations, "
+          f"{settings.PLAN_BATCH_SIZE} plans per batched call")
+    print("=" * 74)
+    print(f"{'mode':<26} {'plans':>6} {'requests':>9} {'prompt chars':>13} {'wall':>8}")
+    for invalid_rate in (0.0, INVALID_RATE):
+        for name, generate in (("per student", per_student), ("batched", gemini_service.generate_plans_batch)):
+            plans, requests, chars, elapsed, summary = await run(fake, generate, jobs, invalid_rate)
+            label = f"{name}, {invalid_rate:.0%} invalid"
+            print(f"{label:<26} {plans:>6} {requests:>9} {chars:>13,} {elapsed:>7.2f}s")
+            if summary:
+                print(f"    {summary}")
+
+
+if __name__ == "__main__":
+    logging.disable(logging.WARNING)
+    fake = FakeGemini()
+    start_server(fake)
+    asyncio.run(main(fake))
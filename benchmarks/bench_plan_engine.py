@@ -0,0 +1,101 @@
+"""
+Benchmark: /api/plan latency per plan engine (gemini, local, hybrid)
+against the local fake Gemini server, with Gemini healthy and down.
+
+Students arrive over a few seconds with a limited set of exam/weak-topic
+combinations, so hybrid requests hit the Gemini plan cached by earlier
+background refinements. Reports p50/p95 latency and where the plans came
+from. Uses a throwaway database file. Run from the project root:
+    python -m benchmarks.bench_plan_engine
+"""
+
+import asyncio
+import logging
+import os
+import random
+import statistics
+import tempfile
+import time
+
+from config import settings
+
+settings.DB_NAME = os.path.join(tempfile.mkdtemp(), "bench.db")
+settings.GEMINI_REQUESTS_PER_MINUTE = 60_000
+settings.GEMINI_BURST = 1000
+
+from benchmarks.bench_gemini_scheduler import start_server, use_scheduler  # noqa: E402
+from benchmarks.fake_gemini_server import FakeGemini  # noqa: E402
+from models.schemas import Topic  # noqa: E402
+from services.analyzer import analyze_topics  # noqa: E402
+from services.plan_cache import plan_cache  # noqa: E402
+from services.plan_engine import PLAN_ENGINES, plan_for  # noqa: E402
+
+REQUESTS = 150
+COMBINATIONS = 100
+ARRIVAL_SECONDS = 6.0
+LATENCY = 0.8
+EXAMS = ["JEE Mains", "NEET"]
+TOPICS = [("Thermodynamics", "Physics"), ("Optics", "Physics"), ("Kinematics", "Physics"),
+          ("Organic Chemistry", "Chemistry"), ("Chemical Bonding", "Chemistry"),
+          ("Integration", "Mathematics"), ("Probability", "Mathematics"), ("Genetics", "Biology")]
+
+
+def student_requests(rng):
+    combos = set()
+    while len(combos) < COMBINATIONS:
+        combos.add((rng.choice(EXAMS), tuple(sorted(rng.sample(range(len(TOPICS)), 3)))))
+    combos = sorted(combos)
+    requests = []
+    for _ in range(REQUESTS):
+        exam, weak = rng.choice(combos)
+        topics = [
+            Topic(name=name, subject=subject, attempted=10, correct=2 if i in weak else 9)
+            for i, (name, subject) in enumerate(TOPICS)
+        ]
+        requests.append((topics, exam))
+    return requests
+
+
+async def timed_plan(offset, topics, exam, engine):
+    await asyncio.sleep(offset)
+    start = time.perf_counter()
+    analysis = analyze_topics(topics)
+    _, source = await plan_for(analysis["weak_topics"], exam, engine)
+    return source, time.perf_counter() - start
+
+
+async def run(requests, engine):
+    plan_cache.clear()
+    results = await asyncio.gather(*(
+        timed_plan(n * ARRIVAL_SECONDS / REQUESTS, topics, exam, engine)
+        for n, (topics, exam) in enumerate(requests)
+    ))
+    # Let background refinements finish so they do not spill into the next run
+    while any(not task.done() for task in asyncio.all_tasks() if task is not asyncio.current_task()):
+        await asyncio.sleep(0.05)
+    seconds = sorted(s for _, s in results)
+    gemini = sum(source == "gemini" for source, _ in results)
+    return statistics.median(seconds), seconds[int(len(seconds) * 0.95)], gemini, len(results) - gemini
+
+
+async def main(fake):
+    requests = student_requests(random.Random(5))
+    for scenario, options in (("Gemini healthy", {}), ("Gemini down (503s)", {"error_rate": 1.0})):
+        print("=" * 72)
+        print(f"{scenario}: {REQUESTS} plan requests over {ARRIVAL_SECONDS:.0f}s, "
+              f"{COMBINATIONS} exam/weak-topic combinations")
+        print("=" * 72)
+        print(f"{'engine':<8} {'p50':>10} {'p95':>10} {'gemini plans':>13} {'local plans':>12} {'Gemini requests':>16}")
+        for engine in PLAN_ENGINES:
+            fake.reset(rpm=60_000, burst=1000, latency=LATENCY, **options)
+            use_scheduler({})
+            p50, p95, gemini, local = await run(requests, engine)
+            print(f"{engine:<8} {p50 * 1000:>8.1f}ms {p95 * 1000:>8.1f}ms {gemini:>13} {local:>12} {fake.requests:>16}")
+        print()
+
+
+if __name__ == "__main__":
+    logging.disable(logging.ERROR)
+    fake = FakeGemini()
+    start_server(fake)
+    asyncio.run(main(fake))
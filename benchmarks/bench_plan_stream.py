@@ -0,0 +1,80 @@
+"""
+Benchmark: when plan days become available to the client with the
+streaming JSON array parser vs waiting for the whole Gemini response,
+and the parser's CPU cost vs the original regex + json.loads.
+
+Gemini output is simulated as ~40-character chunks arriving every
+CHUNK_INTERVAL seconds, the rate of a typical streamed plan. Run from
+the project root:
+    python -m benchmarks.bench_plan_stream
+"""
+
+import json
+import logging
+import re
+import time
+
+from services.gemini_service import parse_plan_response, validate_plan_day
+from services.json_stream import JsonArrayParser
+
+CHUNK_SIZE = 40
+CHUNK_INTERVAL = 0.02
+PARSES = 20_000
+
+PLAN = [{
+    "day": day,
+    "title": f"Day {day} focus",
+    "focus": "Thermodynamics and Organic Chemistry",
+    "tasks": ["Revise the key laws", "Solve 10 MCQs on heat engines", "Review reaction mechanisms"],
+    "time": "2.5 hours",
+    "mcqs": 10 + day,
+    "color": "#ff6b35",
+    "light": "rgba(255,107,53,0.08)"
+} for day in range(1, 8)]
+
+
+def legacy_parse(text):
+    match = re.search(r'\[.*\]', text, re.DOTALL)
+    if match:
+        return json.loads(match.group())
+    return json.loads(text)
+
+
+def arrival_times(text):
+    """(seconds after the request, day) for each validated day, streamed."""
+    parser = JsonArrayParser()
+    arrivals = []
+    for n, start in enumerate(range(0, len(text), CHUNK_SIZE), 1):
+        for item in parser.feed(text[start:start + CHUNK_SIZE]):
+            arrivals.append((n * CHUNK_INTERVAL, validate_plan_day(item)))
+    parser.close()
+    return arrivals
+
+
+def per_call(fn, calls):
+    start = time.perf_counter()
+    for _ in range(calls):
+        fn()
+    return (time.perf_counter() - start) / calls
+
+
+if __name__ == "__main__":
+    logging.disable(logging.INFO)
+    text = json.dumps(PLAN, indent=2)
+    chunks = -(-len(text) // CHUNK_SIZE)
+    whole = chunks * CHUNK_INTERVAL
+    arrivals = arrival_times(text)
+
+    print("=" * 60)
+    print(f"Plan: {len(text)} chars in {chunks} chunks, {CHUNK_INTERVAL * 1000:.0f} ms apart")
+    print("=" * 60)
+    print(f"{'day':>4} {'streamed at s':>14} {'buffered at s':>14}")
+    for arrived, day in arrivals:
+        print(f"{day['day']:>4} {arrived:14.2f} {whole:14.2f}")
+    print(f"First day {whole - arrivals[0][0]:.2f}s earlier; identical plan: "
+          f"{[day for _, day in arrivals] == parse_plan_response(text)}")
+
+    legacy = per_call(lambda: legacy_parse(text), PARSES)
+    streamed = per_call(lambda: parse_plan_response(text), PARSES)
+    print(f"\nParse + validate per plan: legacy regex {legacy * 1e6:.1f} us (no validation), "
+          f"incremental {streamed * 1e6:.1f} us")
@@ -0,0 +1,154 @@
+"""
+Benchmark: 100k 7-day plan generations with the original per-call plan
+builder vs the compiled, memoized plan templates.
+
+Two workloads: orderings drawn from a classroom-sized pool (students share
+weak-topic orderings) and every ordering distinct (only day blocks can be
+reused). Run from the project root:
+    python -m benchmarks.bench_plan_templates
+"""
+
+import logging
+import random
+import time
+from dataclasses import dataclass
+from typing import Dict, List
+
+from services import plan_templates
+from services.study_agent import EXAM_WEIGHTAGE, StudyAgent, TopicAnalysis
+
+PLANS = 100_000
+POOL_SIZE = 500
+
+
+@dataclass
+class LegacyDayPlan:
+    day: int
+    title: str
+    focus_subject: str
+    topics: List[str]
+    activities: List[Dict[str, str]]
+    total_hours: float
+    mcq_practice: int
+    expected_outcome: str
+
+
+def legacy_generate_7day_plan(weak_topics):
+    """The original generate_7day_plan (subjects kept in first-seen order so outputs compare)."""
+    subjects = list(dict.fromkeys(t.subject for t in weak_topics)) or ["General"]
+    topic_names = [t.topic_name for t in weak_topics]
+    if not topic_names:
+        topic_names = ["General Revision"]
+    day_themes = [
+        ("Foundation Day", "Build conceptual foundations"),
+        ("Deep Dive", "Intensive topic coverage"),
+        ("Mixed Practice", "Combine multiple topics"),
+        ("Focus Weak Areas", "Target weak topics"),
+        ("Full Mock Test", "Simulate exam conditions"),
+        ("Rapid Revision", "Quick review of all topics"),
+        ("Final Prep", "Last minute tips & strategy")
+    ]
+    plan = []
+    for day in range(1, 8):
+        title, subtitle = day_themes[day - 1]
+        focus_subject = subjects[(day - 1) % len(subjects)]
+        topic = topic_names[(day - 1) % len(topic_names)]
+        if day == 1:
+            activities = [
+                {"type": "Warm-up", "desc": "Quick basics review", "time": "15 min"},
+                {"type": "Concept Learning", "desc": f"Learn {topic} fundamentals", "time": "45 min"},
+                {"type": "Video Lecture", "desc": "Watch recommended video", "time": "30 min"},
+                {"type": "MCQ Practice", "desc": f"Solve 10 MCQs on {topic}", "time": "30 min"}
+            ]
+        elif day == 2:
+            activities = [
+                {"type": "Quick Review", "desc": "Revise previous topic", "time": "15 min"},
+                {"type": "Deep Dive", "desc": f"Advanced {topic} concepts", "time": "60 min"},
+                {"type": "Practice", "desc": f"Solve 15 problems on {topic}", "time": "45 min"},
+                {"type": "Doubt Clearing", "desc": "Clear doubts", "time": "20 min"}
+            ]
+        elif day == 3:
+            second = topic_names[(day) % len(topic_names)]
+            activities = [
+                {"type": "Topic Review", "desc": f"Review {topic}", "time": "30 min"},
+                {"type": "Mixed Practice", "desc": f"Practice {topic} and {second}", "time": "60 min"},
+                {"type": "Error Analysis", "desc": "Analyze mistakes", "time": "30 min"},
+                {"type": "MCQ Test", "desc": "Topic-wise test", "time": "30 min"}
+            ]
+        elif day == 4:
+            activities = [
+                {"type": "Focus Practice", "desc": f"Intensive {topic} practice", "time": "60 min"},
+                {"type": "Timer Practice", "desc": "Timed questions (2 min each)", "time": "30 min"},
+                {"type": "Formula Review", "desc": "Key formulas", "time": "20 min"},
+                {"type": "Quick Quiz", "desc": "10 quick MCQs", "time": "20 min"}
+            ]
+        elif day == 5:
+            activities = [
+                {"type": "Mock Test", "desc": "Full 25Q practice test", "time": "75 min"},
+                {"type": "Analysis", "desc": "Analyze results", "time": "30 min"},
+                {"type": "Error Review", "desc": "Review mistakes", "time": "25 min"},
+                {"type": "Planning", "desc": "Plan next focus", "time": "10 min"}
+            ]
+        elif day == 6:
+            activities = [
+                {"type": "Rapid Review", "desc": "Quick revision of weak topics", "time": "45 min"},
+                {"type": "Key Concepts", "desc": "Important formulas & concepts", "time": "30 min"},
+                {"type": "Previous Errors", "desc": "Review past mistakes", "time": "30 min"},
+                {"type": "Confidence", "desc": "Easy questions for confidence", "time": "20 min"}
+            ]
+        else:
+            activities = [
+                {"type": "Light Review", "desc": "Relaxed key topics revision", "time": "30 min"},
+                {"type": "Formula Sheet", "desc": "Quick formula revision", "time": "20 min"},
+                {"type": "Strategy", "desc": "Exam tips & time management", "time": "20 min"},
+                {"type": "Rest", "desc": "Stay calm and prepared", "time": "10 min"}
+            ]
+        total_min = sum(int(a['time'].split()[0]) for a in activities)
+        plan.append(LegacyDayPlan(
+            day=day, title=title, focus_subject=focus_subject, topics=[topic], activities=activities,
+            total_hours=round(total_min / 60, 2), mcq_practice=10 + (day * 2),
+            expected_outcome=f"Improved understanding of {topic}"
+        ))
+    return plan
+
+
+def weak_topic_lists(count, rng):
+    """Weak-topic lists (3-10 topics) in priority order."""
+    topics = [
+        TopicAnalysis(topic_name=topic, subject=subject)
+        for subject, table in EXAM_WEIGHTAGE["JEE Mains"].items() for topic in table
+    ]
+    return [rng.sample(topics, rng.randint(3, 10)) for _ in range(count)]
+
+
+def run(generate, workloads):
+    start = time.perf_counter()
+    plans = [generate(weak) for weak in workloads]
+    return time.perf_counter() - start, plans
+
+
+if __name__ == "__main__":
+    logging.disable(logging.INFO)
+    rng = random.Random(0)
+    agent = StudyAgent("JEE Mains")
+    pool = weak_topic_lists(POOL_SIZE, rng)
+    workloads = {
+        f"{POOL_SIZE} shared orderings": [rng.choice(pool) for _ in range(PLANS)],
+        "all orderings distinct": weak_topic_lists(PLANS, rng),
+    }
+
+    print("=" * 78)
+    print(f"{PLANS:,} plans {'':<24} {'legacy ms':>10} {'compiled ms':>12} {'speedup':>8}  identical")
+    print("=" * 78)
+    for name, weak_lists in workloads.items():
+        plan_templates._compiled_plan.cache_clear()
+        plan_templates.render_day.cache_clear()
+        legacy_time, expected = run(legacy_generate_7day_plan, weak_lists)
+        compiled_time, plans = run(lambda weak: agent.generate_7day_plan(weak, {}), weak_lists)
+        identical = all(
+            agent._format_plan(plan) == [vars(day) for day in legacy]
+            for plan, legacy in zip(plans[:2000], expected[:2000])
+        )
+        print(f"{name:<34} {legacy_time * 1000:10.1f} {compiled_time * 1000:12.1f} "
+              f"{legacy_time / compiled_time:7.2f}x  {identical}")
+        print(f"  plan cache: {plan_templates._compiled_plan.cache_info()}")
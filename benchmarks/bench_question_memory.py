@@ -0,0 +1,76 @@
+"""
+Benchmark: per-question memory of Question dataclasses vs QuestionStore.
+
+Questions are round-tripped through JSON first so every string is a
+separate object, as it is for a real API payload.
+
+Run from the project root:
+    python -m benchmarks.bench_question_memory [questions]
+"""
+
+import gc
+import json
+import sys
+import time
+import tracemalloc
+
+from benchmarks.synthetic import iter_questions
+from services.question_store import QuestionStore
+from services.study_agent import Question
+
+
+def decoded_questions(count):
+    """Yield freshly JSON-decoded question dicts."""
+    for q in iter_questions(count):
+        yield json.loads(json.dumps(q))
+
+
+def build_dataclasses(count):
+    return [
+        Question(
+            question_id=q.get('question_id', ''),
+            topic=q.get('topic', 'General'),
+            subtopic=q.get('subtopic', 'General'),
+            subject=q.get('subject', 'General'),
+            correct_answer=q.get('correct_answer', ''),
+            student_answer=q.get('student_answer'),
+            is_correct=q.get('is_correct', False),
+            time_spent_seconds=q.get('time_spent_seconds', 0),
+            difficulty=q.get('difficulty', 'medium')
+        )
+        for q in decoded_questions(count)
+    ]
+
+
+def build_store(count):
+    return QuestionStore.from_dicts(decoded_questions(count))
+
+
+def measure(build, count):
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = build(count)
+    elapsed = time.perf_counter() - start
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    gc.collect()
+    return current, elapsed
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+
+    print("=" * 60)
+    print(f"Question storage: {count:,} questions")
+    print("=" * 60)
+
+    before, before_time = measure(build_dataclasses, count)
+    after, after_time = measure(build_store, count)
+
+    print(f"Question dataclass : {before / count:8.1f} bytes/question  "
+          f"({before / 2**20:8.1f} MiB, built in {before_time:.1f}s)")
+    print(f"QuestionStore      : {after / count:8.1f} bytes/question  "
+          f"({after / 2**20:8.1f} MiB, built in {after_time:.1f}s)")
+    print(f"Reduction          : {before / after:8.1f}x")
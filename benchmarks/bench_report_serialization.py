@@ -0,0 +1,79 @@
+"""
+Benchmark: report size vs encode time for StudyAgent reports, rendered
+the original way (dict copies of every dataclass, then FastAPI's
+jsonable_encoder and json.dumps) vs the direct serializer (orjson, and
+the stdlib json fallback).
+
+Sizes range from one report to a 10,000-student batch response. Run
+from the project root:
+    python -m benchmarks.bench_report_serialization
+"""
+
+import json
+import logging
+import time
+
+from fastapi.encoders import jsonable_encoder
+
+from benchmarks.synthetic import make_students
+from services import report_serializer
+from services.study_agent import StudyAgent
+
+BATCH_SIZES = [1, 10, 100, 1_000, 10_000]
+DISTINCT_STUDENTS = 1_000
+
+
+def legacy_render(reports, agent):
+    """_format_* copies, then what FastAPI's JSONResponse does with them."""
+    formatted = []
+    for report in reports:
+        report = dict(report)
+        report["weak_topics"] = agent._format_weak(report["weak_topics"])
+        report["recommended_resources"] = agent._format_resources(report["recommended_resources"])
+        report["revision_plan_7_days"] = agent._format_plan(report["revision_plan_7_days"])
+        formatted.append(report)
+    return json.dumps(
+        jsonable_encoder(formatted), ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")
+    ).encode("utf-8")
+
+
+def stdlib_encode(reports):
+    orjson = report_serializer.orjson
+    report_serializer.orjson = None
+    try:
+        return report_serializer.encode(reports)
+    finally:
+        report_serializer.orjson = orjson
+
+
+def measure(fn, repeat):
+    fn()  # warm the plan-day cache
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+if __name__ == "__main__":
+    logging.disable(logging.INFO)
+    agent = StudyAgent("JEE Mains")
+    students = make_students(DISTINCT_STUDENTS)
+    raw = [agent.generate_report(s, s["student_name"], formatted=False) for s in students]
+
+    print("=" * 84)
+    print(f"{'reports':>8} {'size KB':>10} {'legacy ms':>11} {'stdlib ms':>11} {'orjson ms':>11} "
+          f"{'vs legacy':>10}  identical")
+    print("=" * 84)
+    for size in BATCH_SIZES:
+        reports = [raw[i % len(raw)] for i in range(size)]
+        repeat = max(1, 1_000 // size)
+        legacy_time, expected = measure(lambda: legacy_render(reports, agent), repeat)
+        stdlib_time, stdlib_bytes = measure(lambda: stdlib_encode(reports), repeat)
+        direct_time, direct_bytes = measure(lambda: report_serializer.encode(reports), repeat)
+        identical = direct_bytes == expected and stdlib_bytes == expected
+        print(f"{size:>8,} {len(direct_bytes) / 1024:10.1f} {legacy_time * 1000:11.3f} {stdlib_time * 1000:11.3f} "
+              f"{direct_time * 1000:11.3f} {legacy_time / direct_time:9.1f}x  {identical}")
+    print(f"\nEncode throughput at {BATCH_SIZES[-1]:,} reports: "
+          f"legacy {len(expected) / legacy_time / 1e6:.0f} MB/s, orjson {len(direct_bytes) / direct_time / 1e6:.0f} MB/s")
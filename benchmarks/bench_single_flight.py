@@ -0,0 +1,122 @@
+"""
+Benchmark: a post-mock burst of /api/plan requests, where many students
+share an exam and weak-topic combination, with and without single-flight
+coalescing of identical in-flight Gemini calls.
+
+Gemini is simulated by an in-process client streaming each plan over
+GEMINI_LATENCY seconds. Requests arrive spread over ARRIVAL_WINDOW
+seconds, before any plan is cached. Uses a throwaway database file.
+Run from the project root:
+    python -m benchmarks.bench_single_flight
+"""
+
+import asyncio
+import json
+import logging
+import os
+import random
+import statistics
+import tempfile
+import time
+
+from config import settings
+
+settings.DB_NAME = os.path.join(tempfile.mkdtemp(), "bench.db")
+# Measure coalescing alone, not the quota scheduler's rate limit
+settings.GEMINI_REQUESTS_PER_MINUTE = 60_000
+settings.GEMINI_BURST = 1000
+
+from benchmarks.bench_plan_stream import PLAN  # noqa: E402
+from services import gemini_service  # noqa: E402
+from services.plan_cache import plan_cache, make_plan_key  # noqa: E402
+
+STUDENTS = 400
+COMBINATIONS = 12
+ARRIVAL_WINDOW = 2.0
+GEMINI_LATENCY = 1.5
+CHUNKS = 20
+TOPICS = ["Thermodynamics", "Organic Chemistry", "Calculus", "Optics", "Electrostatics", "Probability"]
+
+
+class _Chunk:
+    def __init__(self, text):
+        self.text = text
+
+
+class FakeModels:
+    """Stands in for client.aio.models, counting calls."""
+
+    def __init__(self):
+        self.calls = 0
+
+    async def generate_content_stream(self, model, contents, config=None):
+        self.calls += 1
+        text = json.dumps(PLAN)
+        size = -(-len(text) // CHUNKS)
+
+        async def chunks():
+            for start in range(0, len(text), size):
+                await asyncio.sleep(GEMINI_LATENCY / CHUNKS)
+                yield _Chunk(text[start:start + size])
+        return chunks()
+
+
+class FakeClient:
+    def __init__(self):
+        self.aio = type("Aio", (), {})()
+        self.aio.models = FakeModels()
+
+
+def burst(rng):
+    """(arrival offset, weak topics) per student, a few combinations shared by many."""
+    combos = [[{"name": name} for name in rng.sample(TOPICS, 3)] for _ in range(COMBINATIONS)]
+    return sorted((rng.uniform(0, ARRIVAL_WINDOW), rng.choice(combos)) for _ in range(STUDENTS))
+
+
+async def legacy_plan(weak_topics, exam):
+    """One Gemini call per cache miss, as before single-flight."""
+    key = make_plan_key(exam, weak_topics, gemini_service.GEMINI_MODEL)
+    cached = plan_cache.get(key)
+    if cached is not None:
+        return cached
+    return await gemini_service._produce_plan(key, weak_topics, exam, gemini_service._PlanFeed())
+
+
+async def run(plan_fn, requests):
+    gemini_service.client = FakeClient()
+    gemini_service._gemini_semaphore = None
+    plan_cache.clear()
+    start = time.perf_counter()
+
+    async def student(offset, weak_topics):
+        await asyncio.sleep(offset)
+        arrived = time.perf_counter()
+        plan = await plan_fn(weak_topics, "JEE Mains")
+        assert len(plan) == len(PLAN)
+        return time.perf_counter() - arrived
+
+    latencies = await asyncio.gather(*(student(offset, topics) for offset, topics in requests))
+    return gemini_service.client.aio.models.calls, time.perf_counter() - start, sorted(latencies)
+
+
+def report(name, calls, elapsed, latencies):
+    p95 = latencies[int(len(latencies) * 0.95)]
+    print(f"{name:<16} {calls:>12} {statistics.median(latencies):>9.2f}s {p95:>9.2f}s {elapsed:>10.2f}s")
+
+
+if __name__ == "__main__":
+    logging.disable(logging.INFO)
+    requests = burst(random.Random(7))
+
+    legacy = asyncio.run(run(legacy_plan, requests))
+    coalesced = asyncio.run(run(gemini_service.generate_plan_async, requests))
+
+    print("=" * 64)
+    print(f"{STUDENTS} plan requests, {COMBINATIONS} distinct weak-topic combinations, "
+          f"arriving over {ARRIVAL_WINDOW:.0f}s")
+    print(f"Gemini: {GEMINI_LATENCY:.1f}s per plan, {settings.GEMINI_MAX_CONCURRENCY} concurrent calls")
+    print("=" * 64)
+    print(f"{'':<16} {'gemini calls':>12} {'p50':>10} {'p95':>10} {'burst':>11}")
+    report("per request", *legacy)
+    report("single-flight", *coalesced)
+    print(f"\nCoalescing: {gemini_service.coalescing_stats()['plan']}")
@@ -0,0 +1,130 @@
+"""
+Benchmark: weak-topic ranking with the original dict-per-topic full sort
+vs the bounded-heap streaming ranker, for one student with a large
+syllabus and for a whole classroom stored in SQLite.
+
+Uses a throwaway database file. Run from the project root:
+    python -m benchmarks.bench_topic_ranking
+"""
+
+import logging
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+
+from config import settings
+
+settings.DB_NAME = os.path.join(tempfile.mkdtemp(), "bench.db")
+
+from database import connection  # noqa: E402
+from services import analysis_state  # noqa: E402
+from services.study_agent import (  # noqa: E402
+    EXAM_WEIGHTAGE,
+    TopicAnalysis,
+    TopicStrength,
+    classify_strength,
+)
+from services.topic_ranking import classroom_weak_topics, rank_weak_topics  # noqa: E402
+from services.weightage import weightage_index  # noqa: E402
+
+TOPIC_COUNTS = [200, 2_000, 20_000]
+STUDENTS = 2_000
+TOPICS_PER_STUDENT = 200
+K = 20
+
+
+def legacy_rank(analyses, exam_type, k):
+    """The original identify_weak_topics body: a dict per weak topic and a full sort."""
+    weak = []
+    for analysis in analyses:
+        if analysis.strength_level in [TopicStrength.VERY_WEAK, TopicStrength.WEAK]:
+            weightage = weightage_index.weightage(exam_type, analysis.subject, analysis.topic_name)
+            priority = (100 - analysis.accuracy_percentage) * (weightage / 100)
+            weak.append({'topic': analysis, 'priority': priority, 'weightage': weightage})
+    weak.sort(key=lambda x: x['priority'], reverse=True)
+    return [w['topic'] for w in weak[:k]]
+
+
+def legacy_classroom(student_ids, exam_type, k):
+    """Rebuild every student's TopicAnalysis map, then rank all pairs."""
+    analyses = []
+    for student_id in student_ids:
+        topic_analysis, _, _ = analysis_state.load_topic_analysis(student_id, exam_type)
+        analyses.extend(topic_analysis.values())
+    return legacy_rank(analyses, exam_type, k)
+
+
+def syllabus(count):
+    topics = [(s, t) for s, table in EXAM_WEIGHTAGE["JEE Mains"].items() for t in table]
+    return [(topics[i % len(topics)][0], f"{topics[i % len(topics)][1]} {i // len(topics)}") for i in range(count)]
+
+
+def measure(fn):
+    fn()  # warm the weightage lookup cache
+    start = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak, result
+
+
+if __name__ == "__main__":
+    logging.disable(logging.INFO)
+    rng = random.Random(0)
+
+    print("One student, top-20 weak topics")
+    print("=" * 72)
+    print(f"{'topics':>8} {'sort ms':>9} {'heap ms':>9} {'speedup':>8} {'sort KB':>9} {'heap KB':>9}  identical")
+    print("=" * 72)
+    for count in TOPIC_COUNTS:
+        analyses = []
+        for subject, topic in syllabus(count):
+            accuracy = rng.uniform(0, 100)
+            analyses.append(TopicAnalysis(topic_name=topic, subject=subject, total_questions=10,
+                                          accuracy_percentage=accuracy, strength_level=classify_strength(accuracy)))
+        sort_time, sort_peak, expected = measure(lambda: legacy_rank(analyses, "JEE Mains", K))
+        heap_time, heap_peak, result = measure(lambda: rank_weak_topics(analyses, "JEE Mains", K))
+        identical = [a for _, a in result] == expected
+        print(f"{count:>8,} {sort_time * 1000:9.2f} {heap_time * 1000:9.2f} {sort_time / heap_time:7.2f}x "
+              f"{sort_peak / 1024:9.0f} {heap_peak / 1024:9.0f}  {identical}")
+
+    print(f"\nClassroom: {STUDENTS:,} students x {TOPICS_PER_STUDENT} topics "
+          f"({STUDENTS * TOPICS_PER_STUDENT:,} stored aggregates), top-{K}")
+    topics = syllabus(TOPICS_PER_STUDENT)
+    with connection() as conn:
+        analysis_state._ensure_schema(conn)
+        with conn:
+            conn.executemany(
+                "INSERT INTO topic_state VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    (f"student_{s:05d}", "JEE Mains", f"{subject}:{topic}", subject, topic, seq,
+                     total, rng.randint(0, total), total * 90.0, 0, 0, 0)
+                    for s in range(STUDENTS)
+                    for seq, (subject, topic) in enumerate(topics)
+                    for total in [rng.randint(5, 40)]
+                )
+            )
+    student_ids = [f"student_{s:05d}" for s in range(STUDENTS)]
+
+    print("=" * 72)
+    print(f"{'ranking':<44} {'ms':>9} {'peak MB':>9}")
+    print("=" * 72)
+    legacy_time, legacy_peak, expected = measure(lambda: legacy_classroom(student_ids, "JEE Mains", K))
+    print(f"{'TopicAnalysis per student + full sort':<44} {legacy_time * 1000:9.1f} {legacy_peak / 1e6:9.1f}")
+    pairs_time, pairs_peak, pairs = measure(
+        lambda: classroom_weak_topics("JEE Mains", K, student_ids, per_student=True)
+    )
+    print(f"{'streamed (student, topic) pairs, heap':<44} {pairs_time * 1000:9.1f} {pairs_peak / 1e6:9.1f}")
+    pooled_time, pooled_peak, _ = measure(lambda: classroom_weak_topics("JEE Mains", K))
+    print(f"{'streamed pooled per topic, heap':<44} {pooled_time * 1000:9.1f} {pooled_peak / 1e6:9.1f}")
+    # Ties may be broken in a different student order, so compare priorities
+    legacy_priorities = [
+        round((100 - a.accuracy_percentage) * weightage_index.weightage("JEE Mains", a.subject, a.topic_name) / 100, 2)
+        for a in expected
+    ]
+    print(f"Same top-{K} priorities as the full sort: {legacy_priorities == [p['priority'] for p in pairs]}")
@@ -0,0 +1,114 @@
+"""
+Benchmark: StudyAgent.identify_weak_topics with the original nested-dict
+weightage lookup and full sort vs the weightage index and heap top-k.
+Also reports how many real-world topic names each lookup resolves.
+
+Run from the project root:
+    python -m benchmarks.bench_weightage_index
+"""
+
+import logging
+import random
+import time
+
+from services.study_agent import (
+    EXAM_WEIGHTAGE,
+    StudyAgent,
+    TopicAnalysis,
+    TopicStrength,
+    classify_strength,
+)
+from services.weightage import weightage_index
+
+SIZES = [30, 300, 3_000]
+REPEAT = 2_000
+MAX_TOPICS = 10
+
+# Topic names as students, teachers and the demo data write them
+REAL_WORLD_TOPICS = [
+    ("JEE Mains", "Math", "Integration (Calculus)"), ("JEE Mains", "Physics", "Current Electricity"),
+    ("JEE Mains", "Physics", "Thermodynamics"), ("JEE Mains", "Chemistry", "Organic Chemistry"),
+    ("JEE Mains", "Math", "Algebra"), ("JEE Mains", "Physics", "Electrostatics"),
+    ("JEE Mains", "Physics", "Mechanics"), ("JEE Mains", "Chemistry", "Inorganic Chemistry"),
+    ("JEE Mains", "Physics", "Rotational Motion"), ("JEE Mains", "Math", "Complex Numbers"),
+    ("JEE Main", "Mathematics", "vectors and 3d"), ("JEE Mains", "Chemistry", "Mole Concept"),
+    ("NEET", "Biology", "Genetics & Evolution"), ("NEET", "Chemistry", "Electrochemistry"),
+    ("NEET", "Biology", "Human Physiology"), ("NEET", "Physics", "Physics (Optics)"),
+    ("NEET", "Biology", "Biomolecules"), ("NEET", "Biology", "Cell Biology"),
+    ("JEE Advanced", "Math", "Complex Numbers"), ("JEE Advanced", "Physics", "Rotational Dynamics"),
+    ("JEE Advanced", "Chemistry", "Electrochemistry"), ("JEE Advanced", "Math", "Differential Equations"),
+    ("JEE Advanced", "Math", "Coordinate Geometry"), ("JEE Advanced", "Chemistry", "Mole Concept"),
+]
+
+
+def legacy_weightage(exam_type, subject, topic):
+    """The original StudyAgent._get_weightage."""
+    if exam_type in EXAM_WEIGHTAGE:
+        return EXAM_WEIGHTAGE[exam_type].get(subject, {}).get(topic, 10)
+    return 10
+
+
+def legacy_identify_weak_topics(agent, max_topics):
+    """The original identify_weak_topics: per-topic dicts and a full sort."""
+    weak = []
+    for topic_key, analysis in agent.topic_analysis.items():
+        if analysis.strength_level in [TopicStrength.VERY_WEAK, TopicStrength.WEAK]:
+            weightage = legacy_weightage(agent.exam_type, analysis.subject, analysis.topic_name)
+            priority = (100 - analysis.accuracy_percentage) * (weightage / 100)
+            weak.append({'topic': analysis, 'priority': priority, 'weightage': weightage})
+    weak.sort(key=lambda x: x['priority'], reverse=True)
+    return [w['topic'] for w in weak[:max_topics]]
+
+
+def make_analysis(size, rng):
+    """A topic analysis map over the exam's topics (repeated with suffixes)."""
+    topics = [(s, t) for s, table in EXAM_WEIGHTAGE["JEE Mains"].items() for t in table]
+    analysis = {}
+    for i in range(size):
+        subject, topic = topics[i % len(topics)]
+        name = topic if i < len(topics) else f"{topic} {i}"
+        accuracy = round(rng.uniform(0, 100), 1)
+        analysis[f"{subject}:{name}"] = TopicAnalysis(
+            topic_name=name, subject=subject, total_questions=10,
+            accuracy_percentage=accuracy, strength_level=classify_strength(accuracy)
+        )
+    return analysis
+
+
+def timed(fn):
+    start = time.perf_counter()
+    for _ in range(REPEAT):
+        result = fn()
+    return (time.perf_counter() - start) / REPEAT, result
+
+
+if __name__ == "__main__":
+    logging.disable(logging.INFO)
+    rng = random.Random(0)
+
+    print("=" * 66)
+    print(f"{'topics':>8} {'legacy us':>11} {'index + heap us':>16} {'speedup':>8}  identical")
+    print("=" * 66)
+    for size in SIZES:
+        agent = StudyAgent("JEE Mains")
+        agent.topic_analysis = make_analysis(size, rng)
+        legacy_time, expected = timed(lambda: legacy_identify_weak_topics(agent, MAX_TOPICS))
+        new_time, result = timed(lambda: agent.identify_weak_topics(MAX_TOPICS))
+        print(f"{size:>8,} {legacy_time * 1e6:11.1f} {new_time * 1e6:16.1f} "
+              f"{legacy_time / new_time:7.2f}x  {result == expected}")
+
+    legacy_hits = sum(
+        1 for exam, subject, topic in REAL_WORLD_TOPICS
+        if exam in EXAM_WEIGHTAGE and topic in EXAM_WEIGHTAGE[exam].get(subject, {})
+    )
+    index_hits = sum(
+        1 for exam, subject, topic in REAL_WORLD_TOPICS
+        if weightage_index.topic_id(exam, subject, topic) is not None
+    )
+    print(f"\nReal-world topic names resolved to a weightage: legacy {legacy_hits}/{len(REAL_WORLD_TOPICS)}, "
+          f"index {index_hits}/{len(REAL_WORLD_TOPICS)}")
+    for exam, subject, topic in REAL_WORLD_TOPICS[:6]:
+        topic_id = weightage_index.topic_id(exam, subject, topic)
+        parent = weightage_index.topics[topic_id][2] if topic_id is not None else "-"
+        print(f"  {exam:<12} {subject:<10} {topic:<24} -> {parent:<18} "
+              f"{weightage_index.weightage(exam, subject, topic):>4} (legacy {legacy_weightage(exam, subject, topic)})")
@@ -0,0 +1,142 @@
+"""
+Local fake Gemini API for load-testing the Gemini client paths.
+
+Serves generateContent and streamGenerateContent (SSE) for any model,
+answering JSON-mode requests with a 7-day plan and others with a short
+chat reply. Batched plan prompts get one plan entry per "Job n:" line,
+a fraction of them (`invalid_rate`) cut short to fail validation.
+Requests over quota (a bucket of `burst` requests refilled at `rpm`)
+get 429 RESOURCE_EXHAUSTED, like the real API. It can also fail a
+fraction of requests with 503, or hang to simulate an outage.
+Point the backend at it with GEMINI_BASE_URL:
+    python -m benchmarks.fake_gemini_server --port 8765 --rpm 300
+    GEMINI_BASE_URL=http://127.0.0.1:8765 uvicorn main:app
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import re
+import time
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+from benchmarks.bench_plan_stream import PLAN
+
+BATCH_JOB = re.compile(r"^Job (\d+):", re.MULTILINE)
+CHAT_REPLY = "Entropy measures how many microscopic arrangements are consistent with a system's macroscopic state."
+
+
+class FakeGemini:
+    """Quota, latency and failure behaviour of the fake API, adjustable while it runs."""
+
+    def __init__(self, rpm=300.0, burst=20, latency=0.2, error_rate=0.0, hang=False, invalid_rate=0.0):
+        self.rpm = rpm
+        self.burst = burst
+        self.latency = latency
+        self.error_rate = error_rate
+        self.hang = hang
+        self.invalid_rate = invalid_rate
+        self.requests = 0
+        self.prompt_chars = 0
+        self.throttled = 0
+        self.errors = 0
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+
+    def reset(self, **options):
+        self.__init__(**options)
+
+    def _over_quota(self):
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rpm / 60)
+        self._updated = now
+        if self._tokens < 1:
+            return True
+        self._tokens -= 1
+        return False
+
+    async def admit(self, outputs=1):
+        """
+        None to serve the request, or the error response to send instead.
+        Latency is charged per output (plan) generated.
+        """
+        self.requests += 1
+        if self.hang:
+            await asyncio.sleep(3600)
+        if self._over_quota():
+            self.throttled += 1
+            return _error(429, "RESOURCE_EXHAUSTED", "Resource has been exhausted (e.g. check quota).")
+        if random.random() < self.error_rate:
+            self.errors += 1
+            return _error(503, "UNAVAILABLE", "The model is overloaded. Please try again later.")
+        await asyncio.sleep(self.latency * outputs)
+        return None
+
+
+def _error(code, status, message):
+    return JSONResponse({"error": {"code": code, "message": message, "status": status}}, status_code=code)
+
+
+def _response(text):
+    return {"candidates": [{"content": {"role": "model", "parts": [{"text": text}]}, "finishReason": "STOP"}]}
+
+
+def _prompt(body):
+    return "".join(part.get("text", "") for content in body.get("contents", []) for part in content.get("parts", []))
+
+
+def _answer(prompt, config, invalid_rate):
+    if config.get("responseMimeType") != "application/json":
+        return CHAT_REPLY
+    jobs = BATCH_JOB.findall(prompt)
+    if not jobs:
+        return json.dumps(PLAN)
+    return json.dumps([
+        {"job": int(job), "days": PLAN[:-1] if random.random() < invalid_rate else PLAN}
+        for job in jobs
+    ])
+
+
+def create_app(fake):
+    app = FastAPI()
+
+    @app.post("/{version}/models/{target}")
+    async def generate(version: str, target: str, request: Request):
+        body = await request.json()
+        prompt = _prompt(body)
+        fake.prompt_chars += len(prompt)
+        text = _answer(prompt, body.get("generationConfig") or {}, fake.invalid_rate)
+        error = await fake.admit(max(1, len(BATCH_JOB.findall(prompt))))
+        if error is not None:
+            return error
+
+        if not target.endswith(":streamGenerateContent"):
+            return _response(text)
+
+        async def events():
+            size = -(-len(text) // 8)
+            for start in range(0, len(text), size):
+                yield f"data: {json.dumps(_response(text[start:start + size]))}\r\n\r\n"
+                await asyncio.sleep(fake.latency / 8)
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    return app
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--rpm", type=float, default=300)
+    parser.add_argument("--burst", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.2)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--hang", action="store_true")
+    parser.add_argument("--invalid-rate", type=float, default=0.0)
+    args = parser.parse_args()
+    fake = FakeGemini(args.rpm, args.burst, args.latency, args.error_rate, args.hang, args.invalid_rate)
+    uvicorn.run(create_app(fake), host="127.0.0.1", port=args.port, log_level="warning")
@@ -0,0 +1,53 @@
+"""
+Synthetic mock test data shared by the benchmark scripts.
+"""
+
+import random
+from typing import Any, Dict, Iterator, List
+
+from services.study_agent import EXAM_WEIGHTAGE
+
+SUBTOPICS = ["Basics", "Laws", "Applications", "Numericals", "Theory", "Graphs"]
+DIFFICULTIES = ["easy", "medium", "hard"]
+OPTIONS = ["A", "B", "C", "D"]
+
+
+def iter_questions(count: int, exam_type: str = "JEE Mains", seed: int = 0) -> Iterator[Dict[str, Any]]:
+    """Lazily generate `count` question dicts in the StudyAgent input format."""
+    rng = random.Random(seed)
+    topics = [
+        (subject, topic)
+        for subject, table in EXAM_WEIGHTAGE[exam_type].items()
+        for topic in table
+    ]
+    for i in range(count):
+        subject, topic = topics[rng.randrange(len(topics))]
+        correct_answer = rng.choice(OPTIONS)
+        is_correct = rng.random() < 0.55
+        yield {
+            "question_id": f"Q{i + 1}",
+            "topic": topic,
+            "subtopic": rng.choice(SUBTOPICS),
+            "subject": subject,
+            "correct_answer": correct_answer,
+            "student_answer": correct_answer if is_correct else rng.choice(OPTIONS),
+            "is_correct": is_correct,
+            "time_spent_seconds": rng.randint(20, 300),
+            "difficulty": rng.choice(DIFFICULTIES)
+        }
+
+
+def make_questions(count: int, exam_type: str = "JEE Mains", seed: int = 0) -> List[Dict[str, Any]]:
+    """Generate `count` question dicts in the StudyAgent input format."""
+    return list(iter_questions(count, exam_type, seed))
+
+
+def make_students(count: int, questions_per_student: int = 90, exam_type: str = "JEE Mains") -> List[Dict[str, Any]]:
+    """Generate `count` student mock tests."""
+    return [{
+        "student_id": f"student_{i:05d}",
+        "student_name": f"Student {i}",
+        "exam_type": exam_type,
+        "mock_test_id": "MOCK_BENCH",
+        "questions": make_questions(questions_per_student, exam_type, seed=i)
+    } for i in range(count)]
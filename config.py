@@ -7,4 +7,81 @@ class Settings:
     GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
     DB_NAME = "examcoach.db"
 
+    # SQLite: idle pooled connections per process, lock wait, page cache,
+    # memory-mapped I/O and prepared statements cached per connection
+    DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "16"))
+    DB_BUSY_TIMEOUT_MS = int(os.getenv("DB_BUSY_TIMEOUT_MS", "5000"))
+    DB_CACHE_SIZE_KB = int(os.getenv("DB_CACHE_SIZE_KB", "16384"))
+    DB_MMAP_SIZE_MB = int(os.getenv("DB_MMAP_SIZE_MB", "128"))
+    DB_STATEMENT_CACHE_SIZE = int(os.getenv("DB_STATEMENT_CACHE_SIZE", "256"))
+
+    # Async Gemini path: max in-flight calls per process and per-call timeout
+    GEMINI_MAX_CONCURRENCY = int(os.getenv("GEMINI_MAX_CONCURRENCY", "32"))
+    GEMINI_TIMEOUT_SECONDS = float(os.getenv("GEMINI_TIMEOUT_SECONDS", "20"))
+    # Alternative API endpoint, e.g. a local fake Gemini server for load tests
+    GEMINI_BASE_URL = os.getenv("GEMINI_BASE_URL")
+
+    # Gemini quota scheduler: request rate (per minute) and burst, longest
+    # wait for a request slot, retries per call with jittered backoff base and
+    # cap, retry budget (retries earned per call and max banked), and circuit
+    # breaker (consecutive failures that open it, seconds before a probe call)
+    GEMINI_REQUESTS_PER_MINUTE = float(os.getenv("GEMINI_REQUESTS_PER_MINUTE", "1000"))
+    GEMINI_BURST = int(os.getenv("GEMINI_BURST", "20"))
+    GEMINI_QUEUE_TIMEOUT_SECONDS = float(os.getenv("GEMINI_QUEUE_TIMEOUT_SECONDS", "10"))
+    GEMINI_MAX_RETRIES = int(os.getenv("GEMINI_MAX_RETRIES", "3"))
+    GEMINI_BACKOFF_BASE_SECONDS = float(os.getenv("GEMINI_BACKOFF_BASE_SECONDS", "0.5"))
+    GEMINI_BACKOFF_MAX_SECONDS = float(os.getenv("GEMINI_BACKOFF_MAX_SECONDS", "8"))
+    GEMINI_RETRY_BUDGET_RATIO = float(os.getenv("GEMINI_RETRY_BUDGET_RATIO", "0.2"))
+    GEMINI_RETRY_BUDGET_MAX = float(os.getenv("GEMINI_RETRY_BUDGET_MAX", "20"))
+    GEMINI_BREAKER_FAILURES = int(os.getenv("GEMINI_BREAKER_FAILURES", "5"))
+    GEMINI_BREAKER_COOLDOWN_SECONDS = float(os.getenv("GEMINI_BREAKER_COOLDOWN_SECONDS", "30"))
+
+    # Plan cache: in-process LRU size, persistent row limit and entry TTL
+    PLAN_CACHE_MEMORY_SIZE = int(os.getenv("PLAN_CACHE_MEMORY_SIZE", "1024"))
+    PLAN_CACHE_MAX_ROWS = int(os.getenv("PLAN_CACHE_MAX_ROWS", "50000"))
+    PLAN_CACHE_TTL_SECONDS = float(os.getenv("PLAN_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+
+    # Chat answer cache: max entries, entry TTL and fuzzy-match threshold (0-1)
+    CHAT_CACHE_SIZE = int(os.getenv("CHAT_CACHE_SIZE", "5000"))
+    CHAT_CACHE_TTL_SECONDS = float(os.getenv("CHAT_CACHE_TTL_SECONDS", str(24 * 3600)))
+    CHAT_CACHE_MIN_SIMILARITY = float(os.getenv("CHAT_CACHE_MIN_SIMILARITY", "0.8"))
+
+    # /api/plan engine when the request does not choose one: "gemini",
+    # "local" (StudyAgent templates) or "hybrid" (local now, Gemini cached later)
+    PLAN_ENGINE = os.getenv("PLAN_ENGINE", "gemini")
+
+    # Batched plan generation: plans requested per Gemini call
+    PLAN_BATCH_SIZE = int(os.getenv("PLAN_BATCH_SIZE", "8"))
+
+    # Batch analysis: worker processes (0 = one per core) and students per task
+    BATCH_WORKERS = int(os.getenv("BATCH_WORKERS", "0"))
+    BATCH_CHUNK_SIZE = int(os.getenv("BATCH_CHUNK_SIZE", "50"))
+
+    # StudyAgent error-analysis engine: "python" or "columnar" (NumPy)
+    ANALYSIS_ENGINE = os.getenv("ANALYSIS_ENGINE", "python")
+
+    # Exam weightage tables and topic aliases (JSON)
+    EXAM_WEIGHTAGE_FILE = os.getenv(
+        "EXAM_WEIGHTAGE_FILE", os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "exam_weightage.json")
+    )
+
+    # OCR pipeline: tesseract worker processes (0 = one per core), max pages
+    # queued on the pool at once, and render resolution for PDF pages
+    OCR_WORKERS = int(os.getenv("OCR_WORKERS", "0"))
+    OCR_MAX_PENDING_PAGES = int(os.getenv("OCR_MAX_PENDING_PAGES", "16"))
+    OCR_PDF_DPI = int(os.getenv("OCR_PDF_DPI", "200"))
+
+    # OCR preprocessing: comma-separated steps run before tesseract (empty to
+    # disable) and the resolution images are downscaled to
+    OCR_PREPROCESS_STEPS = os.getenv("OCR_PREPROCESS_STEPS", "downscale,grayscale,binarize,deskew,crop")
+    OCR_TARGET_DPI = int(os.getenv("OCR_TARGET_DPI", "300"))
+
+    # OMR reader: "auto" (bubble grid, tesseract fallback), "bubble" or "text"
+    OMR_READER_MODE = os.getenv("OMR_READER_MODE", "auto")
+
+    # Answer keys: hot keys kept in memory and how long a cached key is
+    # trusted before re-reading it (lets worker processes see re-imports)
+    ANSWER_KEY_CACHE_SIZE = int(os.getenv("ANSWER_KEY_CACHE_SIZE", "256"))
+    ANSWER_KEY_CACHE_TTL_SECONDS = float(os.getenv("ANSWER_KEY_CACHE_TTL_SECONDS", "60"))
+
 settings = Settings()
\ No newline at end of file
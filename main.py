@@ -1,6 +1,8 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import Response
 from api.routes import router
+from services import metrics
 
 app = FastAPI(title="ExamCoach AI Backend")
 
@@ -12,8 +14,15 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+app.add_middleware(metrics.MetricsMiddleware)
+
 app.include_router(router, prefix="/api")
 
 @app.get("/")
 def root():
-    return {"status": "ExamCoach Backend Running"}
\ No newline at end of file
+    return {"status": "ExamCoach Backend Running"}
+
+@app.get("/metrics")
+def prometheus_metrics():
+    """Request, analysis stage, Gemini and OCR latencies for Prometheus."""
+    return Response(content=metrics.render(), media_type=metrics.CONTENT_TYPE)
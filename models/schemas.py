@@ -1,5 +1,5 @@
-from pydantic import BaseModel
-from typing import List, Optional
+from pydantic import BaseModel, Field
+from typing import Any, Dict, List, Optional
 
 class Topic(BaseModel):
     """Topic model matching frontend - includes score field"""
@@ -13,6 +13,56 @@ class AnalyzeRequest(BaseModel):
     """Request body for analyze endpoint - matches frontend format exactly"""
     topics: List[Topic]
     exam: str
+    # When both are set, the attempt is stored in the student's performance
+    # history, once per mock_test_id (re-analyzing the same mock is a no-op)
+    student_id: Optional[str] = None
+    mock_test_id: Optional[str] = None
+
+class PlanDay(BaseModel):
+    """One day of the Gemini 7-day plan - matches the frontend PlanDay; also the response schema"""
+    day: int = Field(description="Day number (1-7)")
+    title: str = Field(description="Short day title")
+    focus: str = Field(description="Main topic focus")
+    tasks: List[str] = Field(description="3-4 study tasks")
+    time: str = Field(description='Study time, e.g. "2 hours"')
+    mcqs: int = Field(description="Practice questions count")
+    color: str = Field(description='Hex color like "#ff6b35"')
+    light: str = Field(description='Light rgba like "rgba(255,107,53,0.08)"')
+
+class PlanBatchEntry(BaseModel):
+    """One job's plan in a batched plan response - also the response schema"""
+    job: int = Field(description="Job number from the request")
+    days: List[PlanDay] = Field(description="The job's 7-day plan, in order")
+
+class PlanBatchRequest(BaseModel):
+    """Request body for batched plan generation - one entry per student"""
+    requests: List[AnalyzeRequest]
 
 class ChatRequest(BaseModel):
     message: str
+
+class StudentMockTest(BaseModel):
+    """One student's mock test for batch analysis - per-question results or topic totals"""
+    student_id: str
+    student_name: Optional[str] = "Student"
+    exam_type: Optional[str] = "JEE Mains"
+    mock_test_id: Optional[str] = ""
+    questions: List[Dict[str, Any]] = []
+    topics: List[Topic] = []
+
+class BatchAnalyzeRequest(BaseModel):
+    """Request body for batch analysis endpoint"""
+    students: List[StudentMockTest]
+
+class ScoreSheetsRequest(BaseModel):
+    """
+    Answer sheets to score against one stored answer key - either sheets
+    by question number, or answers: one string per sheet with one
+    character per key question in question order ("-" for unanswered),
+    which is scored without per-question encoding.
+    """
+    exam_type: str
+    paper_code: Optional[str] = None
+    set_code: Optional[str] = None
+    sheets: List[Dict[int, str]] = []
+    answers: Optional[List[str]] = None
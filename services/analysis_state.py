@@ -0,0 +1,266 @@
+"""
+Incremental per-student analysis state.
+
+Running per-topic and per-subtopic aggregates (totals, correct answers,
+time sums and error-pattern counters) are kept in SQLite through
+database.connection. Applying a new mock only aggregates that mock's
+questions, and the TopicAnalysis map is rebuilt from the stored
+aggregates - O(new questions + topics), never O(history). The result
+equals a full recompute over every question the student has submitted.
+"""
+
+import json
+import logging
+import time
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from database import connection
+from services.study_agent import (
+    WEAK_ACCURACY,
+    TopicAnalysis,
+    classify_strength,
+    patterns_from_counts,
+)
+
+logger = logging.getLogger(__name__)
+
+_schema_ready = False
+
+
+def _ensure_schema(conn) -> None:
+    global _schema_ready
+    if _schema_ready:
+        return
+    conn.executescript("""
+        CREATE TABLE IF NOT EXISTS topic_state (
+            student_id TEXT NOT NULL,
+            exam_type TEXT NOT NULL,
+            topic_key TEXT NOT NULL,
+            subject TEXT NOT NULL,
+            topic TEXT NOT NULL,
+            seq INTEGER NOT NULL,
+            total INTEGER NOT NULL,
+            correct INTEGER NOT NULL,
+            time_spent REAL NOT NULL,
+            error_count INTEGER NOT NULL,
+            slow_errors INTEGER NOT NULL,
+            hard_errors INTEGER NOT NULL,
+            PRIMARY KEY (student_id, exam_type, topic_key)
+        );
+        CREATE TABLE IF NOT EXISTS subtopic_state (
+            student_id TEXT NOT NULL,
+            exam_type TEXT NOT NULL,
+            topic_key TEXT NOT NULL,
+            subtopic TEXT NOT NULL,
+            seq INTEGER NOT NULL,
+            total INTEGER NOT NULL,
+            correct INTEGER NOT NULL,
+            PRIMARY KEY (student_id, exam_type, topic_key, subtopic)
+        );
+        CREATE TABLE IF NOT EXISTS applied_mocks (
+            student_id TEXT NOT NULL,
+            exam_type TEXT NOT NULL,
+            mock_test_id TEXT NOT NULL,
+            question_count INTEGER NOT NULL,
+            applied_at REAL NOT NULL,
+            PRIMARY KEY (student_id, exam_type, mock_test_id)
+        );
+    """)
+    _schema_ready = True
+
+
+def compute_deltas(questions: Iterable[Any]) -> Tuple[Dict[str, Dict], Dict[Tuple[str, str], Dict]]:
+    """
+    Aggregate new questions per topic and per (topic, subtopic), in
+    first-appearance order.
+    """
+    topics: Dict[str, Dict] = {}
+    subtopics: Dict[Tuple[str, str], Dict] = {}
+
+    for q in questions:
+        topic_key = f"{q.subject}:{q.topic}"
+        t = topics.get(topic_key)
+        if t is None:
+            t = topics[topic_key] = {
+                'subject': q.subject, 'topic': q.topic, 'total': 0, 'correct': 0,
+                'time_spent': 0, 'error_count': 0, 'slow_errors': 0, 'hard_errors': 0
+            }
+        t['total'] += 1
+        t['time_spent'] += q.time_spent_seconds
+        if q.is_correct:
+            t['correct'] += 1
+        else:
+            t['error_count'] += 1
+            if q.time_spent_seconds > 180:
+                t['slow_errors'] += 1
+            if q.difficulty == 'hard':
+                t['hard_errors'] += 1
+
+        sub = subtopics.get((topic_key, q.subtopic))
+        if sub is None:
+            sub = subtopics[(topic_key, q.subtopic)] = {'total': 0, 'correct': 0}
+        sub['total'] += 1
+        if q.is_correct:
+            sub['correct'] += 1
+
+    return topics, subtopics
+
+
+def apply_mock(student_id: str, exam_type: str, mock_test_id: str, questions: Iterable[Any]) -> Optional[Dict[str, Dict]]:
+    """
+    Add one mock's questions to the student's stored aggregates and return
+    the mock's per-topic deltas (compute_deltas). A mock with a known
+    mock_test_id is only applied once; returns None if it had already
+    been applied.
+    """
+    topic_deltas, subtopic_deltas = compute_deltas(questions)
+    question_count = sum(t['total'] for t in topic_deltas.values())
+
+    with connection() as conn:
+        _ensure_schema(conn)
+        with conn:
+            if mock_test_id:
+                cur = conn.execute(
+                    "INSERT OR IGNORE INTO applied_mocks "
+                    "(student_id, exam_type, mock_test_id, question_count, applied_at) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (student_id, exam_type, mock_test_id, question_count, time.time())
+                )
+                if cur.rowcount == 0:
+                    logger.info(f"Mock {mock_test_id} already applied for {student_id}")
+                    return None
+
+            next_seq = conn.execute(
+                "SELECT COALESCE(MAX(seq), -1) + 1 FROM topic_state WHERE student_id = ? AND exam_type = ?",
+                (student_id, exam_type)
+            ).fetchone()[0]
+            conn.executemany(
+                "INSERT INTO topic_state "
+                "(student_id, exam_type, topic_key, subject, topic, seq, total, correct, "
+                "time_spent, error_count, slow_errors, hard_errors) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (student_id, exam_type, topic_key) DO UPDATE SET "
+                "total = total + excluded.total, "
+                "correct = correct + excluded.correct, "
+                "time_spent = time_spent + excluded.time_spent, "
+                "error_count = error_count + excluded.error_count, "
+                "slow_errors = slow_errors + excluded.slow_errors, "
+                "hard_errors = hard_errors + excluded.hard_errors",
+                [
+                    (student_id, exam_type, key, t['subject'], t['topic'], next_seq + i,
+                     t['total'], t['correct'], t['time_spent'], t['error_count'],
+                     t['slow_errors'], t['hard_errors'])
+                    for i, (key, t) in enumerate(topic_deltas.items())
+                ]
+            )
+
+            next_seq = conn.execute(
+                "SELECT COALESCE(MAX(seq), -1) + 1 FROM subtopic_state WHERE student_id = ? AND exam_type = ?",
+                (student_id, exam_type)
+            ).fetchone()[0]
+            conn.executemany(
+                "INSERT INTO subtopic_state "
+                "(student_id, exam_type, topic_key, subtopic, seq, total, correct) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (student_id, exam_type, topic_key, subtopic) DO UPDATE SET "
+                "total = total + excluded.total, "
+                "correct = correct + excluded.correct",
+                [
+                    (student_id, exam_type, topic_key, subtopic, next_seq + i, sub['total'], sub['correct'])
+                    for i, ((topic_key, subtopic), sub) in enumerate(subtopic_deltas.items())
+                ]
+            )
+        return topic_deltas
+
+
+def load_topic_analysis(student_id: str, exam_type: str) -> Tuple[Dict[str, TopicAnalysis], int, int]:
+    """
+    Rebuild the TopicAnalysis map from stored aggregates.
+    Returns (topic_analysis, total_questions, correct_answers) over the
+    student's whole history.
+    """
+    with connection() as conn:
+        _ensure_schema(conn)
+        topic_rows = conn.execute(
+            "SELECT * FROM topic_state WHERE student_id = ? AND exam_type = ? ORDER BY seq",
+            (student_id, exam_type)
+        ).fetchall()
+        subtopic_rows = conn.execute(
+            "SELECT topic_key, subtopic, total, correct FROM subtopic_state "
+            "WHERE student_id = ? AND exam_type = ? ORDER BY seq",
+            (student_id, exam_type)
+        ).fetchall()
+
+    subtopics: Dict[str, Dict[str, Dict]] = {}
+    for row in subtopic_rows:
+        subtopics.setdefault(row['topic_key'], {})[row['subtopic']] = {
+            'total': row['total'], 'correct': row['correct']
+        }
+
+    analysis: Dict[str, TopicAnalysis] = {}
+    total_questions = 0
+    correct_answers = 0
+    for row in topic_rows:
+        accuracy = row['correct'] / row['total'] * 100
+        analysis[row['topic_key']] = TopicAnalysis(
+            topic_name=row['topic'],
+            subject=row['subject'],
+            subtopics=subtopics.get(row['topic_key'], {}),
+            total_questions=row['total'],
+            correct_count=row['correct'],
+            accuracy_percentage=accuracy,
+            strength_level=classify_strength(accuracy),
+            error_patterns=patterns_from_counts(
+                row['topic'], row['error_count'], row['slow_errors'], row['hard_errors']
+            ),
+            avg_time_per_question=row['time_spent'] / row['total']
+        )
+        total_questions += row['total']
+        correct_answers += row['correct']
+
+    return analysis, total_questions, correct_answers
+
+
+def iter_topic_aggregates(
+    exam_type: str,
+    student_ids: Optional[List[str]] = None,
+    per_student: bool = False
+) -> Iterator[Any]:
+    """
+    Stream stored topic aggregates for many students, one row at a time.
+
+    Rows have subject, topic, total and correct. By default each topic is
+    pooled over the students (plus students / weak_students counts);
+    per_student=True yields one row per (student_id, topic) instead.
+    student_ids limits the rows to those students.
+    """
+    where = "exam_type = ?"
+    params: List[Any] = [exam_type]
+    if student_ids is not None:
+        where += " AND student_id IN (SELECT value FROM json_each(?))"
+        params.append(json.dumps(student_ids))
+
+    if per_student:
+        sql = f"SELECT student_id, subject, topic, total, correct FROM topic_state WHERE {where}"
+    else:
+        sql = (
+            "SELECT subject, topic, SUM(total) AS total, SUM(correct) AS correct, COUNT(*) AS students, "
+            f"SUM(correct * 100.0 / total <= {WEAK_ACCURACY}) AS weak_students "
+            f"FROM topic_state WHERE {where} GROUP BY subject, topic"
+        )
+
+    with connection() as conn:
+        _ensure_schema(conn)
+        yield from conn.execute(sql, params)
+
+
+def reset_student(student_id: str, exam_type: str) -> None:
+    """Forget all stored aggregates and applied mocks for a student."""
+    with connection() as conn:
+        _ensure_schema(conn)
+        with conn:
+            for table in ("topic_state", "subtopic_state", "applied_mocks"):
+                conn.execute(
+                    f"DELETE FROM {table} WHERE student_id = ? AND exam_type = ?",
+                    (student_id, exam_type)
+                )
@@ -1,3 +1,7 @@
+from services.metrics import STAGE_SECONDS
+
+
+@STAGE_SECONDS.timed(stage="analyze_topics")
 def analyze_topics(topics):
     """
     Analyze topics and return weak/strong categorization
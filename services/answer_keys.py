@@ -0,0 +1,270 @@
+"""
+Answer-key store for OMR scoring.
+
+Keys are identified by (exam_type, paper_code, set_code) and stored one
+row per question in SQLite (via database.connection), so exams with 90-200
+questions and many paper sets can be scored. Hot keys are served from an
+in-process LRU. Entries expire after a TTL so that OCR worker processes
+pick up re-imported keys. Each exam has a marking scheme for negative
+marking.
+"""
+
+import csv
+import io
+import logging
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from config import settings
+from database import connection
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class MarkingScheme:
+    """Marks awarded per correct, wrong and unanswered question"""
+    correct: float = 1.0
+    wrong: float = 0.0
+    unanswered: float = 0.0
+
+
+# Used when an exam has no scheme stored in the database
+DEFAULT_MARKING_SCHEMES = {
+    "jee mains": MarkingScheme(correct=4, wrong=-1),
+    "jee advanced": MarkingScheme(correct=3, wrong=-1),
+    "neet": MarkingScheme(correct=4, wrong=-1),
+}
+DEFAULT_MARKING_SCHEME = MarkingScheme()
+
+# Paper/set looked up when a request does not name one
+DEFAULT_PAPER_CODE = "DEFAULT"
+DEFAULT_SET_CODE = "A"
+
+
+@dataclass
+class AnswerKey:
+    """Correct answers for one paper set, by question number"""
+    exam_type: str
+    paper_code: str
+    set_code: str
+    answers: Dict[int, str]
+    scheme: MarkingScheme
+
+
+def _normalize(exam_type: str, paper_code: str, set_code: str) -> Tuple[str, str, str]:
+    return (
+        (exam_type or "").strip(),
+        (paper_code or DEFAULT_PAPER_CODE).strip().upper(),
+        (set_code or DEFAULT_SET_CODE).strip().upper()
+    )
+
+
+class AnswerKeyStore:
+    """
+    SQLite-backed answer keys with an LRU of recently used keys.
+    """
+
+    def __init__(self, cache_size: int, ttl_seconds: float):
+        self.cache_size = cache_size
+        self.ttl_seconds = ttl_seconds
+        self._cache: "OrderedDict[Tuple[str, str, str], tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._schema_ready = False
+
+    def _ensure_schema(self, conn) -> None:
+        if self._schema_ready:
+            return
+        conn.executescript("""
+            CREATE TABLE IF NOT EXISTS answer_keys (
+                exam_type TEXT NOT NULL COLLATE NOCASE,
+                paper_code TEXT NOT NULL,
+                set_code TEXT NOT NULL,
+                question_num INTEGER NOT NULL,
+                answer TEXT NOT NULL,
+                PRIMARY KEY (exam_type, paper_code, set_code, question_num)
+            ) WITHOUT ROWID;
+            CREATE TABLE IF NOT EXISTS marking_schemes (
+                exam_type TEXT PRIMARY KEY COLLATE NOCASE,
+                correct REAL NOT NULL,
+                wrong REAL NOT NULL,
+                unanswered REAL NOT NULL
+            );
+        """)
+        self._schema_ready = True
+
+    def _cache_key(self, exam_type: str, paper_code: str, set_code: str) -> Tuple[str, str, str]:
+        return (exam_type.lower(), paper_code, set_code)
+
+    def _invalidate(self, exam_type: Optional[str] = None) -> None:
+        """Drop cached keys, for one exam or all of them."""
+        with self._lock:
+            if exam_type is None:
+                self._cache.clear()
+                return
+            for cache_key in [k for k in self._cache if k[0] == exam_type.strip().lower()]:
+                del self._cache[cache_key]
+
+    def get(self, exam_type: str, paper_code: Optional[str] = None, set_code: Optional[str] = None) -> Optional[AnswerKey]:
+        """Return the answer key for a paper set, or None if none is stored."""
+        exam_type, paper_code, set_code = _normalize(exam_type, paper_code, set_code)
+        cache_key = self._cache_key(exam_type, paper_code, set_code)
+        now = time.time()
+
+        with self._lock:
+            entry = self._cache.get(cache_key)
+            if entry is not None:
+                key, loaded_at = entry
+                if now - loaded_at < self.ttl_seconds:
+                    self._cache.move_to_end(cache_key)
+                    return key
+                del self._cache[cache_key]
+
+        with connection() as conn:
+            self._ensure_schema(conn)
+            rows = conn.execute(
+                "SELECT exam_type, question_num, answer FROM answer_keys "
+                "WHERE exam_type = ? AND paper_code = ? AND set_code = ? ORDER BY question_num",
+                (exam_type, paper_code, set_code)
+            ).fetchall()
+            scheme = self._load_scheme(conn, exam_type)
+
+        if not rows:
+            return None
+        key = AnswerKey(
+            exam_type=rows[0]["exam_type"],
+            paper_code=paper_code,
+            set_code=set_code,
+            answers={row["question_num"]: row["answer"] for row in rows},
+            scheme=scheme
+        )
+        with self._lock:
+            self._cache[cache_key] = (key, now)
+            self._cache.move_to_end(cache_key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return key
+
+    def _load_scheme(self, conn, exam_type: str) -> MarkingScheme:
+        row = conn.execute(
+            "SELECT correct, wrong, unanswered FROM marking_schemes WHERE exam_type = ?",
+            (exam_type,)
+        ).fetchone()
+        if row is not None:
+            return MarkingScheme(row["correct"], row["wrong"], row["unanswered"])
+        return DEFAULT_MARKING_SCHEMES.get(exam_type.lower(), DEFAULT_MARKING_SCHEME)
+
+    def marking_scheme(self, exam_type: str) -> MarkingScheme:
+        """Marking scheme for an exam (stored, built-in default, or +1/0/0)."""
+        with connection() as conn:
+            self._ensure_schema(conn)
+            return self._load_scheme(conn, (exam_type or "").strip())
+
+    def set_marking_scheme(self, exam_type: str, scheme: MarkingScheme) -> None:
+        """Store the marking scheme for an exam."""
+        with connection() as conn:
+            self._ensure_schema(conn)
+            with conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO marking_schemes (exam_type, correct, wrong, unanswered) "
+                    "VALUES (?, ?, ?, ?)",
+                    (exam_type.strip(), scheme.correct, scheme.wrong, scheme.unanswered)
+                )
+        self._invalidate(exam_type)
+
+    def import_rows(self, rows: Iterable[Tuple[str, str, str, int, str]]) -> Dict[str, int]:
+        """
+        Bulk import (exam_type, paper_code, set_code, question_num, answer)
+        rows in one transaction. Every key present in the import replaces
+        the stored key of the same name.
+        """
+        keys: Dict[Tuple[str, str, str], List[Tuple[int, str]]] = {}
+        for exam_type, paper_code, set_code, question_num, answer in rows:
+            ident = _normalize(exam_type, paper_code, set_code)
+            if not ident[0]:
+                raise ValueError("exam_type is required for every answer")
+            answer = str(answer).strip().upper()
+            if not answer:
+                raise ValueError(f"Empty answer for question {question_num} of {'/'.join(ident)}")
+            keys.setdefault(ident, []).append((int(question_num), answer))
+
+        with connection() as conn:
+            self._ensure_schema(conn)
+            with conn:
+                conn.executemany(
+                    "DELETE FROM answer_keys WHERE exam_type = ? AND paper_code = ? AND set_code = ?",
+                    list(keys)
+                )
+                conn.executemany(
+                    "INSERT OR REPLACE INTO answer_keys "
+                    "(exam_type, paper_code, set_code, question_num, answer) VALUES (?, ?, ?, ?, ?)",
+                    [ident + answer for ident, answers in keys.items() for answer in answers]
+                )
+
+        for exam_type in {ident[0] for ident in keys}:
+            self._invalidate(exam_type)
+        count = sum(len(answers) for answers in keys.values())
+        logger.info(f"Imported {len(keys)} answer keys ({count} answers)")
+        return {"keys": len(keys), "answers": count}
+
+    def import_csv(self, text: str) -> Dict[str, int]:
+        """
+        Import CSV with a header row:
+        exam_type,paper_code,set_code,question,answer
+        """
+        reader = csv.DictReader(io.StringIO(text))
+        required = {"exam_type", "paper_code", "set_code", "question", "answer"}
+        missing = required - set(reader.fieldnames or [])
+        if missing:
+            raise ValueError(f"CSV is missing columns: {', '.join(sorted(missing))}")
+        try:
+            return self.import_rows(
+                (r["exam_type"], r["paper_code"], r["set_code"], int(r["question"]), r["answer"])
+                for r in reader
+            )
+        except (TypeError, ValueError) as e:
+            raise ValueError(f"Invalid CSV answer key: {e}")
+
+    def import_json(self, data: Any) -> Dict[str, int]:
+        """
+        Import one key object or a list of them:
+        {"exam_type": "JEE Mains", "paper_code": "P1", "set_code": "A",
+         "answers": {"1": "A", ...} or ["A", "B", ...],
+         "marking_scheme": {"correct": 4, "wrong": -1, "unanswered": 0}}
+        Null or empty answers are skipped; other answers must be strings.
+        """
+        entries = data if isinstance(data, list) else [data]
+        rows = []
+        schemes = {}
+        try:
+            for entry in entries:
+                ident = (entry["exam_type"], entry.get("paper_code"), entry.get("set_code"))
+                if not isinstance(ident[0], str) or not all(isinstance(c, (str, type(None))) for c in ident[1:]):
+                    raise ValueError("exam_type, paper_code and set_code must be strings")
+                answers = entry["answers"]
+                if isinstance(answers, list):
+                    answers = dict(enumerate(answers, 1))
+                for q, a in answers.items():
+                    if not a:
+                        continue
+                    if not isinstance(a, str):
+                        raise ValueError(f"answer for question {q} must be a string, got {a!r}")
+                    rows.append(ident + (int(q), a))
+                if entry.get("marking_scheme"):
+                    schemes[entry["exam_type"]] = MarkingScheme(**entry["marking_scheme"])
+        except (KeyError, TypeError, ValueError, AttributeError) as e:
+            raise ValueError(f"Invalid JSON answer key: {e}")
+
+        result = self.import_rows(rows)
+        for exam_type, scheme in schemes.items():
+            self.set_marking_scheme(exam_type, scheme)
+        return result
+
+
+answer_key_store = AnswerKeyStore(
+    cache_size=settings.ANSWER_KEY_CACHE_SIZE,
+    ttl_seconds=settings.ANSWER_KEY_CACHE_TTL_SECONDS
+)
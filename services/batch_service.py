@@ -0,0 +1,134 @@
+"""
+Batch analysis for whole-classroom mock test ingestion.
+
+Student payloads are grouped into chunks and fanned out across a process
+pool. Each worker process keeps one StudyAgent per exam type and reuses it
+for every student it analyzes, so weightage tables are only derived once
+per worker. Reports are streamed back in completion order, unformatted,
+for services/report_serializer.py to encode directly.
+"""
+
+import asyncio
+import logging
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, AsyncIterator, Dict, List
+
+from config import settings
+from services.study_agent import StudyAgent
+
+logger = logging.getLogger(__name__)
+
+_pool = None
+
+# Per-worker-process agents, keyed by exam type
+_worker_agents: Dict[str, StudyAgent] = {}
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    """Lazily start the shared analysis process pool."""
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(max_workers=settings.BATCH_WORKERS or None)
+    return _pool
+
+
+def _analyze_chunk(payloads: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Analyze a chunk of students inside a worker process."""
+    results = []
+    for payload in payloads:
+        exam_type = payload.get('exam_type') or 'JEE Mains'
+        agent = _worker_agents.get(exam_type)
+        if agent is None:
+            agent = _worker_agents[exam_type] = StudyAgent(exam_type=exam_type, engine=settings.ANALYSIS_ENGINE)
+        try:
+            report = agent.generate_report(payload, payload.get('student_name') or 'Student', formatted=False)
+            results.append({"student_id": payload.get('student_id'), "report": report})
+        except Exception as e:
+            results.append({"student_id": payload.get('student_id'), "error": str(e)})
+    return results
+
+
+class BatchJob:
+    """
+    One batch analysis run.
+    Payloads can be submitted while they are still being received; chunks
+    start on the pool as soon as they are full.
+    """
+
+    def __init__(self, chunk_size: int = 0):
+        self.chunk_size = chunk_size or settings.BATCH_CHUNK_SIZE
+        self._pending: List[Dict[str, Any]] = []
+        # In-flight chunk future -> student ids in that chunk
+        self._chunks: Dict[asyncio.Future, List[Any]] = {}
+        self._started = time.perf_counter()
+        self.submitted = 0
+
+    def _flush(self) -> None:
+        if not self._pending:
+            return
+        loop = asyncio.get_running_loop()
+        future = loop.run_in_executor(_get_pool(), _analyze_chunk, self._pending)
+        self._chunks[future] = [p.get('student_id') for p in self._pending]
+        self._pending = []
+
+    def submit(self, payload: Dict[str, Any]) -> None:
+        """Queue one student payload (agent input format)."""
+        self._pending.append(payload)
+        self.submitted += 1
+        if len(self._pending) >= self.chunk_size:
+            self._flush()
+
+    def cancel(self) -> None:
+        """
+        Drop queued payloads and cancel chunks still waiting for a worker.
+        Chunks already running in a worker finish, but nobody reads them.
+        """
+        self._pending = []
+        cancelled = sum(future.cancel() for future in self._chunks)
+        if cancelled:
+            logger.info(f"Batch analysis cancelled with {cancelled} of {len(self._chunks)} chunks outstanding")
+
+    async def results(self) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Yield per-student results as chunks finish, then a final summary
+        with total throughput. If the consumer stops early (the client
+        disconnected), outstanding chunks are cancelled.
+        """
+        self._flush()
+        completed = 0
+        failed = 0
+
+        pending = set(self._chunks)
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for future in done:
+                    try:
+                        chunk_results = future.result()
+                    except Exception as e:
+                        logger.error(f"Batch chunk failed: {e}")
+                        chunk_results = [
+                            {"student_id": student_id, "error": f"Worker failed: {str(e)}"}
+                            for student_id in self._chunks[future]
+                        ]
+                    for result in chunk_results:
+                        completed += 1
+                        if "error" in result:
+                            failed += 1
+                        yield result
+        finally:
+            if pending:
+                self.cancel()
+
+        elapsed = time.perf_counter() - self._started
+        logger.info(f"Batch analysis finished: {completed} students in {elapsed:.2f}s")
+        yield {
+            "summary": {
+                "submitted": self.submitted,
+                "completed": completed,
+                "failed": failed,
+                "elapsed_seconds": round(elapsed, 3),
+                "reports_per_second": round(completed / elapsed, 1) if elapsed > 0 else 0.0
+            }
+        }
@@ -0,0 +1,139 @@
+"""
+Answer cache for the AI coach chat.
+
+Student questions are normalized (case, punctuation, stopwords, token set)
+so "What is the Carnot cycle?" and "carnot cycle - what is it" share one
+entry. Lookups try the exact normalized key first and then the closest
+cached question by token-set (Jaccard) similarity, using an inverted
+token index to find candidates.
+"""
+
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Set
+
+from config import settings
+
+STOPWORDS = frozenset({
+    "a", "an", "the", "is", "are", "was", "were", "be", "been", "am",
+    "i", "me", "my", "we", "you", "your", "it", "its", "this", "that",
+    "what", "which", "who", "whom", "how", "why", "when", "where",
+    "do", "does", "did", "can", "could", "should", "would", "will",
+    "of", "in", "on", "at", "to", "for", "with", "about", "and", "or",
+    "please", "tell", "explain", "simply", "briefly", "give", "some"
+})
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+def normalize_question(message: str) -> str:
+    """Reduce a chat message to its sorted set of meaningful tokens."""
+    tokens = _TOKEN_RE.findall(message.lower())
+    return " ".join(sorted({t for t in tokens if t not in STOPWORDS}))
+
+
+class ChatCache:
+    """
+    LRU chat answer cache with per-entry TTL and fuzzy token-set lookup.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float, min_similarity: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.min_similarity = min_similarity
+        # normalized question -> (reply, expires_at or None)
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        # token -> normalized questions containing it
+        self._index: Dict[str, Set[str]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _drop(self, key: str) -> None:
+        del self._entries[key]
+        for token in key.split():
+            keys = self._index.get(token)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._index[token]
+
+    def _best_match(self, key: str) -> Optional[str]:
+        """Find the cached question most similar to key, above the threshold."""
+        tokens = set(key.split())
+        candidates: Set[str] = set()
+        for token in tokens:
+            candidates.update(self._index.get(token, ()))
+
+        best, best_score = None, self.min_similarity
+        for candidate in candidates:
+            other = set(candidate.split())
+            score = len(tokens & other) / len(tokens | other)
+            if score >= best_score:
+                best, best_score = candidate, score
+        return best
+
+    def get(self, message: str) -> Optional[str]:
+        """Return a cached reply for message, or None on a miss."""
+        key = normalize_question(message)
+        now = time.time()
+
+        with self._lock:
+            if key:
+                match = key if key in self._entries else self._best_match(key)
+                if match is not None:
+                    reply, expires_at = self._entries[match]
+                    if expires_at is None or expires_at > now:
+                        self._entries.move_to_end(match)
+                        self.hits += 1
+                        return reply
+                    self._drop(match)
+            self.misses += 1
+            return None
+
+    def put(self, message: str, reply: str, ttl_seconds: Optional[float] = -1) -> None:
+        """
+        Cache reply for message.
+        ttl_seconds=-1 uses the cache default; None never expires.
+        """
+        key = normalize_question(message)
+        if not key or not reply:
+            return
+        if ttl_seconds == -1:
+            ttl_seconds = self.ttl_seconds
+        expires_at = None if ttl_seconds is None else time.time() + ttl_seconds
+
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = (reply, expires_at)
+            for token in key.split():
+                self._index.setdefault(token, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                self._drop(next(iter(self._entries)))
+
+    def seed(self, replies: Dict[str, str]) -> None:
+        """Preload question -> reply pairs that never expire."""
+        for message, reply in replies.items():
+            self.put(message, reply, ttl_seconds=None)
+
+    def stats(self) -> Dict[str, float]:
+        """Hit rate and size; every hit is one Gemini call saved."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "gemini_calls_saved": self.hits,
+                "entries": len(self._entries)
+            }
+
+
+chat_cache = ChatCache(
+    max_entries=settings.CHAT_CACHE_SIZE,
+    ttl_seconds=settings.CHAT_CACHE_TTL_SECONDS,
+    min_similarity=settings.CHAT_CACHE_MIN_SIMILARITY
+)
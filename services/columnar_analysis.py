@@ -0,0 +1,143 @@
+"""
+Columnar (NumPy) engine for StudyAgent.analyze_errors.
+
+Questions are loaded into flat arrays - topic and subtopic codes,
+is_correct, time spent and a hard-difficulty flag - and every per-topic
+and per-subtopic statistic is computed with grouped reductions
+(np.bincount / np.unique). The result is identical to the pure-Python
+StudyAgent.analyze_errors output, including dict ordering.
+"""
+
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Tuple
+
+import numpy as np
+
+from services.study_agent import (
+    TopicAnalysis,
+    TopicStrength,
+    patterns_from_counts,
+)
+
+# Upper accuracy bounds (inclusive) for each strength class
+_STRENGTH_BOUNDS = np.array([40.0, 60.0, 75.0])
+_STRENGTHS = [
+    TopicStrength.VERY_WEAK,
+    TopicStrength.WEAK,
+    TopicStrength.MODERATE,
+    TopicStrength.STRONG,
+]
+
+
+@dataclass
+class QuestionColumns:
+    """Struct-of-arrays view of a question list"""
+    topic_keys: List[str]
+    topic_meta: List[Tuple[str, str]]
+    subtopic_names: List[str]
+    topic_codes: np.ndarray
+    subtopic_codes: np.ndarray
+    is_correct: np.ndarray
+    time_spent: np.ndarray
+    is_hard: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.topic_codes)
+
+    @classmethod
+    def from_questions(cls, questions: Iterable[Any]) -> "QuestionColumns":
+        """Build columns from objects with Question attributes."""
+        questions = list(questions)
+        n = len(questions)
+
+        topic_index: Dict[str, int] = {}
+        topic_codes = np.fromiter(
+            (topic_index.setdefault(f"{q.subject}:{q.topic}", len(topic_index)) for q in questions),
+            dtype=np.int64, count=n
+        )
+        subtopic_index: Dict[str, int] = {}
+        subtopic_codes = np.fromiter(
+            (subtopic_index.setdefault(q.subtopic, len(subtopic_index)) for q in questions),
+            dtype=np.int64, count=n
+        )
+        # Subject/topic names from each topic's first question
+        _, first_index = np.unique(topic_codes, return_index=True)
+        topic_meta = [(questions[i].subject, questions[i].topic) for i in first_index.tolist()]
+
+        return cls(
+            topic_keys=list(topic_index),
+            topic_meta=topic_meta,
+            subtopic_names=list(subtopic_index),
+            topic_codes=topic_codes,
+            subtopic_codes=subtopic_codes,
+            is_correct=np.fromiter((bool(q.is_correct) for q in questions), dtype=bool, count=n),
+            time_spent=np.array([q.time_spent_seconds for q in questions]),
+            is_hard=np.fromiter((q.difficulty == 'hard' for q in questions), dtype=bool, count=n)
+        )
+
+
+def analyze_columns(columns: QuestionColumns) -> Dict[str, TopicAnalysis]:
+    """
+    Compute the per-topic TopicAnalysis map from question columns.
+    """
+    n_topics = len(columns.topic_keys)
+    if n_topics == 0:
+        return {}
+
+    tc = columns.topic_codes
+    wrong = ~columns.is_correct
+
+    # Per-topic reductions
+    totals = np.bincount(tc, minlength=n_topics)
+    correct = np.bincount(tc[columns.is_correct], minlength=n_topics)
+    time_sums = np.bincount(tc, weights=columns.time_spent, minlength=n_topics)
+    errors = totals - correct
+    slow_errors = np.bincount(tc[wrong & (columns.time_spent > 180)], minlength=n_topics)
+    hard_errors = np.bincount(tc[wrong & columns.is_hard], minlength=n_topics)
+
+    accuracy = correct / totals * 100
+    avg_time = time_sums / totals
+    strength_codes = np.searchsorted(_STRENGTH_BOUNDS, accuracy, side='left')
+
+    # Per-(topic, subtopic) reductions, kept in first-appearance order
+    n_sub = max(len(columns.subtopic_names), 1)
+    pairs = tc * n_sub + columns.subtopic_codes
+    unique_pairs, first_index, inverse, pair_totals = np.unique(
+        pairs, return_index=True, return_inverse=True, return_counts=True
+    )
+    pair_correct = np.bincount(inverse[columns.is_correct], minlength=len(unique_pairs))
+
+    subtopics: List[Dict[str, Dict]] = [{} for _ in range(n_topics)]
+    for i in np.argsort(first_index, kind='stable').tolist():
+        topic_code, sub_code = divmod(int(unique_pairs[i]), n_sub)
+        subtopics[topic_code][columns.subtopic_names[sub_code]] = {
+            'total': int(pair_totals[i]),
+            'correct': int(pair_correct[i])
+        }
+
+    result: Dict[str, TopicAnalysis] = {}
+    for code, key in enumerate(columns.topic_keys):
+        subject, topic = columns.topic_meta[code]
+
+        patterns = patterns_from_counts(
+            topic, int(errors[code]), int(slow_errors[code]), int(hard_errors[code])
+        )
+
+        result[key] = TopicAnalysis(
+            topic_name=topic,
+            subject=subject,
+            subtopics=subtopics[code],
+            total_questions=int(totals[code]),
+            correct_count=int(correct[code]),
+            accuracy_percentage=float(accuracy[code]),
+            strength_level=_STRENGTHS[int(strength_codes[code])],
+            error_patterns=patterns,
+            avg_time_per_question=float(avg_time[code])
+        )
+
+    return result
+
+
+def analyze_questions(questions: Iterable[Any]) -> Dict[str, TopicAnalysis]:
+    """Columnar equivalent of StudyAgent.analyze_errors for a question list."""
+    return analyze_columns(QuestionColumns.from_questions(questions))
@@ -0,0 +1,316 @@
+"""
+Client-side scheduling of Gemini calls against the API quota.
+
+Every async Gemini call goes through GeminiScheduler.run:
+
+- A token bucket refilled at GEMINI_REQUESTS_PER_MINUTE hands out request
+  slots, lowest priority number first (interactive chat, then plans, then
+  batch jobs). A 429 halves the refill rate; successful calls raise it back
+  towards the quota.
+- 429s, 5xx responses and connection errors are retried with full-jitter
+  exponential backoff while the process-wide retry budget lasts. Each call
+  earns GEMINI_RETRY_BUDGET_RATIO retries, so under a sustained outage
+  retries add at most that fraction of extra load.
+- A circuit breaker opens after GEMINI_BREAKER_FAILURES consecutive
+  5xx, timeout or connection failures. While it is open calls fail at once with CircuitOpenError, so
+  routes serve their fallbacks without waiting for a timeout. One probe
+  call is let through every GEMINI_BREAKER_COOLDOWN_SECONDS.
+"""
+
+import asyncio
+import heapq
+import itertools
+import logging
+import random
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+import httpx
+from google.genai import errors
+
+from config import settings
+from services.metrics import Counter
+
+logger = logging.getLogger(__name__)
+
+PRIORITY_CHAT = 0
+PRIORITY_PLAN = 1
+PRIORITY_BATCH = 2
+PRIORITY_NAMES = {PRIORITY_CHAT: "chat", PRIORITY_PLAN: "plan", PRIORITY_BATCH: "batch"}
+
+TRANSIENT_STATUS = frozenset({429, 500, 502, 503, 504})
+
+GEMINI_RETRIES = Counter("gemini_retries_total", "Gemini calls retried after a transient failure", ("call",))
+GEMINI_REJECTED = Counter(
+    "gemini_rejected_total", "Gemini calls failed fast without a request (circuit_open or queue_timeout)", ("reason",)
+)
+
+
+class CircuitOpenError(Exception):
+    """Gemini is failing; the call was not attempted."""
+
+
+class QueueTimeoutError(Exception):
+    """No request slot became free within GEMINI_QUEUE_TIMEOUT_SECONDS."""
+
+
+def is_transient(error: BaseException) -> bool:
+    """Whether a failure is worth retrying (429s, 5xx, timeouts, connection errors)."""
+    if isinstance(error, errors.APIError):
+        return error.code in TRANSIENT_STATUS
+    return isinstance(error, (asyncio.TimeoutError, httpx.TransportError, ConnectionError))
+
+
+class TokenBucket:
+    """
+    Async token bucket with prioritized waiters and an adjustable rate.
+    Waiters are served in (priority, arrival) order as tokens refill.
+    """
+
+    def __init__(self, rate_per_second: float, burst: int):
+        self.max_rate = rate_per_second
+        self.min_rate = rate_per_second / 16
+        self.rate = rate_per_second
+        self.burst = burst
+        self.tokens = float(burst)
+        self._updated = time.monotonic()
+        self._waiters: List[Tuple[int, int, asyncio.Future]] = []
+        self._order = itertools.count()
+        self._timer = None
+        self._timer_loop = None
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self, priority: int) -> None:
+        """Wait for a token; higher priority (lower number) waiters go first."""
+        self._refill()
+        if not self._waiters and self.tokens >= 1:
+            self.tokens -= 1
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._order), future))
+        self._schedule()
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # Granted just as the waiter gave up: hand the token back
+                self.release()
+            raise
+
+    def release(self) -> None:
+        """Hand back an acquired token that was not used for a request."""
+        self.tokens += 1
+        self._grant()
+
+    def _schedule(self) -> None:
+        loop = asyncio.get_running_loop()
+        # A timer left on another (finished) event loop would never fire
+        if self._waiters and (self._timer is None or self._timer_loop is not loop):
+            delay = max(0.0, (1 - self.tokens) / self.rate)
+            self._timer = loop.call_later(delay, self._on_timer)
+            self._timer_loop = loop
+
+    def _on_timer(self) -> None:
+        self._timer = None
+        self._grant()
+
+    def _grant(self) -> None:
+        self._refill()
+        while self._waiters and self.tokens >= 1:
+            _, _, future = heapq.heappop(self._waiters)
+            if future.done():
+                continue
+            self.tokens -= 1
+            future.set_result(None)
+        while self._waiters and self._waiters[0][2].done():
+            heapq.heappop(self._waiters)
+        self._schedule()
+
+    def throttle(self) -> None:
+        """Halve the refill rate after a 429."""
+        self._refill()
+        self.rate = max(self.min_rate, self.rate / 2)
+
+    def recover(self) -> None:
+        """Step the refill rate back towards the quota after a success."""
+        if self.rate < self.max_rate:
+            self._refill()
+            self.rate = min(self.max_rate, self.rate + self.max_rate / 20)
+
+    def queued(self) -> Dict[str, int]:
+        counts = {name: 0 for name in PRIORITY_NAMES.values()}
+        for priority, _, future in self._waiters:
+            if not future.done():
+                counts[PRIORITY_NAMES.get(priority, str(priority))] += 1
+        return counts
+
+
+class RetryBudget:
+    """Retries are earned per call (ratio) and banked up to a maximum."""
+
+    def __init__(self, ratio: float, maximum: float):
+        self.ratio = ratio
+        self.maximum = maximum
+        self.balance = maximum
+
+    def deposit(self) -> None:
+        self.balance = min(self.maximum, self.balance + self.ratio)
+
+    def withdraw(self) -> bool:
+        if self.balance >= 1:
+            self.balance -= 1
+            return True
+        return False
+
+
+class CircuitBreaker:
+    """
+    closed -> open after `threshold` consecutive failures; open -> one probe
+    call per cooldown; a successful probe closes it again.
+    """
+
+    def __init__(self, threshold: int, cooldown_seconds: float):
+        self.threshold = threshold
+        self.cooldown_seconds = cooldown_seconds
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+        self.trips = 0
+
+    @property
+    def is_open(self) -> bool:
+        """Open and not yet due for a probe."""
+        return self.state == "open" and time.monotonic() - self.opened_at < self.cooldown_seconds
+
+    def allow(self) -> bool:
+        if self.state == "closed":
+            return True
+        if time.monotonic() - self.opened_at >= self.cooldown_seconds:
+            # Let one probe through; another is allowed only after a further
+            # cooldown, so a probe that never reports back cannot wedge it
+            self.state = "half_open"
+            self.opened_at = time.monotonic()
+            return True
+        return False
+
+    def record_success(self) -> None:
+        if self.state != "closed":
+            logger.info("Gemini circuit breaker closed")
+        self.state = "closed"
+        self.failures = 0
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self.state == "half_open" or (self.state == "closed" and self.failures >= self.threshold):
+            if self.state == "closed":
+                logger.warning(f"Gemini circuit breaker opened after {self.failures} consecutive failures")
+                self.trips += 1
+            self.state = "open"
+            self.opened_at = time.monotonic()
+
+
+class GeminiScheduler:
+    """Rate limiting, retries and circuit breaking for async Gemini calls."""
+
+    def __init__(self):
+        self.bucket = TokenBucket(settings.GEMINI_REQUESTS_PER_MINUTE / 60, settings.GEMINI_BURST)
+        self.budget = RetryBudget(settings.GEMINI_RETRY_BUDGET_RATIO, settings.GEMINI_RETRY_BUDGET_MAX)
+        self.breaker = CircuitBreaker(settings.GEMINI_BREAKER_FAILURES, settings.GEMINI_BREAKER_COOLDOWN_SECONDS)
+        self.calls = 0
+        self.retries = 0
+
+    def _reject(self, reason: str, error: Exception) -> None:
+        GEMINI_REJECTED.inc(reason=reason)
+        raise error
+
+    def _record_failure(self, e: Exception) -> None:
+        if not is_transient(e):
+            # Gemini answered (e.g. 400), so it is reachable
+            self.breaker.record_success()
+        elif isinstance(e, errors.APIError) and e.code == 429:
+            # Over quota rather than down: slow down, don't trip the breaker
+            self.bucket.throttle()
+        else:
+            self.breaker.record_failure()
+
+    def stream_finished(self, error: Optional[Exception] = None) -> None:
+        """
+        Report how a stream opened with run(..., stream=True) ended, so a
+        stream that breaks after its first chunk counts against the breaker.
+        """
+        if error is None:
+            self.breaker.record_success()
+        else:
+            self._record_failure(error)
+
+    async def run(self, request: Callable[[], Awaitable[Any]], priority: int, call: str, stream: bool = False) -> Any:
+        """
+        Make one Gemini request, request() being a coroutine function that
+        sends it, retrying transient failures. Raises CircuitOpenError or
+        QueueTimeoutError without contacting Gemini. For a stream, success
+        is only recorded once the caller reports the end with stream_finished.
+        """
+        self.calls += 1
+        self.budget.deposit()
+        attempt = 0
+        while True:
+            if self.breaker.is_open:
+                self._reject("circuit_open", CircuitOpenError("Gemini circuit breaker is open"))
+            try:
+                await asyncio.wait_for(self.bucket.acquire(priority), timeout=settings.GEMINI_QUEUE_TIMEOUT_SECONDS)
+            except asyncio.TimeoutError:
+                self._reject("queue_timeout", QueueTimeoutError(
+                    f"No Gemini request slot within {settings.GEMINI_QUEUE_TIMEOUT_SECONDS}s"
+                ))
+            # The breaker may have opened while this call was queued; the
+            # token goes back to the next waiter, as no request is sent
+            if not self.breaker.allow():
+                self.bucket.release()
+                self._reject("circuit_open", CircuitOpenError("Gemini circuit breaker is open"))
+
+            try:
+                result = await request()
+            except Exception as e:
+                self._record_failure(e)
+                if not is_transient(e):
+                    raise
+                # Timeouts already waited the full GEMINI_TIMEOUT_SECONDS
+                if (isinstance(e, asyncio.TimeoutError) or attempt >= settings.GEMINI_MAX_RETRIES
+                        or self.breaker.state != "closed" or not self.budget.withdraw()):
+                    raise
+                attempt += 1
+                self.retries += 1
+                GEMINI_RETRIES.inc(call=call)
+                delay = random.uniform(0, min(settings.GEMINI_BACKOFF_MAX_SECONDS,
+                                              settings.GEMINI_BACKOFF_BASE_SECONDS * 2 ** attempt))
+                logger.warning(f"Gemini {call} call failed ({e}); retry {attempt} in {delay:.2f}s")
+                await asyncio.sleep(delay)
+                continue
+
+            if not stream:
+                self.breaker.record_success()
+            self.bucket.recover()
+            return result
+
+    def stats(self) -> Dict[str, Any]:
+        self.bucket._refill()
+        return {
+            "requests_per_minute": round(self.bucket.rate * 60, 1),
+            "quota_per_minute": round(self.bucket.max_rate * 60, 1),
+            "tokens": round(self.bucket.tokens, 2),
+            "queued": self.bucket.queued(),
+            "calls": self.calls,
+            "retries": self.retries,
+            "retry_budget": round(self.budget.balance, 2),
+            "circuit": self.breaker.state,
+            "circuit_trips": self.breaker.trips,
+            "rejected": {reason: int(GEMINI_REJECTED.value(reason=reason)) for reason in ("circuit_open", "queue_timeout")}
+        }
+
+
+scheduler = GeminiScheduler()
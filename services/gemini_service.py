@@ -1,6 +1,17 @@
 import os
+import asyncio
+import contextvars
+import time
+from contextlib import contextmanager
 from google import genai
+from google.genai import types
 from config import settings
+from models.schemas import PlanBatchEntry, PlanDay
+from services.gemini_scheduler import scheduler, PRIORITY_BATCH, PRIORITY_CHAT, PRIORITY_PLAN
+from services.json_stream import JsonArrayParser
+from services.metrics import GEMINI_COALESCED, GEMINI_FAILURES, GEMINI_SECONDS, PLAN_PARSES
+from services.plan_cache import plan_cache, make_plan_key
+from services.chat_cache import chat_cache
 import logging
 
 logger = logging.getLogger(__name__)
@@ -12,7 +23,8 @@ if not settings.GEMINI_API_KEY:
 
 # Create Gemini client (NEW SDK)
 try:
-    client = genai.Client(api_key=settings.GEMINI_API_KEY)
+    http_options = types.HttpOptions(base_url=settings.GEMINI_BASE_URL) if settings.GEMINI_BASE_URL else None
+    client = genai.Client(api_key=settings.GEMINI_API_KEY, http_options=http_options)
 except Exception as e:
     logger.error(f"Failed to create Gemini client: {e}")
     client = None
@@ -21,89 +33,671 @@ except Exception as e:
 # gemini-2.0-flash is the latest stable model that works with the new SDK
 GEMINI_MODEL = "gemini-2.0-flash"
 
+PLAN_DAYS = 7
+
+# Plans are requested in JSON mode, constrained to a list of PlanDay
+PLAN_CONFIG = types.GenerateContentConfig(
+    response_mime_type="application/json",
+    response_schema=list[PlanDay]
+)
+
+# Batched plans: one PlanBatchEntry per job
+PLAN_BATCH_CONFIG = types.GenerateContentConfig(
+    response_mime_type="application/json",
+    response_schema=list[PlanBatchEntry]
+)
+
+
+_gemini_semaphore = None
+
+
+def _get_semaphore():
+    """Lazily create the semaphore bounding concurrent async Gemini calls."""
+    global _gemini_semaphore
+    if _gemini_semaphore is None:
+        _gemini_semaphore = asyncio.Semaphore(settings.GEMINI_MAX_CONCURRENCY)
+    return _gemini_semaphore
+
+
+class SingleFlight:
+    """
+    Shares one in-flight Gemini call between concurrent identical requests.
+    The first request for a key starts the call as a task; requests for the
+    same key arriving before it finishes join that task and get the same
+    result or exception. A caller that disconnects does not cancel the call
+    for the others. The call runs in a fresh context, so it never uses the
+    starting request's pooled database connection after that request has
+    released it - it opens its own. Nothing is kept once the call finishes - repeat requests
+    are served by the plan and chat caches.
+    """
+
+    def __init__(self, call):
+        self.call = call
+        self._flights = {}
+        self.started = 0
+        self.coalesced = 0
+
+    def join(self, key, start):
+        """
+        The in-flight (task, progress) for key. If there is none, start()
+        returns a coroutine and its progress object and the coroutine is
+        run as the new flight.
+        """
+        flight = self._flights.get(key)
+        if flight is not None and flight[0].get_loop() is asyncio.get_running_loop():
+            self.coalesced += 1
+            GEMINI_COALESCED.inc(call=self.call)
+            return flight
+
+        coro, progress = start()
+        task = asyncio.get_running_loop().create_task(coro, context=contextvars.Context())
+        flight = self._flights[key] = (task, progress)
+        self.started += 1
+        task.add_done_callback(lambda done: self._finished(key, done))
+        return flight
+
+    async def do(self, key, start):
+        """Await the shared result of the coroutine start() for key."""
+        task, _ = self.join(key, lambda: (start(), None))
+        return await asyncio.shield(task)
+
+    def _finished(self, key, task):
+        if self._flights.get(key, (None,))[0] is task:
+            del self._flights[key]
+        if not task.cancelled():
+            # Mark the exception retrieved even if every caller went away
+            task.exception()
+
+    def stats(self):
+        requests = self.started + self.coalesced
+        return {
+            "requests": requests,
+            "gemini_calls": self.started,
+            "coalesced": self.coalesced,
+            "coalesce_rate": round(self.coalesced / requests, 4) if requests else 0.0,
+            "in_flight": len(self._flights)
+        }
+
+
+# Concurrent identical plan prompts (same plan cache key) and context-free
+# chat prompts share one Gemini call
+_plan_flights = SingleFlight("plan")
+_chat_flights = SingleFlight("chat")
+
+
+def coalescing_stats():
+    """Requests coalesced onto an identical in-flight Gemini call, per call type."""
+    return {"plan": _plan_flights.stats(), "chat": _chat_flights.stats()}
+
+
+@contextmanager
+def _timed_call(call):
+    """Record a Gemini call's latency, and count it as failed if it raises."""
+    with GEMINI_SECONDS.time(call=call):
+        try:
+            yield
+        except Exception:
+            GEMINI_FAILURES.inc(call=call)
+            raise
+
+
+async def _generate_content_async(prompt, call, config=None, priority=PRIORITY_PLAN):
+    """
+    Call Gemini through the async client, scheduled by the quota scheduler
+    (rate limit by priority, retries, circuit breaker).
+    At most GEMINI_MAX_CONCURRENCY calls are in flight at once and each
+    attempt is cancelled after GEMINI_TIMEOUT_SECONDS. call labels the metrics.
+    """
+    async def request():
+        async with _get_semaphore():
+            with _timed_call(call):
+                return await asyncio.wait_for(
+                    client.aio.models.generate_content(
+                        model=GEMINI_MODEL,
+                        contents=prompt,
+                        config=config
+                    ),
+                    timeout=settings.GEMINI_TIMEOUT_SECONDS
+                )
+
+    return await scheduler.run(request, priority, call)
+
+
+async def _next_chunk(chunks):
+    """The next streamed chunk, or None at the end of the stream."""
+    try:
+        return await asyncio.wait_for(chunks.__anext__(), timeout=settings.GEMINI_TIMEOUT_SECONDS)
+    except StopAsyncIteration:
+        return None
+
+
+async def _generate_content_stream(prompt, call, config=None, priority=PRIORITY_PLAN):
+    """
+    Stream a Gemini call's text chunks through the async client, with the
+    same scheduling and concurrency bound as _generate_content_async. Each
+    wait for the next chunk is bounded by GEMINI_TIMEOUT_SECONDS.
+    """
+    semaphore = _get_semaphore()
+
+    async def open_stream():
+        # The SDK sends the request on the first read, so a failed request
+        # surfaces here and can be retried before anything has been yielded
+        await semaphore.acquire()
+        started = time.perf_counter()
+        try:
+            stream = await asyncio.wait_for(
+                client.aio.models.generate_content_stream(
+                    model=GEMINI_MODEL,
+                    contents=prompt,
+                    config=config
+                ),
+                timeout=settings.GEMINI_TIMEOUT_SECONDS
+            )
+            chunks = stream.__aiter__()
+            first = await _next_chunk(chunks)
+        except BaseException as e:
+            semaphore.release()
+            if isinstance(e, Exception):
+                GEMINI_FAILURES.inc(call=call)
+            raise
+        return started, chunks, first
+
+    started, chunks, chunk = await scheduler.run(open_stream, priority, call, stream=True)
+    try:
+        while chunk is not None:
+            if chunk.text:
+                yield chunk.text
+            chunk = await _next_chunk(chunks)
+    except Exception as e:
+        GEMINI_FAILURES.inc(call=call)
+        scheduler.stream_finished(e)
+        raise
+    else:
+        scheduler.stream_finished()
+    finally:
+        semaphore.release()
+        GEMINI_SECONDS.observe(time.perf_counter() - started, call=call)
+
+
+def _topic_names(weak_topics):
+    return ", ".join([t["name"] for t in weak_topics]) if weak_topics else "General revision"
+
+
+def build_plan_prompt(weak_topics, exam):
+    """Build the 7-day plan prompt for the given weak topics and exam."""
+    return f"""You are an expert entrance exam coach for {exam}.
+
+Generate a personalized {PLAN_DAYS}-day revision plan based on these weak topics: {_topic_names(weak_topics)}
+
+Return exactly {PLAN_DAYS} days in order, one object per day."""
+
+
+def build_plan_batch_prompt(jobs):
+    """
+    Build one prompt asking for a 7-day plan per (weak_topics, exam) job;
+    jobs are numbered from 1 and the instructions are sent once.
+    """
+    lines = "\n".join(
+        f"Job {n}: {exam} - weak topics: {_topic_names(weak_topics)}"
+        for n, (weak_topics, exam) in enumerate(jobs, 1)
+    )
+
+    return f"""You are an expert entrance exam coach.
+
+Generate a personalized {PLAN_DAYS}-day revision plan for each job below, for its exam and weak topics:
+
+{lines}
+
+Return one entry per job with its job number and exactly {PLAN_DAYS} days in order."""
+
+
+def validate_plan_day(item):
+    """Validate one plan day against the PlanDay schema."""
+    return PlanDay.model_validate(item).model_dump()
+
+
+def _finish_plan(parser, days):
+    """Check that the whole plan arrived."""
+    parser.close()
+    if len(days) != PLAN_DAYS:
+        raise ValueError(f"Expected {PLAN_DAYS} plan days, got {len(days)}")
+
+
+def parse_plan_response(text):
+    """
+    Parse and validate a JSON-mode plan response.
+    Every response is counted as parsed or failed in PLAN_PARSES.
+    """
+    parser = JsonArrayParser()
+    try:
+        days = [validate_plan_day(item) for item in parser.feed(text or "")]
+        _finish_plan(parser, days)
+    except ValueError as e:
+        PLAN_PARSES.inc(outcome="failed")
+        raise ValueError(f"Invalid plan response: {str(e)}")
+    PLAN_PARSES.inc(outcome="ok")
+    return days
+
+
+def split_plan_batch(text, count):
+    """
+    Split a batched plan response into one plan per job (1..count).
+    Each entry is validated on its own: jobs whose entry is missing,
+    duplicated or invalid - or cut off by a truncated response - are None.
+    Every job is counted as parsed or failed in PLAN_PARSES.
+    """
+    plans = [None] * count
+    parser = JsonArrayParser()
+    try:
+        for item in parser.feed(text or ""):
+            try:
+                entry = PlanBatchEntry.model_validate(item)
+            except ValueError as e:
+                logger.warning(f"Invalid batched plan entry: {e}")
+                continue
+            if 1 <= entry.job <= count and plans[entry.job - 1] is None and len(entry.days) == PLAN_DAYS:
+                plans[entry.job - 1] = [day.model_dump() for day in entry.days]
+        parser.close()
+    except ValueError as e:
+        logger.warning(f"Batched plan response for {count} jobs ended early: {e}")
+
+    parsed = sum(plan is not None for plan in plans)
+    PLAN_PARSES.inc(parsed, outcome="ok")
+    PLAN_PARSES.inc(count - parsed, outcome="failed")
+    return plans
+
+
+def plan_parse_stats():
+    """Parsed and failed Gemini plan responses in this process."""
+    parsed = PLAN_PARSES.value(outcome="ok")
+    failed = PLAN_PARSES.value(outcome="failed")
+    total = parsed + failed
+    return {
+        "parsed": int(parsed),
+        "failed": int(failed),
+        "failure_rate": round(failed / total, 4) if total else 0.0
+    }
+
+
+def build_chat_prompt(message, weak_topics=None):
+    """Build the chat prompt, optionally with the student's weak topics."""
+    context = ""
+    if weak_topics:
+        context = "Student weak topics: " + ", ".join([t["name"] for t in weak_topics])
+
+    return f"""{context}
+
+You are a helpful AI exam coach. Answer the student's question clearly and concisely:
+
+Student question: {message}
+
+Provide a helpful, educational response."""
+
 
 def generate_plan(weak_topics, exam):
     """
     Generate a personalized 7-day study plan using Gemini AI.
     Returns structured JSON data that the frontend can parse.
     """
+    key = make_plan_key(exam, weak_topics, GEMINI_MODEL)
+    cached = plan_cache.get(key)
+    if cached is not None:
+        return cached
+
     if not client:
         raise Exception("Gemini client not initialized - check API key")
-    
-    topics = ", ".join([t["name"] for t in weak_topics]) if weak_topics else "General revision"
 
-    prompt = f"""You are an expert entrance exam coach for {exam}.
+    prompt = build_plan_prompt(weak_topics, exam)
+
+    try:
+        with _timed_call("plan"):
+            response = client.models.generate_content(
+                model=GEMINI_MODEL,
+                contents=prompt,
+                config=PLAN_CONFIG
+            )
+        plan = parse_plan_response(response.text)
+        plan_cache.put(key, exam, weak_topics, GEMINI_MODEL, plan)
+        return plan
+    except Exception as e:
+        logger.error(f"Error generating plan: {e}")
+        raise Exception(f"Failed to generate plan: {str(e)}")
+
+
+class _PlanFeed:
+    """Days of an in-flight plan, published as each one is validated"""
+
+    def __init__(self):
+        self.days = []
+        self.closed = False
+        self._event = asyncio.Event()
+
+    def publish(self, day):
+        self.days.append(day)
+        self._wake()
 
-Generate a personalized 7-day revision plan based on these weak topics: {topics}
+    def close(self):
+        self.closed = True
+        self._wake()
 
-Return ONLY a valid JSON array (no other text) with exactly 7 objects, each having these keys:
-- day: number (1-7)
-- title: string (short day title)
-- focus: string (main topic focus)
-- tasks: array of strings (3-4 study tasks)
-- time: string (e.g., "2 hours")
-- mcqs: number (practice questions count)
-- color: string (hex color like "#ff6b35")
-- light: string (light rgba like "rgba(255,107,53,0.08)")
+    def _wake(self):
+        self._event.set()
+        self._event = asyncio.Event()
 
-Example format:
-[
-  {{"day": 1, "title": "Foundation Day", "focus": "Topic Name", "tasks": ["Task 1", "Task 2"], "time": "2 hours", "mcqs": 10, "color": "#ff6b35", "light": "rgba(255,107,53,0.08)"}}
-]
+    async def follow(self):
+        """Yield every day, including those published before joining, until closed."""
+        sent = 0
+        while True:
+            event = self._event
+            while sent < len(self.days):
+                yield self.days[sent]
+                sent += 1
+            if self.closed:
+                return
+            await event.wait()
 
-JSON:"""
+
+async def _produce_plan(key, weak_topics, exam, feed, priority=PRIORITY_PLAN):
+    """
+    Run one streamed Gemini plan request, publishing validated days to feed,
+    and cache the complete plan. Shared by every caller of the same key.
+    """
+    parser = JsonArrayParser()
+    stream = _generate_content_stream(build_plan_prompt(weak_topics, exam), "plan", PLAN_CONFIG, priority)
 
     try:
-        response = client.models.generate_content(
-            model=GEMINI_MODEL,
-            contents=prompt
-        )
-        
-        # Extract the text response
-        text = response.text
-        
-        # Try to parse as JSON
-        import json
-        import re
-        
-        # Look for array pattern [...]
-        match = re.search(r'\[.*\]', text, re.DOTALL)
-        if match:
-            plan_data = json.loads(match.group())
-            return plan_data
-        else:
-            # If no array found, try parsing whole response
-            return json.loads(text)
+        try:
+            async for text in stream:
+                for item in parser.feed(text):
+                    feed.publish(validate_plan_day(item))
+        finally:
+            # Release the Gemini slot now, not when the stream is collected
+            await stream.aclose()
+        _finish_plan(parser, feed.days)
+    except ValueError as e:
+        PLAN_PARSES.inc(outcome="failed")
+        logger.error(f"Invalid plan response after {len(feed.days)} days: {e}")
+        raise ValueError(f"invalid plan response: {str(e)}")
+    except asyncio.TimeoutError:
+        logger.error(f"Plan generation timed out after {settings.GEMINI_TIMEOUT_SECONDS}s")
+        raise
+    finally:
+        feed.close()
+
+    PLAN_PARSES.inc(outcome="ok")
+    await plan_cache.put_async(key, exam, weak_topics, GEMINI_MODEL, feed.days)
+    return feed.days
+
+
+def _join_plan(key, weak_topics, exam, priority=PRIORITY_PLAN):
+    """
+    The in-flight (task, feed) generating the plan for key; a new request
+    is scheduled at priority.
+    """
+    def start():
+        feed = _PlanFeed()
+        return _produce_plan(key, weak_topics, exam, feed, priority), feed
+    return _plan_flights.join(key, start)
+
+
+def refine_plan(weak_topics, exam):
+    """
+    Generate the Gemini plan in the background, at batch priority, unless
+    it is already in flight. The plan is cached when it completes and
+    failures are only logged. Like every flight it runs in a fresh context,
+    so it caches through its own connection, not the request's.
+    """
+    if not client:
+        return
+    _join_plan(make_plan_key(exam, weak_topics, GEMINI_MODEL), weak_topics, exam, PRIORITY_BATCH)
+
+
+async def generate_plan_async(weak_topics, exam):
+    """
+    Async variant of generate_plan using the SDK's async client.
+    Does not hold a threadpool worker while waiting on Gemini; concurrent
+    requests for the same plan share one Gemini call.
+    """
+    key = make_plan_key(exam, weak_topics, GEMINI_MODEL)
+    cached = await plan_cache.get_async(key)
+    if cached is not None:
+        return cached
+
+    if not client:
+        raise Exception("Gemini client not initialized - check API key")
+
+    try:
+        task, _ = _join_plan(key, weak_topics, exam)
+        return list(await asyncio.shield(task))
+    except asyncio.TimeoutError:
+        raise Exception("Failed to generate plan: Gemini call timed out")
     except Exception as e:
         logger.error(f"Error generating plan: {e}")
         raise Exception(f"Failed to generate plan: {str(e)}")
 
 
-def chat_with_ai(message, weak_topics=None):
+async def generate_plan_stream(weak_topics, exam):
     """
-    Chat with Gemini AI. Returns a text response.
+    Streaming variant of generate_plan_async.
+    Yields each plan day, validated, as soon as Gemini has finished
+    generating it. The complete plan is cached; cached plans are yielded
+    straight away. A request joining an identical in-flight plan first gets
+    the days already generated, then follows the rest.
     """
+    key = make_plan_key(exam, weak_topics, GEMINI_MODEL)
+    cached = await plan_cache.get_async(key)
+    if cached is not None:
+        for day in cached:
+            yield day
+        return
+
     if not client:
         raise Exception("Gemini client not initialized - check API key")
-    
-    context = ""
-    if weak_topics:
-        context = "Student weak topics: " + ", ".join([t["name"] for t in weak_topics])
 
-    prompt = f"""{context}
+    try:
+        task, feed = _join_plan(key, weak_topics, exam)
+        async for day in feed.follow():
+            yield day
+        # Raise the plan's error, if it failed
+        await asyncio.shield(task)
+    except asyncio.TimeoutError:
+        raise Exception("Failed to generate plan: Gemini call timed out")
+    except Exception as e:
+        logger.error(f"Error streaming plan: {e}")
+        raise Exception(f"Failed to generate plan: {str(e)}")
 
-You are a helpful AI exam coach. Answer the student's question clearly and concisely:
 
-Student question: {message}
+async def _generate_plan_item(key, weak_topics, exam):
+    """One plan in its own Gemini call at batch priority, for a failed batch entry."""
+    response = await _generate_content_async(build_plan_prompt(weak_topics, exam), "plan", PLAN_CONFIG, priority=PRIORITY_BATCH)
+    plan = parse_plan_response(response.text)
+    await plan_cache.put_async(key, exam, weak_topics, GEMINI_MODEL, plan)
+    return plan
 
-Provide a helpful, educational response."""
 
+async def _generate_plan_chunk(chunk):
+    """
+    Generate the plans for chunk, a list of (key, weak_topics, exam), in one
+    batched Gemini call. Entries that fail validation are regenerated with
+    per-item calls. Returns (key, plan or None, source) per job.
+    """
     try:
-        response = client.models.generate_content(
-            model=GEMINI_MODEL,
-            contents=prompt
+        response = await _generate_content_async(
+            build_plan_batch_prompt([(weak_topics, exam) for _, weak_topics, exam in chunk]),
+            "plan_batch", PLAN_BATCH_CONFIG, priority=PRIORITY_BATCH
         )
+    except Exception as e:
+        # The call itself failed; per-item calls would hit the same problem
+        logger.error(f"Batched plan call for {len(chunk)} jobs failed: {e!r}")
+        return [(key, None, None) for key, _, _ in chunk]
+
+    plans = split_plan_batch(response.text, len(chunk))
+    results = []
+    retry = []
+    for job, plan in zip(chunk, plans):
+        if plan is None:
+            retry.append(job)
+            continue
+        key, weak_topics, exam = job
+        await plan_cache.put_async(key, exam, weak_topics, GEMINI_MODEL, plan)
+        results.append((key, plan, "batch"))
+
+    for (key, _, _), plan in zip(retry, await asyncio.gather(
+        *(_generate_plan_item(*job) for job in retry), return_exceptions=True
+    )):
+        if isinstance(plan, Exception):
+            logger.error(f"Per-item plan call failed: {plan}")
+            results.append((key, None, None))
+        else:
+            results.append((key, plan, "item"))
+    return results
+
+
+async def generate_plans_batch(jobs):
+    """
+    Generate plans for many (weak_topics, exam) jobs, e.g. a nightly
+    regeneration run. Identical jobs are generated once and cached plans
+    are reused; the rest are packed PLAN_BATCH_SIZE to a Gemini call at
+    batch priority.
+    Returns (plans, summary): plans aligned with jobs, None where
+    generation failed.
+    """
+    if not client:
+        raise Exception("Gemini client not initialized - check API key")
+
+    keys = [make_plan_key(exam, weak_topics, GEMINI_MODEL) for weak_topics, exam in jobs]
+    unique = {}
+    for key, (weak_topics, exam) in zip(keys, jobs):
+        unique.setdefault(key, (weak_topics, exam))
+
+    plans = {}
+    missing = []
+    for key, (weak_topics, exam) in unique.items():
+        cached = await plan_cache.get_async(key)
+        if cached is not None:
+            plans[key] = cached
+        else:
+            missing.append((key, weak_topics, exam))
+
+    size = max(1, settings.PLAN_BATCH_SIZE)
+    chunks = [missing[start:start + size] for start in range(0, len(missing), size)]
+    sources = {"batch": 0, "item": 0, None: 0}
+    for results in await asyncio.gather(*(_generate_plan_chunk(chunk) for chunk in chunks)):
+        for key, plan, source in results:
+            sources[source] += 1
+            if plan is not None:
+                plans[key] = plan
+
+    summary = {
+        "jobs": len(jobs),
+        "unique_jobs": len(unique),
+        "cached": len(unique) - len(missing),
+        "batched_calls": len(chunks),
+        "from_batch": sources["batch"],
+        "per_item_calls": sources["item"],
+        "failed": sources[None]
+    }
+    logger.info(f"Batched plan generation: {summary}")
+    return [plans.get(key) for key in keys], summary
+
+
+def chat_with_ai(message, weak_topics=None):
+    """
+    Chat with Gemini AI. Returns a text response.
+    Context-free questions are answered from the chat cache when possible.
+    """
+    if not weak_topics:
+        cached = chat_cache.get(message)
+        if cached is not None:
+            return cached
+
+    if not client:
+        raise Exception("Gemini client not initialized - check API key")
+
+    prompt = build_chat_prompt(message, weak_topics)
+
+    try:
+        with _timed_call("chat"):
+            response = client.models.generate_content(
+                model=GEMINI_MODEL,
+                contents=prompt
+            )
+        if not weak_topics:
+            chat_cache.put(message, response.text)
         return response.text
     except Exception as e:
         logger.error(f"Error in chat: {e}")
         raise Exception(f"Failed to get chat response: {str(e)}")
+
+
+async def _answer_chat(message, prompt):
+    """One Gemini call for a context-free question, cached for repeats."""
+    response = await _generate_content_async(prompt, "chat", priority=PRIORITY_CHAT)
+    chat_cache.put(message, response.text)
+    return response.text
+
+
+async def chat_with_ai_async(message, weak_topics=None):
+    """
+    Async variant of chat_with_ai using the SDK's async client.
+    Concurrent identical context-free questions share one Gemini call.
+    """
+    if not weak_topics:
+        cached = chat_cache.get(message)
+        if cached is not None:
+            return cached
+
+    if not client:
+        raise Exception("Gemini client not initialized - check API key")
+
+    prompt = build_chat_prompt(message, weak_topics)
+
+    try:
+        if weak_topics:
+            response = await _generate_content_async(prompt, "chat", priority=PRIORITY_CHAT)
+            return response.text
+        return await _chat_flights.do(prompt, lambda: _answer_chat(message, prompt))
+    except asyncio.TimeoutError:
+        logger.error(f"Chat timed out after {settings.GEMINI_TIMEOUT_SECONDS}s")
+        raise Exception("Failed to get chat response: Gemini call timed out")
+    except Exception as e:
+        logger.error(f"Error in chat: {e}")
+        raise Exception(f"Failed to get chat response: {str(e)}")
+
+
+async def chat_with_ai_stream(message, weak_topics=None):
+    """
+    Streaming variant of chat_with_ai.
+    Yields text chunks as Gemini produces them. Each wait for the next
+    chunk is bounded by GEMINI_TIMEOUT_SECONDS.
+    Cached answers are yielded as a single chunk.
+    """
+    if not weak_topics:
+        cached = chat_cache.get(message)
+        if cached is not None:
+            yield cached
+            return
+
+    if not client:
+        raise Exception("Gemini client not initialized - check API key")
+
+    prompt = build_chat_prompt(message, weak_topics)
+    parts = []
+
+    stream = _generate_content_stream(prompt, "chat_stream", priority=PRIORITY_CHAT)
+
+    try:
+        try:
+            async for text in stream:
+                parts.append(text)
+                yield text
+        finally:
+            await stream.aclose()
+        if not weak_topics:
+            chat_cache.put(message, "".join(parts))
+    except asyncio.TimeoutError:
+        logger.error(f"Chat stream timed out after {settings.GEMINI_TIMEOUT_SECONDS}s")
+        raise Exception("Failed to stream chat response: Gemini call timed out")
+    except Exception as e:
+        logger.error(f"Error in chat stream: {e}")
+        raise Exception(f"Failed to stream chat response: {str(e)}")
@@ -0,0 +1,128 @@
+"""
+Incremental parser for a streamed top-level JSON array.
+
+Model output arrives in arbitrary text chunks; JsonArrayParser returns
+each array element as soon as its closing bracket has arrived, so the
+first items can be validated and forwarded while the rest are still
+being generated. Only the current element is buffered.
+"""
+
+import json
+import re
+from typing import Any, List
+
+_OPENERS = "{["
+_STRING_SPECIAL = re.compile(r'["\\]')
+_ITEM_TOKEN = re.compile(r'"[^"\\]*(?:\\.[^"\\]*)*"|[\[\]{}"]', re.DOTALL)
+_NON_SPACE = re.compile(r"\S")
+
+
+class JsonArrayParser:
+    """
+    Feed chunks of `[item, item, ...]` where items are objects or arrays;
+    complete items are returned as they close.
+    """
+
+    def __init__(self):
+        self._started = False
+        self._finished = False
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+        self._need_comma = False
+        self._item: List[str] = []
+        self.items_parsed = 0
+
+    @property
+    def finished(self) -> bool:
+        """Whether the closing bracket of the array has been seen."""
+        return self._finished
+
+    def feed(self, chunk: str) -> List[Any]:
+        """Consume a chunk; returns the items completed by it."""
+        items = []
+        start = 0 if self._depth > 0 else None
+        pos = 0
+        # Jump between structural characters instead of visiting each one
+        while pos < len(chunk):
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                    pos += 1
+                    continue
+                match = _STRING_SPECIAL.search(chunk, pos)
+                if match is None:
+                    break
+                pos = match.end()
+                if match.group() == "\\":
+                    self._escaped = True
+                else:
+                    self._in_string = False
+                continue
+
+            if self._depth > 0:
+                depth = self._depth
+                for match in _ITEM_TOKEN.finditer(chunk, pos):
+                    token = match.group()
+                    if token[0] == '"':
+                        # Whole strings are skipped in one match; a lone
+                        # quote opens a string that runs past this chunk
+                        if len(token) == 1:
+                            self._in_string = True
+                            break
+                    elif token in _OPENERS:
+                        depth += 1
+                    else:
+                        depth -= 1
+                        if depth == 0:
+                            break
+                else:
+                    pos = len(chunk)
+                    self._depth = depth
+                    continue
+                pos = match.end()
+                self._depth = depth
+                if depth == 0:
+                    self._item.append(chunk[start:pos])
+                    items.append(self._decode())
+                    self._need_comma = True
+                    start = None
+                continue
+
+            # Outside any item: the opening bracket, separators, a new item
+            # or the end of the array
+            match = _NON_SPACE.search(chunk, pos)
+            if match is None:
+                break
+            char = match.group()
+            pos = match.end()
+            if self._finished:
+                raise ValueError(f"Unexpected data after JSON array: {chunk[match.start():match.start() + 20]!r}")
+            if not self._started:
+                if char != "[":
+                    raise ValueError(f"Expected a JSON array, got {chunk[match.start():match.start() + 20]!r}")
+                self._started = True
+            elif char == "]" and (self._need_comma or not self.items_parsed):
+                self._finished = True
+            elif char == "," and self._need_comma:
+                self._need_comma = False
+            elif char in _OPENERS and not self._need_comma:
+                start = match.start()
+                self._depth = 1
+            else:
+                raise ValueError(f"Unexpected {char!r} in JSON array after {self.items_parsed} items")
+
+        if self._depth > 0 and start is not None:
+            self._item.append(chunk[start:])
+        return items
+
+    def _decode(self) -> Any:
+        text = "".join(self._item)
+        self._item = []
+        self.items_parsed += 1
+        return json.loads(text)
+
+    def close(self) -> None:
+        """Raise ValueError if the array was not completely received."""
+        if not self._finished:
+            raise ValueError(f"Truncated JSON array after {self.items_parsed} items")
@@ -0,0 +1,244 @@
+"""
+In-process latency metrics in the Prometheus text format.
+
+Histograms and counters are kept per process and rendered by render()
+for the /metrics endpoint. MetricsMiddleware times every request by
+its route template; STAGE_SECONDS, GEMINI_SECONDS and OCR_STEP_SECONDS
+time analysis stages, Gemini calls and OCR steps (tesseract runs in
+the OCR worker processes, so its timings are recorded from each page's
+timings_ms when the result comes back).
+"""
+
+import bisect
+import functools
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Sequence, Tuple
+
+LabelValues = Tuple[str, ...]
+
+# Bucket upper bounds in seconds
+REQUEST_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+STAGE_BUCKETS = (0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+GEMINI_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.0, 4.0, 8.0, 15.0, 30.0, 60.0)
+
+_registry: List["_Metric"] = []
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _label_text(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values)) + "}"
+
+
+def _number(value: float) -> str:
+    return "+Inf" if value == float("inf") else repr(float(value))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        _registry.append(self)
+
+    def _key(self, labels: Dict[str, str]) -> LabelValues:
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def samples(self) -> Iterator[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self.samples())
+        return "\n".join(lines)
+
+
+class Counter(_Metric):
+    """Monotonic counter per label set"""
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels: str) -> float:
+        return self._values.get(self._key(labels), 0)
+
+    def samples(self) -> Iterator[str]:
+        with self._lock:
+            values = sorted(self._values.items())
+        for key, value in values:
+            yield f"{self.name}{_label_text(self.labelnames, key)} {_number(value)}"
+
+
+class _Series:
+    """One histogram label set: per-bucket counts (last is +Inf) and sum"""
+    __slots__ = ("buckets", "counts", "total", "lock")
+
+    def __init__(self, buckets: Tuple[float, ...], lock: threading.Lock):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.total = 0.0
+        self.lock = lock
+
+    def observe(self, value: float) -> None:
+        index = bisect.bisect_left(self.buckets, value)
+        with self.lock:
+            self.counts[index] += 1
+            self.total += value
+
+
+class Histogram(_Metric):
+    """Fixed-bucket histogram per label set"""
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = REQUEST_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series: Dict[LabelValues, _Series] = {}
+
+    def labels(self, **labels: str) -> _Series:
+        """The series for a label set; bind once to skip the lookup on hot paths."""
+        key = self._key(labels)
+        series = self._series.get(key)
+        if series is None:
+            with self._lock:
+                series = self._series.setdefault(key, _Series(self.buckets, self._lock))
+        return series
+
+    def observe(self, value: float, **labels: str) -> None:
+        self.labels(**labels).observe(value)
+
+    @contextmanager
+    def time(self, **labels: str) -> Iterator[None]:
+        """Observe the duration of a block."""
+        series = self.labels(**labels)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            series.observe(time.perf_counter() - start)
+
+    def timed(self, **labels: str) -> Callable:
+        """Decorator observing each call's duration."""
+        series = self.labels(**labels)
+
+        def decorator(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                start = time.perf_counter()
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    series.observe(time.perf_counter() - start)
+            return wrapper
+        return decorator
+
+    def count(self, **labels: str) -> int:
+        series = self._series.get(self._key(labels))
+        return sum(series.counts) if series else 0
+
+    def samples(self) -> Iterator[str]:
+        with self._lock:
+            snapshot = sorted((key, list(series.counts), series.total) for key, series in self._series.items())
+        names = self.labelnames + ("le",)
+        for key, counts, total in snapshot:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                yield f"{self.name}_bucket{_label_text(names, key + (_number(bound),))} {cumulative}"
+            labels = _label_text(self.labelnames, key)
+            yield f"{self.name}_sum{labels} {_number(total)}"
+            yield f"{self.name}_count{labels} {cumulative}"
+
+
+def render() -> str:
+    """All metrics in the Prometheus text exposition format."""
+    return "\n".join(metric.render() for metric in _registry) + "\n"
+
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds", "HTTP request latency by route template",
+    ("method", "route", "status"), REQUEST_BUCKETS
+)
+STAGE_SECONDS = Histogram(
+    "analysis_stage_duration_seconds", "Topic analysis and StudyAgent stage latency",
+    ("stage",), STAGE_BUCKETS
+)
+GEMINI_SECONDS = Histogram(
+    "gemini_request_duration_seconds", "Gemini API call latency",
+    ("call",), GEMINI_BUCKETS
+)
+GEMINI_FAILURES = Counter(
+    "gemini_request_failures_total", "Failed or timed out Gemini API calls", ("call",)
+)
+GEMINI_COALESCED = Counter(
+    "gemini_coalesced_requests_total", "Requests that joined an identical in-flight Gemini call", ("call",)
+)
+PLAN_PARSES = Counter(
+    "gemini_plan_parses_total", "Gemini plan responses by parse outcome (ok or failed)", ("outcome",)
+)
+OCR_STEP_SECONDS = Histogram(
+    "ocr_step_duration_seconds", "OCR page step latency (preprocessing, bubble grid, tesseract)",
+    ("step",), REQUEST_BUCKETS
+)
+
+
+def record_ocr_timings(timings_ms: Dict[str, float]) -> None:
+    """Record an OCR result's per-step timings_ms."""
+    for step, ms in timings_ms.items():
+        OCR_STEP_SECONDS.observe(ms / 1000, step=step)
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording REQUEST_SECONDS for every HTTP request,
+    labelled with the matched route's path template as declared on its
+    router (e.g. /history/{student_id}, without the /api prefix) rather
+    than the raw path, which would give one series per student id.
+    Streaming responses are timed until their last chunk is sent.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get("route")
+            REQUEST_SECONDS.observe(
+                time.perf_counter() - start,
+                method=scope["method"],
+                route=getattr(route, "path", "unmatched"),
+                status=str(status)
+            )
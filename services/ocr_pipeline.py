@@ -0,0 +1,183 @@
+"""
+Parallel multi-page OMR processing.
+
+Uploads (single images, multi-frame TIFFs, PDFs or zip archives of
+answer sheets) are split into pages and each page is OCR'd on a bounded
+process pool, so tesseract runs on every core and never blocks the API
+event loop. Per-page results are yielded as soon as they finish.
+"""
+
+import asyncio
+import io
+import logging
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Tuple
+
+from PIL import Image, ImageSequence
+
+from config import settings
+from services.metrics import record_ocr_timings
+from services.ocr_service import process_omr_image
+
+logger = logging.getLogger(__name__)
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.tif', '.tiff', '.bmp', '.webp')
+
+_pool = None
+_slots = None
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    """Lazily start the shared OCR process pool."""
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(max_workers=settings.OCR_WORKERS or None)
+    return _pool
+
+
+def _get_slots() -> asyncio.Semaphore:
+    """Bound on pages queued or running on the pool at once."""
+    global _slots
+    if _slots is None:
+        _slots = asyncio.Semaphore(settings.OCR_MAX_PENDING_PAGES)
+    return _slots
+
+
+def _to_png(image: Image.Image) -> bytes:
+    buffer = io.BytesIO()
+    image.save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def _pdf_pages(data: bytes) -> Iterator[bytes]:
+    """Render each PDF page to PNG bytes (needs pdf2image + poppler)."""
+    try:
+        from pdf2image import convert_from_bytes
+    except ImportError:
+        raise Exception("PDF support requires the pdf2image package and poppler")
+    for page in convert_from_bytes(data, dpi=settings.OCR_PDF_DPI):
+        yield _to_png(page)
+
+
+def split_pages(data: bytes, filename: str = "") -> Iterator[Tuple[str, bytes]]:
+    """
+    Split an upload into (page label, image bytes) pairs.
+    Supports PDFs, zip archives (images and PDFs inside), multi-frame
+    TIFFs and plain images.
+    """
+    name = filename or "upload"
+
+    if data[:4] == b"%PDF":
+        for i, page in enumerate(_pdf_pages(data), 1):
+            yield f"{name}#page{i}", page
+        return
+
+    if data[:4] == b"PK\x03\x04":
+        with zipfile.ZipFile(io.BytesIO(data)) as archive:
+            for member in sorted(archive.namelist()):
+                lower = member.lower()
+                if member.endswith('/') or not lower.endswith(IMAGE_EXTENSIONS + ('.pdf',)):
+                    continue
+                yield from split_pages(archive.read(member), f"{name}/{member}")
+        return
+
+    image = Image.open(io.BytesIO(data))
+    frames = getattr(image, "n_frames", 1)
+    if frames > 1:
+        for i, frame in enumerate(ImageSequence.Iterator(image), 1):
+            yield f"{name}#page{i}", _to_png(frame.copy())
+        return
+
+    yield name, data
+
+
+def _split_all(data: bytes, filename: str) -> List[Tuple[str, bytes]]:
+    return list(split_pages(data, filename))
+
+
+def _ocr_page(image_data: bytes, exam_type: str, **options) -> Dict[str, Any]:
+    """OCR one page inside a worker process."""
+    try:
+        return process_omr_image(image_data, exam_type, **options)
+    except Exception as e:
+        return {"success": False, "error": str(e)}
+
+
+async def run_ocr(
+    image_data: bytes,
+    exam_type: str,
+    mode: Optional[str] = None,
+    paper_code: Optional[str] = None,
+    set_code: Optional[str] = None
+) -> Dict[str, Any]:
+    """OCR a single image on the pool without blocking the event loop."""
+    loop = asyncio.get_running_loop()
+    job = partial(process_omr_image, image_data, exam_type, mode=mode, paper_code=paper_code, set_code=set_code)
+    async with _get_slots():
+        result = await loop.run_in_executor(_get_pool(), job)
+    record_ocr_timings(result.get("timings_ms", {}))
+    return result
+
+
+async def ocr_uploads_stream(
+    uploads: List[Tuple[str, bytes]],
+    exam_type: str,
+    mode: Optional[str] = None,
+    paper_code: Optional[str] = None,
+    set_code: Optional[str] = None
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    OCR every page of every upload in parallel.
+    Yields one result per page in completion order, then a summary.
+    Closing the generator early cancels the pages not yet finished.
+    """
+    started = time.perf_counter()
+    loop = asyncio.get_running_loop()
+    slots = _get_slots()
+
+    async def run_page(label: str, page: bytes) -> Dict[str, Any]:
+        async with slots:
+            job = partial(_ocr_page, page, exam_type, mode=mode, paper_code=paper_code, set_code=set_code)
+            result = await loop.run_in_executor(_get_pool(), job)
+        record_ocr_timings(result.get("timings_ms", {}))
+        result["page"] = label
+        return result
+
+    tasks = []
+    succeeded = 0
+    try:
+        for filename, data in uploads:
+            try:
+                # PDF rendering and frame splitting are CPU-bound too
+                pages = await asyncio.to_thread(_split_all, data, filename)
+            except Exception as e:
+                logger.error(f"Could not split {filename}: {e}")
+                yield {"page": filename, "success": False, "error": str(e)}
+                continue
+            tasks.extend(asyncio.create_task(run_page(label, page)) for label, page in pages)
+
+        for task in asyncio.as_completed(tasks):
+            result = await task
+            if result.get("success"):
+                succeeded += 1
+            yield result
+    finally:
+        # The client went away: pages still queued for the pool are dropped
+        cancelled = sum(task.cancel() for task in tasks)
+        if cancelled:
+            logger.info(f"OCR pipeline stopped with {cancelled} of {len(tasks)} pages outstanding")
+
+    elapsed = time.perf_counter() - started
+    logger.info(f"OCR pipeline finished: {len(tasks)} pages in {elapsed:.2f}s")
+    yield {
+        "summary": {
+            "pages": len(tasks),
+            "succeeded": succeeded,
+            "failed": len(tasks) - succeeded,
+            "elapsed_seconds": round(elapsed, 3),
+            "pages_per_second": round(len(tasks) / elapsed, 2) if elapsed > 0 else 0.0
+        }
+    }
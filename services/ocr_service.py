@@ -1,64 +1,193 @@
 import io
-import re
 import json
 import logging
+import time
+from itertools import repeat
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
 from PIL import Image
 import pytesseract
 
+from config import settings
+from services.ocr_preprocess import PreprocessConfig, estimate_small_skew, otsu_threshold, preprocess_image
+from services.answer_keys import MarkingScheme, answer_key_store
+from services.omr_parser import parse_omr_answers
+
 logger = logging.getLogger(__name__)
 
-def extract_text_from_image(image_data: bytes) -> str:
+def default_preprocess_config() -> Optional[PreprocessConfig]:
+    """Preprocessing pipeline from settings; None when disabled."""
+    steps = tuple(s.strip() for s in settings.OCR_PREPROCESS_STEPS.split(',') if s.strip())
+    if not steps:
+        return None
+    return PreprocessConfig(steps=steps, target_dpi=settings.OCR_TARGET_DPI)
+
+def extract_text_timed(image_data: bytes, preprocess: Optional[PreprocessConfig] = None) -> Tuple[str, Dict[str, float]]:
     """
-    Extract text from image using Tesseract OCR.
+    Extract text with Tesseract after the preprocessing pipeline.
+    Returns (text, per-step timings in ms, including "tesseract").
     """
     try:
         image = Image.open(io.BytesIO(image_data))
+        timings: Dict[str, float] = {}
+        if preprocess is not None:
+            prepared = preprocess_image(image, preprocess)
+            image = prepared.image
+            timings.update(prepared.timings)
+        start = time.perf_counter()
         text = pytesseract.image_to_string(image)
-        return text
+        timings["tesseract"] = round((time.perf_counter() - start) * 1000, 2)
+        return text, timings
     except Exception as e:
         logger.error(f"OCR extraction failed: {e}")
         raise Exception(f"Failed to extract text from image: {str(e)}")
 
-def parse_omr_answers(text: str) -> dict:
+def extract_text_from_image(image_data: bytes) -> str:
     """
-    Parse OMR answer sheet text to extract question numbers and answers.
-    Expected formats:
-    - Q1 A Q2 B Q3 C...
-    - 1. A 2. B 3. C...
-    - Question 1: A, Question 2: B...
+    Extract text from image using Tesseract OCR.
     """
-    results = {
-        "answers": {},
-        "total_questions": 0,
-        "extracted_raw": text
+    text, _ = extract_text_timed(image_data, default_preprocess_config())
+    return text
+
+# OMR reader modes: bubble grid only, OCR text only, or bubble grid with
+# tesseract as the fallback when no grid is found
+OMR_MODES = ("auto", "bubble", "text")
+
+BUBBLE_OPTIONS = "ABCD"
+# Sheets are read at this width; JPEGs are decoded straight to it
+BUBBLE_WORK_WIDTH = 750
+# A bubble counts as marked when this fraction of its cell is ink and it
+# beats the next darkest option by BUBBLE_MIN_MARGIN
+BUBBLE_FILL_THRESHOLD = 0.45
+BUBBLE_MIN_MARGIN = 0.15
+# Every cell of a real grid row has at least its outline inked
+BUBBLE_MIN_OUTLINE = 0.05
+
+def _runs(profile: np.ndarray, min_value: float) -> List[Tuple[int, int]]:
+    """(start, end) spans where profile exceeds min_value."""
+    mask = np.concatenate(([False], profile > min_value, [False]))
+    edges = np.flatnonzero(mask[1:] != mask[:-1])
+    return list(zip(edges[::2].tolist(), edges[1::2].tolist()))
+
+def _load_ink(image_data: bytes, deskew: bool = True) -> np.ndarray:
+    """Decode at working width and return a boolean ink mask."""
+    image = Image.open(io.BytesIO(image_data))
+    if image.width > BUBBLE_WORK_WIDTH:
+        size = (BUBBLE_WORK_WIDTH, max(1, image.height * BUBBLE_WORK_WIDTH // image.width))
+        image.draft("L", size)
+        gray = image.convert("L")
+        # draft() only scales by powers of two; finish the rest if far off
+        if gray.width > BUBBLE_WORK_WIDTH * 1.5:
+            gray = gray.resize(size, Image.BILINEAR)
+    else:
+        gray = image.convert("L")
+
+    threshold = otsu_threshold(gray)
+    if deskew:
+        binary = gray.point(lambda p: 255 if p > threshold else 0)
+        # Bubble rows give one sharp profile peak; aligned sheets skip the search
+        angle = estimate_small_skew(binary, PreprocessConfig(skew_search_size=500))
+        if angle:
+            gray = gray.rotate(angle, resample=Image.BILINEAR, fillcolor=255)
+    return np.asarray(gray) <= threshold
+
+def _cell_densities(ink: np.ndarray, rows: List[Tuple[int, int]], cols: List[Tuple[int, int]]) -> np.ndarray:
+    """Ink fraction of every (row, column) cell, reduced over the grid in one pass per axis."""
+    top, left = rows[0][0], cols[0][0]
+    grid = ink[top:rows[-1][1], left:cols[-1][1]]
+    # reduceat sums from each index to the next: even slots are the cells,
+    # odd slots the gaps between them; the last cell runs to the grid edge
+    row_edges = (np.array(rows) - top).ravel()[:-1]
+    col_edges = (np.array(cols) - left).ravel()[:-1]
+    sums = np.add.reduceat(np.add.reduceat(grid, row_edges, axis=0, dtype=np.int32)[::2], col_edges, axis=1)[:, ::2]
+    heights = np.diff(rows, axis=1)
+    widths = np.diff(cols, axis=1).T
+    return sums / (heights * widths)
+
+def read_bubble_grid(image_data: bytes, options: str = BUBBLE_OPTIONS, deskew: bool = True) -> Optional[Dict[str, Any]]:
+    """
+    Read answers straight from a filled-bubble grid.
+
+    The grid is found from ink projection profiles: bubble rows are the
+    horizontal ink bands, bubble columns the vertical bands that have ink
+    in most rows. Columns are grouped into blocks of len(options) (printed
+    question numbers left of each block are skipped); questions run down
+    each block, then on to the next block. Returns None when no grid is
+    found.
+    """
+    ink = _load_ink(image_data, deskew)
+    height, width = ink.shape
+
+    rows = _runs(ink.sum(axis=1), width * 0.005)
+    if not rows:
+        return None
+    band = np.zeros(height, dtype=bool)
+    for start, end in rows:
+        band[start:end] = True
+    columns = _runs(ink[band].sum(axis=0), band.sum() * 0.1)
+    if len(columns) < len(options):
+        return None
+
+    # Bubble columns share one width; printed numbers are narrower or wider
+    widths = np.array([end - start for start, end in columns])
+    bubble_width = np.median(widths)
+    columns = [c for c, w in zip(columns, widths.tolist()) if 0.7 * bubble_width <= w <= 1.3 * bubble_width]
+    if len(columns) < len(options):
+        return None
+
+    # Split into blocks at gaps wider than the bubble spacing; runs too
+    # short to be a block are number labels that passed the width filter
+    gaps = [columns[i + 1][0] - columns[i][1] for i in range(len(columns) - 1)]
+    block_gap = np.median(gaps) * 1.8 if gaps else 0
+    blocks: List[List[Tuple[int, int]]] = [[columns[0]]]
+    for gap, column in zip(gaps, columns[1:]):
+        if gap > block_gap:
+            blocks.append([])
+        blocks[-1].append(column)
+    blocks = [block for block in blocks if len(block) >= len(options)]
+    if not blocks:
+        return None
+    bubble_columns = [column for block in blocks for column in block[-len(options):]]
+
+    densities = _cell_densities(ink, rows, bubble_columns)
+    # Keep rows with every bubble outlined and a typical bubble height
+    heights = np.array([end - start for start, end in rows])
+    keep = densities.min(axis=1) >= BUBBLE_MIN_OUTLINE
+    if not keep.any():
+        return None
+    typical = np.median(heights[keep])
+    keep &= (heights >= typical * 0.5) & (heights <= typical * 1.5)
+    densities = densities[keep]
+    if not len(densities):
+        return None
+
+    per_block = densities.reshape(len(densities), len(blocks), len(options)).transpose(1, 0, 2)
+    ordered = np.sort(per_block, axis=2)
+    best = per_block.argmax(axis=2)
+    filled = ordered[:, :, -1] >= BUBBLE_FILL_THRESHOLD
+    clear = (ordered[:, :, -1] - ordered[:, :, -2]) >= BUBBLE_MIN_MARGIN
+
+    answers: Dict[int, str] = {}
+    ambiguous: List[int] = []
+    row_count = len(densities)
+    for block, row in zip(*np.nonzero(filled)):
+        q_num = int(block) * row_count + int(row) + 1
+        if clear[block, row]:
+            answers[q_num] = options[best[block, row]]
+        else:
+            ambiguous.append(q_num)
+
+    return {
+        "answers": dict(sorted(answers.items())),
+        "total_questions": len(answers),
+        "ambiguous": sorted(ambiguous),
+        "grid": {"rows": row_count, "blocks": len(blocks), "options": len(options)}
     }
-    
-    # Pattern 1: Q1 A Q2 B Q3 C format
-    pattern1 = r'[Qq](\d+)\s*([A-Da-d])'
-    matches = re.findall(pattern1, text)
-    for q_num, answer in matches:
-        results["answers"][int(q_num)] = answer.upper()
-    
-    # Pattern 2: 1. A 2. B format  
-    pattern2 = r'^(\d+)\.\s*([A-Da-d])'
-    for line in text.split('\n'):
-        match = re.search(pattern2, line.strip())
-        if match:
-            q_num, answer = match.groups()
-            results["answers"][int(q_num)] = answer.upper()
-    
-    # Pattern 3: Question X: Y format
-    pattern3 = r'[Qq]uestion\s*(\d+)[:\s]+([A-Da-d])'
-    matches = re.findall(pattern3, text)
-    for q_num, answer in matches:
-        results["answers"][int(q_num)] = answer.upper()
-    
-    results["total_questions"] = len(results["answers"])
-    return results
 
-def calculate_score(extracted_answers: dict, correct_answers: dict) -> dict:
+def calculate_score(extracted_answers: dict, correct_answers: dict, scheme: Optional[MarkingScheme] = None) -> dict:
     """
     Calculate score based on extracted answers and correct answers.
+    With a marking scheme, also returns marks (negative marking included).
     """
     correct = 0
     wrong = 0
@@ -75,36 +204,170 @@ def calculate_score(extracted_answers: dict, correct_answers: dict) -> dict:
     
     score = (correct / total * 100) if total > 0 else 0
     
-    return {
+    result = {
         "correct": correct,
         "wrong": wrong,
         "unanswered": unanswered,
         "total": total,
         "score": round(score, 2)
     }
+    if scheme is not None:
+        result["marks"] = correct * scheme.correct + wrong * scheme.wrong + unanswered * scheme.unanswered
+        result["max_marks"] = total * scheme.correct
+    return result
 
-def process_omr_image(image_data: bytes, exam_type: str = "JEE Mains") -> dict:
+def score_answer_matrix(marked: np.ndarray, key: np.ndarray, scheme: Optional[MarkingScheme] = None) -> Dict[str, np.ndarray]:
+    """
+    Vectorized scoring of a sheets x questions matrix of answer codes
+    against a key vector of the same codes; -1 marks an unanswered
+    question. Returns per-sheet arrays of correct/wrong/unanswered counts,
+    score percentage and (with a scheme) marks.
+    """
+    total = marked.shape[1]
+    correct = (marked == key).sum(axis=1)
+    unanswered = (marked == -1).sum(axis=1)
+    wrong = total - correct - unanswered
+    result = {
+        "correct": correct,
+        "wrong": wrong,
+        "unanswered": unanswered,
+        "score": (correct * 100 / total).round(2) if total > 0 else np.zeros(len(marked))
+    }
+    if scheme is not None:
+        result["marks"] = correct * scheme.correct + wrong * scheme.wrong + unanswered * scheme.unanswered
+    return result
+
+def score_sheets(sheets: List[dict], correct_answers: dict, scheme: Optional[MarkingScheme] = None) -> List[dict]:
+    """
+    Score many answer sheets against one key at once.
+    Same result per sheet as calculate_score; the sheets are encoded into
+    one answer-code matrix and scored with score_answer_matrix. Encoding
+    the dicts costs about as much as calculate_score per sheet, so bulk
+    callers should send pre-encoded strings to score_answer_strings.
+    """
+    if not sheets:
+        return []
+    questions = list(correct_answers)
+    # Answer codes: key answers 0..n, missing -1, anything else -2 (wrong)
+    codes = {answer: i for i, answer in enumerate(dict.fromkeys(correct_answers.values()))}
+    codes[None] = -1
+    key = np.array([codes[answer] for answer in correct_answers.values()], dtype=np.int32)
+
+    flat: List[Any] = []
+    for sheet in sheets:
+        flat.extend(map(sheet.get, questions))
+    marked = np.fromiter(
+        map(codes.get, flat, repeat(-2)), dtype=np.int32, count=len(flat)
+    ).reshape(len(sheets), len(questions))
+
+    return _sheet_results(score_answer_matrix(marked, key, scheme), len(questions), scheme)
+
+def score_answer_strings(rows: List[str], correct_answers: dict, scheme: Optional[MarkingScheme] = None) -> List[dict]:
+    """
+    Score pre-encoded answer sheets: one string per sheet with one
+    character per key question, in question order, and "-" for an
+    unanswered question. The strings are read straight into an answer-code
+    matrix, skipping the per-question encoding score_sheets does.
+    """
+    if not rows:
+        return []
+    total = len(correct_answers)
+    if any(len(answer) != 1 for answer in correct_answers.values()):
+        raise ValueError("Answer key has multi-character answers; send sheets instead")
+    if any(len(row) != total for row in rows):
+        raise ValueError(f"Every answer string must have {total} characters")
+    try:
+        key_bytes = "".join(correct_answers.values()).encode("ascii")
+        marked_bytes = "".join(rows).upper().encode("ascii")
+    except UnicodeEncodeError:
+        raise ValueError("Answer strings must be ASCII")
+    # Character codes, with unanswered questions as -1
+    key = np.frombuffer(key_bytes, dtype=np.uint8).astype(np.int16)
+    marked = np.frombuffer(marked_bytes, dtype=np.uint8).astype(np.int16)
+    marked[marked == ord("-")] = -1
+    return _sheet_results(score_answer_matrix(marked.reshape(len(rows), total), key, scheme), total, scheme)
+
+def _sheet_results(scored: Dict[str, np.ndarray], total: int, scheme: Optional[MarkingScheme]) -> List[dict]:
+    """Per-sheet calculate_score results from score_answer_matrix arrays"""
+    columns = [scored["correct"].tolist(), scored["wrong"].tolist(), scored["unanswered"].tolist()]
+    results = []
+    for c, w, u in zip(*columns):
+        result = {
+            "correct": c,
+            "wrong": w,
+            "unanswered": u,
+            "total": total,
+            "score": round((c / total * 100) if total > 0 else 0, 2)
+        }
+        if scheme is not None:
+            result["marks"] = c * scheme.correct + w * scheme.wrong + u * scheme.unanswered
+            result["max_marks"] = total * scheme.correct
+        results.append(result)
+    return results
+
+# Scored against when no answer key is stored for the requested paper set
+DEMO_ANSWER_KEY = {
+    1: "A", 2: "B", 3: "C", 4: "D", 5: "A",
+    6: "B", 7: "C", 8: "D", 9: "A", 10: "B",
+    11: "C", 12: "D", 13: "A", 14: "B", 15: "C",
+    16: "D", 17: "A", 18: "B", 19: "C", 20: "D",
+    21: "A", 22: "B", 23: "C", 24: "D", 25: "A"
+}
+
+def process_omr_image(
+    image_data: bytes,
+    exam_type: str = "JEE Mains",
+    mode: Optional[str] = None,
+    paper_code: Optional[str] = None,
+    set_code: Optional[str] = None
+) -> dict:
     """
     Main function to process OMR image and extract answers.
+    mode is one of OMR_MODES (default settings.OMR_READER_MODE). Answers
+    are scored against the stored key for exam_type/paper_code/set_code.
     """
-    # Extract text from image
-    text = extract_text_from_image(image_data)
-    
-    # Parse answers from extracted text
-    extracted = parse_omr_answers(text)
+    mode = mode or settings.OMR_READER_MODE
+    if mode not in OMR_MODES:
+        raise ValueError(f"Unknown OMR mode: {mode}")
+
+    extracted = None
+    text = ""
+    timings: Dict[str, float] = {}
+    reader = "text"
+
+    if mode in ("auto", "bubble"):
+        start = time.perf_counter()
+        try:
+            extracted = read_bubble_grid(image_data)
+        except Exception as e:
+            logger.warning(f"Bubble grid read failed: {e}")
+        timings["bubble_grid"] = round((time.perf_counter() - start) * 1000, 2)
+        # An empty grid is more likely a text sheet than a blank one
+        if extracted and extracted["total_questions"]:
+            reader = "bubble"
+        elif mode == "bubble":
+            raise Exception("Failed to read bubble grid: no marked bubbles found")
+        else:
+            extracted = None
+
+    if extracted is None:
+        # Extract text from image
+        text, ocr_timings = extract_text_timed(image_data, default_preprocess_config())
+        timings.update(ocr_timings)
+
+        # Parse answers from extracted text
+        extracted = parse_omr_answers(text)
     
-    # Define correct answers for demo (in production, this would come from a database)
-    # For JEE Mains sample
-    correct_answers_demo = {
-        1: "A", 2: "B", 3: "C", 4: "D", 5: "A",
-        6: "B", 7: "C", 8: "D", 9: "A", 10: "B",
-        11: "C", 12: "D", 13: "A", 14: "B", 15: "C",
-        16: "D", 17: "A", 18: "B", 19: "C", 20: "D",
-        21: "A", 22: "B", 23: "C", 24: "D", 25: "A"
-    }
+    key = answer_key_store.get(exam_type, paper_code, set_code)
+    if key is not None:
+        correct_answers, scheme = key.answers, key.scheme
+        key_info = {"exam_type": key.exam_type, "paper_code": key.paper_code, "set_code": key.set_code, "source": "store"}
+    else:
+        correct_answers, scheme = DEMO_ANSWER_KEY, answer_key_store.marking_scheme(exam_type)
+        key_info = {"source": "demo"}
     
     # Calculate score
-    score_result = calculate_score(extracted["answers"], correct_answers_demo)
+    score_result = calculate_score(extracted["answers"], correct_answers, scheme)
     
     return {
         "success": True,
@@ -112,6 +375,9 @@ def process_omr_image(image_data: bytes, exam_type: str = "JEE Mains") -> dict:
         "answers": extracted["answers"],
         "total_questions": extracted["total_questions"],
         "score": score_result,
+        "answer_key": key_info,
         "exam_type": exam_type,
+        "reader": reader,
+        "timings_ms": timings,
         "message": f"Extracted {extracted['total_questions']} answers from image"
     }
@@ -0,0 +1,117 @@
+"""
+Single-pass OMR answer text parser.
+
+One precompiled alternation recognizes every supported answer format in a
+single sweep over the OCR text:
+
+    question  "Question 1: A"   (highest precedence)
+    dot       "1. A" at the start of a line
+    q         "Q1 A"
+    q_dot     "Q.1 A"           (variants, lowest precedence)
+    paren     "1) A"
+    dash      "1-A"
+
+When a question is matched more than once, the higher-precedence format
+wins, and within one precedence level the last match wins - the same
+result the original three sequential regex sweeps produced. The original
+formats can never overlap each other in the text, so one sweep finds
+exactly the matches the separate sweeps did.
+"""
+
+import re
+from typing import Dict
+
+# Base confidence per source pattern; explicit formats are less likely to
+# be OCR noise than bare "1-A" style fragments
+BASE_CONFIDENCE = {
+    "question": 0.95,
+    "dot": 0.9,
+    "q": 0.85,
+    "q_dot": 0.8,
+    "paren": 0.75,
+    "dash": 0.7,
+}
+
+# Multiplier when the same question was read with conflicting answers
+CONFLICT_PENALTY = 0.6
+
+# Every alternative starts with a literal or a small character class, so
+# the regex engine only tries matches at newlines, Q/q and digits. The
+# dot format is anchored on the newline before it; the parser prepends one
+# so the first line is covered.
+_BASE_FORMATS = (
+    r"\n[^\S\n]*(\d+)\.[^\S\n]*([A-Da-d])"
+    r"|[Qq](?:uestion\s*(\d+)[:\s]+([A-Da-d])|(\d+)\s*([A-Da-d])|\.\s*(\d+)\s*([A-Da-d]))"
+)
+# "1) A" and "1-A" start at any digit, which makes them the costliest
+# alternative; texts without ")" or "-" are scanned without it
+_DIGIT_FORMATS = r"|(\d+)(?:\)\s*([A-Da-d])|\s*-\s*([A-Da-d]))"
+
+OMR_ANSWER_RE = re.compile(_BASE_FORMATS + _DIGIT_FORMATS)
+_BASE_ANSWER_RE = re.compile(_BASE_FORMATS)
+
+# Match.lastindex (the answer group) -> (number group, level, source).
+# Levels are listed in the order the original sweeps ran, which is also
+# lowest to highest precedence except for the variants.
+_DISPATCH = {
+    6: (5, 0, "q"),
+    2: (1, 1, "dot"),
+    4: (3, 2, "question"),
+    8: (7, 3, "q_dot"),
+    10: (9, 3, "paren"),
+    11: (9, 3, "dash"),
+}
+_PRECEDENCE_ORDER = (3, 0, 1, 2)
+
+
+def parse_omr_answers(text: str) -> dict:
+    """
+    Parse OMR answer sheet text to extract question numbers and answers.
+    Expected formats:
+    - Q1 A Q2 B Q3 C...
+    - 1. A 2. B 3. C...
+    - Question 1: A, Question 2: B...
+    - Variants: Q.1 A, 1) A, 1-A
+    Also returns per-answer confidence and the source pattern name.
+    """
+    # Last match per question for each level, and every (question, answer) seen
+    levels = ({}, {}, {}, {})
+    seen = set()
+    dispatch = _DISPATCH
+
+    pattern = OMR_ANSWER_RE if (")" in text or "-" in text) else _BASE_ANSWER_RE
+    for match in pattern.finditer("\n" + text):
+        answer_group = match.lastindex
+        num_group, level, _ = dispatch[answer_group]
+        num, answer = match.group(num_group, answer_group)
+        q_num = int(num)
+        levels[level][q_num] = match
+        seen.add((q_num, answer))
+
+    winners = {}
+    for level in _PRECEDENCE_ORDER:
+        winners.update(levels[level])
+
+    # Keys in the order the original sweeps first inserted them
+    answers: Dict[int, str] = {}
+    sources: Dict[int, str] = {}
+    for q_num in dict.fromkeys(q for level in levels for q in level):
+        match = winners[q_num]
+        answers[q_num] = match.group(match.lastindex).upper()
+        sources[q_num] = dispatch[match.lastindex][2]
+
+    readings: Dict[int, int] = {}
+    for q_num, _ in {(q_num, answer.upper()) for q_num, answer in seen}:
+        readings[q_num] = readings.get(q_num, 0) + 1
+    confidence = {
+        q_num: round(BASE_CONFIDENCE[source] * (CONFLICT_PENALTY if readings[q_num] > 1 else 1.0), 3)
+        for q_num, source in sources.items()
+    }
+
+    return {
+        "answers": answers,
+        "total_questions": len(answers),
+        "extracted_raw": text,
+        "confidence": confidence,
+        "sources": sources
+    }
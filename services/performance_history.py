@@ -0,0 +1,240 @@
+"""
+Persistent per-student performance history.
+
+Every analyzed attempt stores one row per topic (attempted / correct) with
+the time it was taken, in SQLite through database.connection. Rows are
+clustered on (student_id, exam, topic, subject, taken_at), so one student's
+history for an exam is a single contiguous index range and trend queries
+read only that student's rows, however many students are stored. An
+attempt with a mock_test_id is recorded once; resubmitting it is a no-op.
+"""
+
+import logging
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from database import connection
+
+logger = logging.getLogger(__name__)
+
+_schema_ready = False
+
+_TABLE = """
+    CREATE TABLE IF NOT EXISTS {name} (
+        student_id TEXT NOT NULL,
+        exam TEXT NOT NULL,
+        topic TEXT NOT NULL,
+        taken_at REAL NOT NULL,
+        subject TEXT NOT NULL,
+        attempted INTEGER NOT NULL,
+        correct INTEGER NOT NULL,
+        mock_test_id TEXT NOT NULL DEFAULT '',
+        PRIMARY KEY (student_id, exam, topic, subject, taken_at)
+    ) WITHOUT ROWID;
+"""
+_COLUMNS = "student_id, exam, topic, taken_at, subject, attempted, correct, mock_test_id"
+
+
+def _ensure_schema(conn) -> None:
+    global _schema_ready
+    if _schema_ready:
+        return
+    conn.executescript(_TABLE.format(name="performance_history") + """
+        CREATE TABLE IF NOT EXISTS recorded_attempts (
+            student_id TEXT NOT NULL,
+            exam TEXT NOT NULL,
+            mock_test_id TEXT NOT NULL,
+            taken_at REAL NOT NULL,
+            PRIMARY KEY (student_id, exam, mock_test_id)
+        ) WITHOUT ROWID;
+    """)
+    pk = {row["name"] for row in conn.execute("PRAGMA table_info(performance_history)") if row["pk"]}
+    if "subject" not in pk:
+        # Tables created before subject was part of the key lost rows for
+        # topics sharing a name across subjects; rebuild with the new key
+        logger.info("Migrating performance_history to the (topic, subject) key")
+        conn.executescript(
+            "BEGIN;"
+            + _TABLE.format(name="performance_history_new")
+            + f"INSERT INTO performance_history_new ({_COLUMNS}) SELECT {_COLUMNS} FROM performance_history;"
+            "DROP TABLE performance_history;"
+            "ALTER TABLE performance_history_new RENAME TO performance_history;"
+            "COMMIT;"
+        )
+    _schema_ready = True
+
+
+def _topic_fields(topic: Any) -> Optional[Tuple[str, str, int, int]]:
+    """(name, subject, attempted, correct) from a Topic model or dict."""
+    if isinstance(topic, dict):
+        name = topic.get('name') or topic.get('topic')
+        return name, topic.get('subject', ''), topic.get('attempted', 0), topic.get('correct', 0)
+    if hasattr(topic, 'name'):
+        return topic.name, topic.subject, topic.attempted, topic.correct
+    return None
+
+
+def bulk_insert(rows: Iterable[Tuple[str, str, str, float, str, int, int, str]]) -> int:
+    """
+    Insert (student_id, exam, topic, taken_at, subject, attempted, correct,
+    mock_test_id) rows in one transaction. A row for an existing
+    (student, exam, topic, subject, taken_at) replaces it. Returns the row
+    count.
+    """
+    with connection() as conn:
+        _ensure_schema(conn)
+        with conn:
+            return _insert_rows(conn, rows)
+
+
+def _insert_rows(conn, rows) -> int:
+    cur = conn.executemany(
+        f"INSERT OR REPLACE INTO performance_history ({_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+        rows
+    )
+    return cur.rowcount
+
+
+def record_attempt(
+    student_id: str,
+    exam: str,
+    topics: Iterable[Any],
+    taken_at: Optional[float] = None,
+    mock_test_id: str = ""
+) -> int:
+    """
+    Store one attempt's per-topic results (Topic models or dicts with
+    name, subject, attempted, correct). Topics with no attempts are skipped.
+    An attempt with a mock_test_id already recorded for the student and
+    exam is not stored again; returns 0.
+    """
+    taken_at = time.time() if taken_at is None else taken_at
+    rows = []
+    for topic in topics:
+        fields = _topic_fields(topic)
+        if fields is None or not fields[0] or not fields[2]:
+            continue
+        name, subject, attempted, correct = fields
+        rows.append((student_id, exam, name, taken_at, subject, attempted, correct, mock_test_id or ""))
+    with connection() as conn:
+        _ensure_schema(conn)
+        with conn:
+            if mock_test_id:
+                cur = conn.execute(
+                    "INSERT OR IGNORE INTO recorded_attempts (student_id, exam, mock_test_id, taken_at) "
+                    "VALUES (?, ?, ?, ?)",
+                    (student_id, exam, mock_test_id, taken_at)
+                )
+                if cur.rowcount == 0:
+                    logger.info(f"Attempt {mock_test_id} already recorded for {student_id} ({exam})")
+                    return 0
+            count = _insert_rows(conn, rows)
+    logger.info(f"Recorded {count} topic results for {student_id} ({exam})")
+    return count
+
+
+def _time_range(start: Optional[float], end: Optional[float]) -> Tuple[float, float]:
+    return (float("-inf") if start is None else start, float("inf") if end is None else end)
+
+
+def score_trend(student_id: str, exam: str, start: Optional[float] = None, end: Optional[float] = None) -> List[Dict]:
+    """Overall score per attempt, oldest first."""
+    with connection() as conn:
+        _ensure_schema(conn)
+        rows = conn.execute(
+            "SELECT taken_at, MAX(mock_test_id) AS mock_test_id, SUM(attempted) AS attempted, "
+            "SUM(correct) AS correct FROM performance_history "
+            "WHERE student_id = ? AND exam = ? AND taken_at BETWEEN ? AND ? "
+            "GROUP BY taken_at ORDER BY taken_at",
+            (student_id, exam) + _time_range(start, end)
+        ).fetchall()
+    return [
+        {
+            "taken_at": row["taken_at"],
+            "mock_test_id": row["mock_test_id"],
+            "attempted": row["attempted"],
+            "correct": row["correct"],
+            "score": int(row["correct"] / row["attempted"] * 100) if row["attempted"] else 0
+        }
+        for row in rows
+    ]
+
+
+def topic_trend(
+    student_id: str,
+    exam: str,
+    topic: str,
+    start: Optional[float] = None,
+    end: Optional[float] = None,
+    subject: Optional[str] = None
+) -> List[Dict]:
+    """
+    One topic's results per attempt, oldest first. Without a subject,
+    topics of the same name in different subjects are added together.
+    """
+    subject_filter, params = ("AND subject = ? ", (subject,)) if subject else ("", ())
+    with connection() as conn:
+        _ensure_schema(conn)
+        rows = conn.execute(
+            "SELECT taken_at, SUM(attempted) AS attempted, SUM(correct) AS correct FROM performance_history "
+            f"WHERE student_id = ? AND exam = ? AND topic = ? {subject_filter}AND taken_at BETWEEN ? AND ? "
+            "GROUP BY taken_at ORDER BY taken_at",
+            (student_id, exam, topic) + params + _time_range(start, end)
+        ).fetchall()
+    return [
+        {
+            "taken_at": row["taken_at"],
+            "attempted": row["attempted"],
+            "correct": row["correct"],
+            "score": int(row["correct"] / row["attempted"] * 100) if row["attempted"] else 0
+        }
+        for row in rows
+    ]
+
+
+def subject_scores(student_id: str, exam: str, start: Optional[float] = None, end: Optional[float] = None) -> List[Dict]:
+    """Accuracy per subject over the range."""
+    with connection() as conn:
+        _ensure_schema(conn)
+        rows = conn.execute(
+            "SELECT subject, SUM(attempted) AS attempted, SUM(correct) AS correct "
+            "FROM performance_history "
+            "WHERE student_id = ? AND exam = ? AND taken_at BETWEEN ? AND ? "
+            "GROUP BY subject ORDER BY subject",
+            (student_id, exam) + _time_range(start, end)
+        ).fetchall()
+    return [
+        {
+            "name": row["subject"],
+            "attempted": row["attempted"],
+            "correct": row["correct"],
+            "pct": int(row["correct"] / row["attempted"] * 100) if row["attempted"] else 0
+        }
+        for row in rows
+    ]
+
+
+def student_history(
+    student_id: str,
+    exam: str,
+    start: Optional[float] = None,
+    end: Optional[float] = None,
+    topic: Optional[str] = None,
+    subject: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Score trend and subject breakdown (plus one topic's trend if asked,
+    optionally limited to one subject's topic of that name).
+    """
+    history = {
+        "student_id": student_id,
+        "exam": exam,
+        "trend": score_trend(student_id, exam, start, end),
+        "subjects": subject_scores(student_id, exam, start, end)
+    }
+    if topic:
+        history["topic"] = topic
+        if subject:
+            history["subject"] = subject
+        history["topic_trend"] = topic_trend(student_id, exam, topic, start, end, subject)
+    return history
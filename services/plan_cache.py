@@ -0,0 +1,207 @@
+"""
+Response cache for Gemini-generated study plans.
+
+A plan depends only on the exam, the set of weak topic names and the model,
+so the cache key is a hash of those three values. Lookups go through an
+in-process LRU tier first and then a persistent SQLite tier (via
+database.connection), so identical plans survive restarts and are shared by
+all workers using the same database file. Async callers use get_async and
+put_async, which check the LRU tier on the event loop and run the SQLite
+tier in a worker thread.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+from config import settings
+from database import connection
+
+logger = logging.getLogger(__name__)
+
+
+def make_plan_key(exam: str, weak_topics: Optional[List[Dict]], model: str) -> str:
+    """
+    Build a normalized cache key for a plan request.
+    Exam and topic names are case/whitespace-insensitive and topic order
+    does not matter.
+    """
+    names = sorted({str(t["name"]).strip().lower() for t in weak_topics or []})
+    payload = json.dumps(
+        {"exam": (exam or "").strip().lower(), "topics": names, "model": model},
+        separators=(",", ":")
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class PlanCache:
+    """
+    Two-tier (memory LRU + SQLite) plan cache with TTL and size-based eviction.
+    """
+
+    def __init__(self, memory_size: int, max_rows: int, ttl_seconds: float):
+        self.memory_size = memory_size
+        self.max_rows = max_rows
+        self.ttl_seconds = ttl_seconds
+        self._memory: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        # Async callers of one request share its connection from worker
+        # threads, so SQLite tier calls are serialized
+        self._db_lock = threading.Lock()
+        self._schema_ready = False
+        self.memory_hits = 0
+        self.db_hits = 0
+        self.misses = 0
+
+    def _ensure_schema(self, conn) -> None:
+        if self._schema_ready:
+            return
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS plan_cache (
+                cache_key TEXT PRIMARY KEY,
+                exam TEXT NOT NULL,
+                topics TEXT NOT NULL,
+                model TEXT NOT NULL,
+                plan_json TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            )
+        """)
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_plan_cache_last_access ON plan_cache(last_access)"
+        )
+        self._schema_ready = True
+
+    def _remember(self, key: str, plan: Any, created_at: float) -> None:
+        """Insert into the memory tier, evicting the least recently used entry."""
+        with self._lock:
+            self._memory[key] = (plan, created_at)
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.memory_size:
+                self._memory.popitem(last=False)
+
+    def _memory_get(self, key: str, now: float) -> Optional[Any]:
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                plan, created_at = entry
+                if now - created_at < self.ttl_seconds:
+                    self._memory.move_to_end(key)
+                    self.memory_hits += 1
+                    return plan
+                del self._memory[key]
+        return None
+
+    def _db_get(self, key: str, now: float) -> Optional[Any]:
+        try:
+            with self._db_lock, connection() as conn:
+                self._ensure_schema(conn)
+                row = conn.execute(
+                    "SELECT plan_json, created_at FROM plan_cache WHERE cache_key = ?",
+                    (key,)
+                ).fetchone()
+                if row is not None and now - row["created_at"] < self.ttl_seconds:
+                    conn.execute(
+                        "UPDATE plan_cache SET last_access = ? WHERE cache_key = ?",
+                        (now, key)
+                    )
+                    conn.commit()
+                    plan = json.loads(row["plan_json"])
+                    self._remember(key, plan, row["created_at"])
+                    with self._lock:
+                        self.db_hits += 1
+                    return plan
+        except Exception as e:
+            logger.warning(f"Plan cache lookup failed: {e}")
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return the cached plan for key, or None on a miss."""
+        now = time.time()
+        plan = self._memory_get(key, now)
+        if plan is not None:
+            return plan
+        return self._db_get(key, now)
+
+    async def get_async(self, key: str) -> Optional[Any]:
+        """get for async code: only an LRU miss leaves the event loop."""
+        now = time.time()
+        plan = self._memory_get(key, now)
+        if plan is not None:
+            return plan
+        return await asyncio.to_thread(self._db_get, key, now)
+
+    def _db_put(self, key: str, exam: str, topics: str, model: str, plan_json: str, now: float) -> None:
+        try:
+            with self._db_lock, connection() as conn:
+                self._ensure_schema(conn)
+                conn.execute(
+                    "INSERT OR REPLACE INTO plan_cache "
+                    "(cache_key, exam, topics, model, plan_json, created_at, last_access) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (key, exam, topics, model, plan_json, now, now)
+                )
+                conn.execute(
+                    "DELETE FROM plan_cache WHERE created_at < ?",
+                    (now - self.ttl_seconds,)
+                )
+                conn.execute(
+                    "DELETE FROM plan_cache WHERE cache_key IN ("
+                    "SELECT cache_key FROM plan_cache ORDER BY last_access DESC LIMIT -1 OFFSET ?)",
+                    (self.max_rows,)
+                )
+                conn.commit()
+        except Exception as e:
+            logger.warning(f"Plan cache write failed: {e}")
+
+    def put(self, key: str, exam: str, weak_topics: Optional[List[Dict]], model: str, plan: Any) -> None:
+        """Store a plan in both tiers and evict expired / excess rows."""
+        now = time.time()
+        self._remember(key, plan, now)
+        topics = ", ".join(sorted(t["name"] for t in weak_topics or []))
+        self._db_put(key, exam, topics, model, json.dumps(plan), now)
+
+    async def put_async(self, key: str, exam: str, weak_topics: Optional[List[Dict]], model: str, plan: Any) -> None:
+        """put for async code: the LRU tier is updated on the event loop."""
+        now = time.time()
+        self._remember(key, plan, now)
+        topics = ", ".join(sorted(t["name"] for t in weak_topics or []))
+        await asyncio.to_thread(self._db_put, key, exam, topics, model, json.dumps(plan), now)
+
+    def clear(self) -> None:
+        """Drop every cached plan (both tiers) and reset the counters."""
+        with self._lock:
+            self._memory.clear()
+            self.memory_hits = self.db_hits = self.misses = 0
+        with self._db_lock, connection() as conn:
+            self._ensure_schema(conn)
+            conn.execute("DELETE FROM plan_cache")
+            conn.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters for the cache."""
+        with self._lock:
+            hits = self.memory_hits + self.db_hits
+            lookups = hits + self.misses
+            return {
+                "memory_hits": self.memory_hits,
+                "db_hits": self.db_hits,
+                "misses": self.misses,
+                "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+                "memory_entries": len(self._memory)
+            }
+
+
+plan_cache = PlanCache(
+    memory_size=settings.PLAN_CACHE_MEMORY_SIZE,
+    max_rows=settings.PLAN_CACHE_MAX_ROWS,
+    ttl_seconds=settings.PLAN_CACHE_TTL_SECONDS
+)
@@ -0,0 +1,69 @@
+"""
+Plan engines behind /api/plan.
+
+- gemini: the Gemini plan (cached per exam and weak-topic set). If Gemini
+  fails, the local plan is served instead of the static fallback plan.
+- local: the 7-day template plan (services/plan_templates.py) for the
+  same weak topics Gemini is asked about. It is deterministic, makes no
+  network calls and takes well under a millisecond.
+- hybrid: the cached Gemini plan if there is one. Otherwise the local plan
+  is returned at once and the Gemini plan is generated in the background
+  and cached, so the next request for the same weak topics gets it. The
+  background call outlives the request and does not use its connection.
+"""
+
+import logging
+from typing import Any, Dict, List, Tuple
+
+from services.gemini_service import GEMINI_MODEL, generate_plan_async, refine_plan
+from services.metrics import Counter
+from services.plan_cache import plan_cache, make_plan_key
+from services.plan_templates import build_plan, plan_day_json
+from services.weightage import weightage_index
+
+logger = logging.getLogger(__name__)
+
+PLAN_ENGINES = ("gemini", "local", "hybrid")
+
+PLAN_RESPONSES = Counter(
+    "plan_responses_total", "/api/plan responses by engine and plan source (gemini or local)", ("engine", "source")
+)
+
+
+def local_plan(weak_topics: List[Dict], exam: str) -> List[Dict[str, Any]]:
+    """
+    The template 7-day plan for analyze_topics weak topics, in the PlanDay
+    format. Topics are ordered as StudyAgent ranks them: lowest accuracy
+    weighted by exam weightage first.
+    """
+    ranked = sorted(
+        weak_topics,
+        key=lambda t: -(100 - t.get("score", 0)) * weightage_index.weightage(exam, t.get("subject", ""), t["name"])
+    )
+    subjects = list(dict.fromkeys(t.get("subject") or "General" for t in ranked))
+    return [plan_day_json(day) for day in build_plan(subjects, [t["name"] for t in ranked])]
+
+
+async def plan_for(weak_topics: List[Dict], exam: str, engine: str) -> Tuple[List[Dict[str, Any]], str]:
+    """
+    The plan for a request's weak topics and its source, "gemini" or
+    "local". Every engine plans for the same weak topics.
+    """
+    if engine == "hybrid":
+        cached = await plan_cache.get_async(make_plan_key(exam, weak_topics, GEMINI_MODEL))
+        if cached is not None:
+            plan, source = cached, "gemini"
+        else:
+            refine_plan(weak_topics, exam)
+            plan, source = local_plan(weak_topics, exam), "local"
+    elif engine == "gemini":
+        try:
+            plan, source = await generate_plan_async(weak_topics, exam), "gemini"
+        except Exception as e:
+            logger.warning(f"Gemini API failed, using local plan: {str(e)}")
+            plan, source = local_plan(weak_topics, exam), "local"
+    else:
+        plan, source = local_plan(weak_topics, exam), "local"
+
+    PLAN_RESPONSES.inc(engine=engine, source=source)
+    return plan, source
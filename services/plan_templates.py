@@ -0,0 +1,224 @@
+"""
+Compiled templates for the StudyAgent 7-day revision plan.
+
+Each day's theme and activities are declared once as templates, with
+durations parsed to minutes when the module is imported. Day blocks only
+depend on (day, focus subject, topic, second topic), so rendered blocks
+are memoized, and whole plans are memoized per (subjects, topics)
+ordering. Plans are immutable (frozen DayPlans holding tuples), so one
+instance is shared by every student with the same weak-topic ordering.
+"""
+
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Dict, NamedTuple, Optional, Sequence, Tuple
+
+# Memoized rendered day blocks and whole plans
+DAY_CACHE_SIZE = 16384
+PLAN_CACHE_SIZE = 4096
+
+PLAN_DAYS = 7
+
+# Day accent colours (colour, light background) in the frontend PlanDay format
+PLAN_COLORS = (
+    ("#ff6b35", "rgba(255,107,53,0.08)"),
+    ("#6c47ff", "rgba(108,71,255,0.08)"),
+    ("#00c896", "rgba(0,200,150,0.08)"),
+)
+
+
+class Activity(NamedTuple):
+    """One plan activity; _asdict() gives the report format"""
+    type: str
+    desc: str
+    time: str
+
+
+@dataclass(frozen=True)
+class DayPlan:
+    """Single day's revision plan"""
+    day: int
+    title: str
+    focus_subject: str
+    topics: Tuple[str, ...]
+    activities: Tuple[Activity, ...]
+    total_hours: float
+    mcq_practice: int
+    expected_outcome: str
+
+
+@dataclass(frozen=True)
+class DayTemplate:
+    """A day's theme and activities; descs may use {topic} and {second}"""
+    title: str
+    subtitle: str
+    activities: Tuple[Tuple[str, str, str], ...]
+
+    @property
+    def total_minutes(self) -> int:
+        return sum(int(time.split()[0]) for _, _, time in self.activities)
+
+    @property
+    def uses_second(self) -> bool:
+        return any("{second}" in desc for _, desc, _ in self.activities)
+
+    @property
+    def uses_topic(self) -> bool:
+        return any("{topic}" in desc for _, desc, _ in self.activities)
+
+
+DAY_TEMPLATES = (
+    DayTemplate("Foundation Day", "Build conceptual foundations", (
+        ("Warm-up", "Quick basics review", "15 min"),
+        ("Concept Learning", "Learn {topic} fundamentals", "45 min"),
+        ("Video Lecture", "Watch recommended video", "30 min"),
+        ("MCQ Practice", "Solve 10 MCQs on {topic}", "30 min"),
+    )),
+    DayTemplate("Deep Dive", "Intensive topic coverage", (
+        ("Quick Review", "Revise previous topic", "15 min"),
+        ("Deep Dive", "Advanced {topic} concepts", "60 min"),
+        ("Practice", "Solve 15 problems on {topic}", "45 min"),
+        ("Doubt Clearing", "Clear doubts", "20 min"),
+    )),
+    DayTemplate("Mixed Practice", "Combine multiple topics", (
+        ("Topic Review", "Review {topic}", "30 min"),
+        ("Mixed Practice", "Practice {topic} and {second}", "60 min"),
+        ("Error Analysis", "Analyze mistakes", "30 min"),
+        ("MCQ Test", "Topic-wise test", "30 min"),
+    )),
+    DayTemplate("Focus Weak Areas", "Target weak topics", (
+        ("Focus Practice", "Intensive {topic} practice", "60 min"),
+        ("Timer Practice", "Timed questions (2 min each)", "30 min"),
+        ("Formula Review", "Key formulas", "20 min"),
+        ("Quick Quiz", "10 quick MCQs", "20 min"),
+    )),
+    DayTemplate("Full Mock Test", "Simulate exam conditions", (
+        ("Mock Test", "Full 25Q practice test", "75 min"),
+        ("Analysis", "Analyze results", "30 min"),
+        ("Error Review", "Review mistakes", "25 min"),
+        ("Planning", "Plan next focus", "10 min"),
+    )),
+    DayTemplate("Rapid Revision", "Quick review of all topics", (
+        ("Rapid Review", "Quick revision of weak topics", "45 min"),
+        ("Key Concepts", "Important formulas & concepts", "30 min"),
+        ("Previous Errors", "Review past mistakes", "30 min"),
+        ("Confidence", "Easy questions for confidence", "20 min"),
+    )),
+    DayTemplate("Final Prep", "Last minute tips & strategy", (
+        ("Light Review", "Relaxed key topics revision", "30 min"),
+        ("Formula Sheet", "Quick formula revision", "20 min"),
+        ("Strategy", "Exam tips & time management", "20 min"),
+        ("Rest", "Stay calm and prepared", "10 min"),
+    )),
+)
+
+
+class _CompiledDay(NamedTuple):
+    title: str
+    activities: Tuple[Tuple[str, str, str], ...]
+    # Activities with no placeholders, rendered once
+    static_activities: Optional[Tuple[Activity, ...]]
+    uses_second: bool
+    total_hours: float
+    mcq_practice: int
+
+
+def _compile(day: int, template: DayTemplate) -> _CompiledDay:
+    static = None
+    if not template.uses_topic and not template.uses_second:
+        static = tuple(Activity(*activity) for activity in template.activities)
+    return _CompiledDay(
+        title=template.title,
+        activities=template.activities,
+        static_activities=static,
+        uses_second=template.uses_second,
+        total_hours=round(template.total_minutes / 60, 2),
+        mcq_practice=10 + (day * 2)
+    )
+
+
+_COMPILED_DAYS = tuple(_compile(day, template) for day, template in enumerate(DAY_TEMPLATES, 1))
+
+
+@lru_cache(maxsize=DAY_CACHE_SIZE)
+def render_day(day: int, focus_subject: str, topic: str, second: Optional[str] = None) -> DayPlan:
+    """One day's block (day is 1-based); second is only used by mixed days."""
+    compiled = _COMPILED_DAYS[day - 1]
+    activities = compiled.static_activities
+    if activities is None:
+        activities = tuple(
+            Activity(kind, desc.format(topic=topic, second=second), time)
+            for kind, desc, time in compiled.activities
+        )
+    return DayPlan(
+        day=day,
+        title=compiled.title,
+        focus_subject=focus_subject,
+        topics=(topic,),
+        activities=activities,
+        total_hours=compiled.total_hours,
+        mcq_practice=compiled.mcq_practice,
+        expected_outcome=f"Improved understanding of {topic}"
+    )
+
+
+@lru_cache(maxsize=PLAN_CACHE_SIZE)
+def _compiled_plan(subjects: Tuple[str, ...], topic_names: Tuple[str, ...]) -> Tuple[DayPlan, ...]:
+    plan = []
+    for day in range(1, PLAN_DAYS + 1):
+        topic = topic_names[(day - 1) % len(topic_names)]
+        second = topic_names[day % len(topic_names)] if _COMPILED_DAYS[day - 1].uses_second else None
+        plan.append(render_day(day, subjects[(day - 1) % len(subjects)], topic, second))
+    return tuple(plan)
+
+
+def day_to_json(plan: DayPlan) -> Dict[str, Any]:
+    """Report format of a day's plan"""
+    return {
+        "day": plan.day,
+        "title": plan.title,
+        "focus_subject": plan.focus_subject,
+        "topics": list(plan.topics),
+        "activities": [a._asdict() for a in plan.activities],
+        "total_hours": plan.total_hours,
+        "mcq_practice": plan.mcq_practice,
+        "expected_outcome": plan.expected_outcome
+    }
+
+
+@lru_cache(maxsize=DAY_CACHE_SIZE)
+def _plan_day_strings(plan: DayPlan) -> Tuple[str, Tuple[str, ...], str]:
+    """Rendered focus, tasks and time of a day's plan (immutable, memoized)"""
+    return (
+        f"{plan.focus_subject}: {', '.join(plan.topics)}",
+        tuple(f"{a.desc} ({a.time})" for a in plan.activities),
+        f"{plan.total_hours:g} hours"
+    )
+
+
+def plan_day_json(plan: DayPlan) -> Dict[str, Any]:
+    """
+    Frontend PlanDay format of a day's plan - the shape of Gemini plans.
+    The strings are memoized per day block; every call returns a new dict
+    and tasks list, so callers may modify them.
+    """
+    focus, tasks, time = _plan_day_strings(plan)
+    color, light = PLAN_COLORS[(plan.day - 1) % len(PLAN_COLORS)]
+    return {
+        "day": plan.day,
+        "title": plan.title,
+        "focus": focus,
+        "tasks": list(tasks),
+        "time": time,
+        "mcqs": plan.mcq_practice,
+        "color": color,
+        "light": light
+    }
+
+
+def build_plan(subjects: Sequence[str], topic_names: Sequence[str]) -> Tuple[DayPlan, ...]:
+    """
+    The 7-day plan for weak-topic subjects and names in priority order.
+    The returned plan is shared; it is immutable.
+    """
+    return _compiled_plan(tuple(subjects) or ("General",), tuple(topic_names) or ("General Revision",))
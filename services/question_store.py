@@ -0,0 +1,173 @@
+"""
+Compact question storage for large batch runs.
+
+QuestionStore keeps questions as a struct of arrays. Repeated strings
+(subject/topic pairs, subtopics, difficulty, answers) are interned into
+per-store category tables and stored as integer codes, so a question costs
+a few dozen bytes instead of a full Question dataclass with its own
+__dict__ and string copies.
+
+Iterating the store yields slotted QuestionRecord views with the same
+attributes as Question, so StudyAgent code written against Question works
+unchanged. The columnar engine reads the arrays directly.
+"""
+
+from array import array
+from typing import Any, Dict, Iterable, Iterator, List, Tuple
+
+
+class QuestionRecord:
+    """Slotted, read-only-by-convention question with Question's attributes"""
+    __slots__ = (
+        'question_id', 'topic', 'subtopic', 'subject', 'correct_answer',
+        'student_answer', 'is_correct', 'time_spent_seconds', 'difficulty'
+    )
+
+    def __init__(self, question_id, topic, subtopic, subject, correct_answer,
+                 student_answer, is_correct, time_spent_seconds, difficulty):
+        self.question_id = question_id
+        self.topic = topic
+        self.subtopic = subtopic
+        self.subject = subject
+        self.correct_answer = correct_answer
+        self.student_answer = student_answer
+        self.is_correct = is_correct
+        self.time_spent_seconds = time_spent_seconds
+        self.difficulty = difficulty
+
+    def __repr__(self) -> str:
+        return f"QuestionRecord({self.question_id!r}, {self.subject}:{self.topic})"
+
+
+class _Categories:
+    """Interning table: value -> code, code -> value"""
+    __slots__ = ('codes', 'values')
+
+    def __init__(self):
+        self.codes: Dict[Any, int] = {}
+        self.values: List[Any] = []
+
+    def code(self, value: Any) -> int:
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+
+class QuestionStore:
+    """
+    Struct-of-arrays question storage with categorical string columns.
+    """
+
+    def __init__(self):
+        self.question_ids: List[str] = []
+        # (subject, topic) pairs in first-appearance order
+        self.topic_keys = _Categories()
+        self.subtopics = _Categories()
+        self.difficulties = _Categories()
+        self.answers = _Categories()
+
+        self.topic_codes = array('I')
+        self.subtopic_codes = array('I')
+        # Up to 65536 distinct difficulty labels
+        self.difficulty_codes = array('H')
+        self.correct_answer_codes = array('I')
+        self.student_answer_codes = array('I')
+        self.is_correct = array('b')
+        self.time_spent = array('d')
+        self._int_times = True
+
+    @classmethod
+    def from_dicts(cls, questions: Iterable[Dict[str, Any]]) -> "QuestionStore":
+        """Build a store from question dicts in the agent input format."""
+        store = cls()
+        for q in questions:
+            store.append(q)
+        return store
+
+    def append(self, q: Dict[str, Any]) -> None:
+        """Add one question dict (same defaults as StudyAgent.load_data)."""
+        time_spent = q.get('time_spent_seconds', 0)
+        if self._int_times and not isinstance(time_spent, int):
+            self._int_times = False
+
+        self.question_ids.append(q.get('question_id', ''))
+        self.topic_codes.append(self.topic_keys.code((q.get('subject', 'General'), q.get('topic', 'General'))))
+        self.subtopic_codes.append(self.subtopics.code(q.get('subtopic', 'General')))
+        self.difficulty_codes.append(self.difficulties.code(q.get('difficulty', 'medium')))
+        self.correct_answer_codes.append(self.answers.code(q.get('correct_answer', '')))
+        self.student_answer_codes.append(self.answers.code(q.get('student_answer')))
+        self.is_correct.append(1 if q.get('is_correct', False) else 0)
+        self.time_spent.append(time_spent)
+
+    def __len__(self) -> int:
+        return len(self.question_ids)
+
+    def _record(self, i: int) -> QuestionRecord:
+        subject, topic = self.topic_keys.values[self.topic_codes[i]]
+        time_spent = self.time_spent[i]
+        return QuestionRecord(
+            self.question_ids[i],
+            topic,
+            self.subtopics.values[self.subtopic_codes[i]],
+            subject,
+            self.answers.values[self.correct_answer_codes[i]],
+            self.answers.values[self.student_answer_codes[i]],
+            bool(self.is_correct[i]),
+            int(time_spent) if self._int_times else time_spent,
+            self.difficulties.values[self.difficulty_codes[i]]
+        )
+
+    def __getitem__(self, i: int) -> QuestionRecord:
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError("question index out of range")
+        return self._record(i)
+
+    def __iter__(self) -> Iterator[QuestionRecord]:
+        for i in range(len(self.question_ids)):
+            yield self._record(i)
+
+    def correct_count(self) -> int:
+        """Number of correctly answered questions."""
+        return sum(self.is_correct)
+
+    def columns(self):
+        """
+        QuestionColumns for the columnar engine. time_spent shares the
+        store's buffer; the other columns are converted into new arrays.
+        Topic keys follow the same first-appearance order as analyze_errors.
+        """
+        import numpy as np
+        from services.columnar_analysis import QuestionColumns
+
+        hard_code = self.difficulties.codes.get('hard')
+        difficulty = np.frombuffer(self.difficulty_codes, dtype=np.uint16)
+
+        # Several (subject, topic) pairs can share one "subject:topic" key;
+        # merge them onto the first pair's code as analyze_errors does.
+        key_codes: Dict[str, int] = {}
+        remap = np.array([
+            key_codes.setdefault(f"{subject}:{topic}", len(key_codes))
+            for subject, topic in self.topic_keys.values
+        ], dtype=np.int64)
+        first_pair: Dict[int, Tuple[str, str]] = {}
+        for pair_code, key_code in enumerate(remap.tolist()):
+            first_pair.setdefault(key_code, self.topic_keys.values[pair_code])
+
+        topic_codes = np.frombuffer(self.topic_codes, dtype=np.uint32).astype(np.int64)
+        if len(remap):
+            topic_codes = remap[topic_codes]
+
+        return QuestionColumns(
+            topic_keys=list(key_codes),
+            topic_meta=[first_pair[code] for code in range(len(key_codes))],
+            subtopic_names=list(self.subtopics.values),
+            topic_codes=topic_codes,
+            subtopic_codes=np.frombuffer(self.subtopic_codes, dtype=np.uint32).astype(np.int64),
+            is_correct=np.frombuffer(self.is_correct, dtype=np.int8).astype(bool),
+            time_spent=np.frombuffer(self.time_spent, dtype=np.float64),
+            is_hard=(difficulty == hard_code) if hard_code is not None else np.zeros(len(self), dtype=bool)
+        )
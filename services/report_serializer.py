@@ -0,0 +1,58 @@
+"""
+Direct JSON encoding of StudyAgent reports.
+
+Reports built with formatted=False keep their TopicAnalysis,
+StudyResource and DayPlan objects; encode() writes them straight to
+UTF-8 bytes with orjson, converting each object to its report fields
+inside the encoder instead of building a dict copy of the whole report
+for FastAPI's jsonable_encoder and json.dumps to walk again. Plan days
+are shared, immutable objects, so their encoded form is cached.
+
+Without orjson installed the same bytes are produced with the stdlib
+json module.
+"""
+
+import json
+from enum import Enum
+from functools import lru_cache
+from typing import Any, Dict
+
+from fastapi.responses import Response
+
+from services.plan_templates import DayPlan, day_to_json
+from services.study_agent import StudyResource, TopicAnalysis, resource_to_json, topic_to_json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Encoded plan days (DayPlans are shared between reports)
+DAY_CACHE_SIZE = 16384
+
+_cached_day = lru_cache(maxsize=DAY_CACHE_SIZE)(day_to_json)
+
+
+def _default(obj: Any) -> Any:
+    """Report fields of the agent's objects (called by the encoder)."""
+    if isinstance(obj, TopicAnalysis):
+        return topic_to_json(obj)
+    if isinstance(obj, StudyResource):
+        return resource_to_json(obj)
+    if isinstance(obj, DayPlan):
+        return _cached_day(obj)
+    if isinstance(obj, Enum):
+        return obj.value
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+def encode(obj: Any) -> bytes:
+    """Encode a report (formatted or not) to JSON bytes."""
+    if orjson is not None:
+        return orjson.dumps(obj, default=_default, option=orjson.OPT_PASSTHROUGH_DATACLASS)
+    return json.dumps(obj, default=_default, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def report_response(report: Dict[str, Any]) -> Response:
+    """A pre-rendered JSON response, bypassing FastAPI's response encoding."""
+    return Response(content=encode(report), media_type="application/json")
@@ -10,12 +10,17 @@ Features:
 - Adaptive learning based on performance
 """
 
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 from dataclasses import dataclass, field
 from enum import Enum
 import json
 import logging
 
+from services.metrics import STAGE_SECONDS
+from services.plan_templates import DayPlan, build_plan, day_to_json
+from services.question_store import QuestionStore
+from services.weightage import weightage_index
+
 logger = logging.getLogger(__name__)
 
 
@@ -75,55 +80,21 @@ TRUSTED_SOURCES = {
     }
 }
 
-# Exam weightage (higher = more important for JEE/NEET)
-EXAM_WEIGHTAGE = {
-    "JEE Mains": {
-        "Physics": {
-            "Mechanics": 25, "Electrodynamics": 20, "Modern Physics": 15,
-            "Thermodynamics": 15, "Waves & Optics": 15, "SHM & Waves": 10
-        },
-        "Chemistry": {
-            "Physical Chemistry": 30, "Organic Chemistry": 35, "Inorganic Chemistry": 35
-        },
-        "Mathematics": {
-            "Calculus": 30, "Algebra": 25, "Coordinate Geometry": 20,
-            "Trigonometry": 15, "Vectors & 3D": 10
-        }
-    },
-    "JEE Advanced": {
-        "Physics": {
-            "Mechanics": 30, "Electrodynamics": 25, "Modern Physics": 15,
-            "Thermodynamics": 10, "Optics": 10, "Waves": 10
-        },
-        "Chemistry": {
-            "Physical Chemistry": 25, "Organic Chemistry": 40, "Inorganic Chemistry": 35
-        },
-        "Mathematics": {
-            "Calculus": 35, "Algebra": 30, "Coordinate Geometry": 20,
-            "Trigonometry": 10, "Vectors": 5
-        }
-    },
-    "NEET": {
-        "Physics": {
-            "Mechanics": 20, "Electrodynamics": 18, "Modern Physics": 16,
-            "Thermodynamics": 12, "Waves & Optics": 10, "Fluid Mechanics": 8,
-            "SHM & Waves": 8, "Properties of Matter": 8
-        },
-        "Chemistry": {
-            "Physical Chemistry": 25, "Organic Chemistry": 28, "Inorganic Chemistry": 27
-        },
-        "Biology": {
-            "Human Physiology": 25, "Genetics": 20, "Ecology": 15,
-            "Cell Biology": 15, "Plant Diversity": 10, "Animal Diversity": 10,
-            "Biotechnology": 5
-        }
-    }
-}
+# Exam weightage (higher = more important for JEE/NEET), from data/exam_weightage.json
+EXAM_WEIGHTAGE = weightage_index.tables
 
 DEFAULT_WEIGHTAGE = {
     "Physics": 15, "Chemistry": 15, "Mathematics": 15, "Biology": 15
 }
 
+# Strength levels treated as weak topics, and the accuracy (%) at or
+# below which a topic is weak
+WEAK_LEVELS = (TopicStrength.VERY_WEAK, TopicStrength.WEAK)
+WEAK_ACCURACY = 60
+
+# Formula-based topics where errors are usually calculation mistakes
+FORMULA_TOPICS = ['mechanics', 'thermodynamics', 'electrodynamics', 'calculus', 'physical chemistry']
+
 
 @dataclass
 class Question:
@@ -164,17 +135,73 @@ class StudyResource:
     url: str
 
 
-@dataclass
-class DayPlan:
-    """Single day's revision plan"""
-    day: int
-    title: str
-    focus_subject: str
-    topics: List[str]
-    activities: List[Dict[str, str]]
-    total_hours: float
-    mcq_practice: int
-    expected_outcome: str
+def topic_to_json(t: TopicAnalysis) -> Dict[str, Any]:
+    """Report format of a weak topic"""
+    return {
+        "topic": t.topic_name,
+        "subject": t.subject,
+        "accuracy": round(t.accuracy_percentage, 1),
+        "strength": t.strength_level.value,
+        "questions_count": t.total_questions,
+        "error_patterns": [p.value for p in t.error_patterns]
+    }
+
+
+def resource_to_json(r: StudyResource) -> Dict[str, str]:
+    """Report format of a study resource"""
+    return {
+        "topic": r.topic,
+        "title": r.title,
+        "source": r.source,
+        "type": r.resource_type,
+        "time": r.estimated_time,
+        "link": r.url
+    }
+
+
+def classify_strength(accuracy: float) -> TopicStrength:
+    """Map topic accuracy (0-100) to a strength level"""
+    if accuracy <= 40:
+        return TopicStrength.VERY_WEAK
+    elif accuracy <= WEAK_ACCURACY:
+        return TopicStrength.WEAK
+    elif accuracy <= 75:
+        return TopicStrength.MODERATE
+    return TopicStrength.STRONG
+
+
+_MAX_FORMULA_LEN = max(len(ft) for ft in FORMULA_TOPICS)
+
+
+def patterns_from_counts(
+    topic: str,
+    error_count: int,
+    slow_errors: int,
+    hard_errors: int
+) -> List[ErrorPattern]:
+    """
+    Same rules as StudyAgent._detect_patterns, from per-topic error
+    counters instead of the error list.
+    """
+    patterns = []
+    
+    if not error_count:
+        return patterns
+    
+    if slow_errors >= error_count * 0.3:
+        patterns.append(ErrorPattern.TIME_MANAGEMENT)
+    
+    if hard_errors >= error_count * 0.5:
+        patterns.append(ErrorPattern.CONCEPTUAL_GAP)
+    
+    # _detect_patterns searches the topic name repeated once per error;
+    # only enough repeats to contain any formula-topic match are needed.
+    lower = topic.lower()
+    repeats = min(error_count, _MAX_FORMULA_LEN // (len(lower) + 1) + 2)
+    if any(ft in ' '.join([lower] * repeats) for ft in FORMULA_TOPICS):
+        patterns.append(ErrorPattern.CALCULATION_MISTAKE)
+    
+    return patterns
 
 
 class StudyAgent:
@@ -185,15 +212,19 @@ class StudyAgent:
     personalized revision plans with trusted resources.
     """
 
-    def __init__(self, exam_type: str = "JEE Mains"):
+    def __init__(self, exam_type: str = "JEE Mains", engine: str = "python", compact: bool = False):
         self.exam_type = exam_type
-        self.weightage = EXAM_WEIGHTAGE.get(exam_type, DEFAULT_WEIGHTAGE)
+        self.engine = engine
+        self.compact = compact
+        self.weightage = weightage_index.table(exam_type) or DEFAULT_WEIGHTAGE
+        # List[Question], or a QuestionStore when compact=True
         self.questions: List[Question] = []
         self.topic_analysis: Dict[str, TopicAnalysis] = {}
         self.student_name: str = "Student"
         self.mock_test_id: str = ""
         self.ocr_available: bool = True
 
+    @STAGE_SECONDS.timed(stage="load_data")
     def load_data(
         self,
         mock_test_data: Dict[str, Any],
@@ -208,7 +239,7 @@ class StudyAgent:
         self.student_name = student_name
         self.exam_type = mock_test_data.get('exam_type', self.exam_type)
         self.mock_test_id = mock_test_data.get('mock_test_id', '')
-        self.weightage = EXAM_WEIGHTAGE.get(self.exam_type, DEFAULT_WEIGHTAGE)
+        self.weightage = weightage_index.table(self.exam_type) or DEFAULT_WEIGHTAGE
         
         # Check OCR availability
         self.ocr_available = bool(ocr_text and len(ocr_text.strip()) > 50)
@@ -217,6 +248,12 @@ class StudyAgent:
             logger.warning("OCR text incomplete, using structured data only")
         
         # Parse questions
+        if self.compact:
+            # Struct-of-arrays storage for large batch runs
+            self.questions = QuestionStore.from_dicts(mock_test_data.get('questions', []))
+            logger.info(f"Loaded {len(self.questions)} questions for {self.exam_type}")
+            return
+        
         self.questions = []
         for q in mock_test_data.get('questions', []):
             question = Question(
@@ -234,11 +271,23 @@ class StudyAgent:
         
         logger.info(f"Loaded {len(self.questions)} questions for {self.exam_type}")
 
+    @STAGE_SECONDS.timed(stage="analyze_errors")
     def analyze_errors(self) -> Dict[str, TopicAnalysis]:
         """
         Analyze errors by Subject → Topic → Subtopic.
         Detects mistake patterns and calculates accuracy.
+        
+        With engine="columnar" the NumPy engine in
+        services/columnar_analysis.py produces the same result.
         """
+        if self.engine == "columnar":
+            from services.columnar_analysis import analyze_columns, analyze_questions
+            if isinstance(self.questions, QuestionStore):
+                self.topic_analysis = analyze_columns(self.questions.columns())
+            else:
+                self.topic_analysis = analyze_questions(self.questions)
+            return self.topic_analysis
+        
         topic_data: Dict[str, Dict] = {}
         
         for question in self.questions:
@@ -280,14 +329,7 @@ class StudyAgent:
             avg_time = data['time_spent'] / data['total'] if data['total'] > 0 else 0
             
             # Classify strength
-            if accuracy <= 40:
-                strength = TopicStrength.VERY_WEAK
-            elif accuracy <= 60:
-                strength = TopicStrength.WEAK
-            elif accuracy <= 75:
-                strength = TopicStrength.MODERATE
-            else:
-                strength = TopicStrength.STRONG
+            strength = classify_strength(accuracy)
             
             # Detect error patterns
             error_patterns = self._detect_patterns(data['errors'])
@@ -326,31 +368,24 @@ class StudyAgent:
             patterns.append(ErrorPattern.CONCEPTUAL_GAP)
         
         # Calculation mistakes (formula-based topics)
-        formula_topics = ['mechanics', 'thermodynamics', 'electrodynamics', 'calculus', 'physical chemistry']
-        if any(ft in ' '.join([e.topic.lower() for e in errors]) for ft in formula_topics):
+        if any(ft in ' '.join([e.topic.lower() for e in errors]) for ft in FORMULA_TOPICS):
             patterns.append(ErrorPattern.CALCULATION_MISTAKE)
         
         return patterns[:3]
 
+    @STAGE_SECONDS.timed(stage="identify_weak_topics")
     def identify_weak_topics(self, max_topics: int = 10) -> List[TopicAnalysis]:
         """Identify weak topics prioritizing accuracy + exam weightage"""
-        weak = []
+        from services.topic_ranking import rank_weak_topics
         
-        for topic_key, analysis in self.topic_analysis.items():
-            if analysis.strength_level in [TopicStrength.VERY_WEAK, TopicStrength.WEAK]:
-                weightage = self._get_weightage(analysis.subject, analysis.topic_name)
-                priority = (100 - analysis.accuracy_percentage) * (weightage / 100)
-                weak.append({'topic': analysis, 'priority': priority, 'weightage': weightage})
-        
-        weak.sort(key=lambda x: x['priority'], reverse=True)
-        return [w['topic'] for w in weak[:max_topics]]
+        # Bounded-heap top-k; ties keep analysis order, as a stable sort would
+        return [analysis for _, analysis in rank_weak_topics(self.topic_analysis.values(), self.exam_type, max_topics)]
 
     def _get_weightage(self, subject: str, topic: str) -> float:
-        """Get topic weightage for exam"""
-        if self.exam_type in EXAM_WEIGHTAGE:
-            return EXAM_WEIGHTAGE[self.exam_type].get(subject, {}).get(topic, 10)
-        return 10
+        """Get topic weightage for exam (aliases resolve to the parent topic)"""
+        return weightage_index.weightage(self.exam_type, subject, topic)
 
+    @STAGE_SECONDS.timed(stage="get_resources")
     def get_resources(self, weak_topics: List[TopicAnalysis]) -> Dict[str, List[StudyResource]]:
         """Get study materials from trusted sources only"""
         resources = {}
@@ -398,114 +433,33 @@ class StudyAgent:
         
         return resources
 
+    @STAGE_SECONDS.timed(stage="generate_7day_plan")
     def generate_7day_plan(
         self,
         weak_topics: List[TopicAnalysis],
         resources: Dict[str, List[StudyResource]]
-    ) -> List[DayPlan]:
-        """Generate personalized 7-day revision plan"""
-        
-        # Get subjects and topics
-        subjects = list(set(t.subject for t in weak_topics)) or ["General"]
-        topic_names = [t.topic_name for t in weak_topics]
-        
-        if not topic_names:
-            topic_names = ["General Revision"]
-        
-        # Day themes
-        day_themes = [
-            ("Foundation Day", "Build conceptual foundations"),
-            ("Deep Dive", "Intensive topic coverage"),
-            ("Mixed Practice", "Combine multiple topics"),
-            ("Focus Weak Areas", "Target weak topics"),
-            ("Full Mock Test", "Simulate exam conditions"),
-            ("Rapid Revision", "Quick review of all topics"),
-            ("Final Prep", "Last minute tips & strategy")
-        ]
-        
-        plan = []
-        
-        for day in range(1, 8):
-            title, subtitle = day_themes[day - 1]
-            focus_subject = subjects[(day - 1) % len(subjects)]
-            topic = topic_names[(day - 1) % len(topic_names)]
-            
-            # Build activities
-            if day == 1:
-                activities = [
-                    {"type": "Warm-up", "desc": "Quick basics review", "time": "15 min"},
-                    {"type": "Concept Learning", "desc": f"Learn {topic} fundamentals", "time": "45 min"},
-                    {"type": "Video Lecture", "desc": "Watch recommended video", "time": "30 min"},
-                    {"type": "MCQ Practice", "desc": f"Solve 10 MCQs on {topic}", "time": "30 min"}
-                ]
-            elif day == 2:
-                activities = [
-                    {"type": "Quick Review", "desc": "Revise previous topic", "time": "15 min"},
-                    {"type": "Deep Dive", "desc": f"Advanced {topic} concepts", "time": "60 min"},
-                    {"type": "Practice", "desc": f"Solve 15 problems on {topic}", "time": "45 min"},
-                    {"type": "Doubt Clearing", "desc": "Clear doubts", "time": "20 min"}
-                ]
-            elif day == 3:
-                second = topic_names[(day) % len(topic_names)]
-                activities = [
-                    {"type": "Topic Review", "desc": f"Review {topic}", "time": "30 min"},
-                    {"type": "Mixed Practice", "desc": f"Practice {topic} and {second}", "time": "60 min"},
-                    {"type": "Error Analysis", "desc": "Analyze mistakes", "time": "30 min"},
-                    {"type": "MCQ Test", "desc": "Topic-wise test", "time": "30 min"}
-                ]
-            elif day == 4:
-                activities = [
-                    {"type": "Focus Practice", "desc": f"Intensive {topic} practice", "time": "60 min"},
-                    {"type": "Timer Practice", "desc": "Timed questions (2 min each)", "time": "30 min"},
-                    {"type": "Formula Review", "desc": "Key formulas", "time": "20 min"},
-                    {"type": "Quick Quiz", "desc": "10 quick MCQs", "time": "20 min"}
-                ]
-            elif day == 5:
-                activities = [
-                    {"type": "Mock Test", "desc": "Full 25Q practice test", "time": "75 min"},
-                    {"type": "Analysis", "desc": "Analyze results", "time": "30 min"},
-                    {"type": "Error Review", "desc": "Review mistakes", "time": "25 min"},
-                    {"type": "Planning", "desc": "Plan next focus", "time": "10 min"}
-                ]
-            elif day == 6:
-                activities = [
-                    {"type": "Rapid Review", "desc": "Quick revision of weak topics", "time": "45 min"},
-                    {"type": "Key Concepts", "desc": "Important formulas & concepts", "time": "30 min"},
-                    {"type": "Previous Errors", "desc": "Review past mistakes", "time": "30 min"},
-                    {"type": "Confidence", "desc": "Easy questions for confidence", "time": "20 min"}
-                ]
-            else:
-                activities = [
-                    {"type": "Light Review", "desc": "Relaxed key topics revision", "time": "30 min"},
-                    {"type": "Formula Sheet", "desc": "Quick formula revision", "time": "20 min"},
-                    {"type": "Strategy", "desc": "Exam tips & time management", "time": "20 min"},
-                    {"type": "Rest", "desc": "Stay calm and prepared", "time": "10 min"}
-                ]
-            
-            total_min = sum(int(a['time'].split()[0]) for a in activities)
-            
-            plan.append(DayPlan(
-                day=day,
-                title=title,
-                focus_subject=focus_subject,
-                topics=[topic],
-                activities=activities,
-                total_hours=round(total_min / 60, 2),
-                mcq_practice=10 + (day * 2),
-                expected_outcome=f"Improved understanding of {topic}"
-            ))
-        
-        return plan
+    ) -> Tuple[DayPlan, ...]:
+        """
+        Generate personalized 7-day revision plan.
+        Plans come from compiled templates (services/plan_templates.py) and
+        are shared between students with the same weak-topic ordering.
+        """
+        # Subjects in priority order of their first weak topic
+        subjects = list(dict.fromkeys(t.subject for t in weak_topics))
+        return build_plan(subjects, [t.topic_name for t in weak_topics])
 
     def generate_report(
         self,
         mock_test_data: Dict[str, Any],
         student_name: str = "Student",
-        ocr_text: Optional[str] = None
+        ocr_text: Optional[str] = None,
+        formatted: bool = True
     ) -> Dict[str, Any]:
         """
         Generate complete analysis report.
-        Handles missing OCR gracefully.
+        Handles missing OCR gracefully. With formatted=False the report
+        keeps the TopicAnalysis, StudyResource and DayPlan objects for
+        services/report_serializer.py to encode directly.
         """
         # Load data
         self.load_data(mock_test_data, student_name, ocr_text)
@@ -513,6 +467,53 @@ class StudyAgent:
         # Analyze
         self.analyze_errors()
         
+        # Calculate stats
+        total_q = len(self.questions)
+        if isinstance(self.questions, QuestionStore):
+            correct_q = self.questions.correct_count()
+        else:
+            correct_q = sum(1 for q in self.questions if q.is_correct)
+        
+        return self._build_report(total_q, correct_q, formatted)
+
+    def generate_incremental_report(
+        self,
+        student_id: str,
+        mock_test_data: Dict[str, Any],
+        student_name: str = "Student",
+        ocr_text: Optional[str] = None,
+        formatted: bool = True
+    ) -> Dict[str, Any]:
+        """
+        Generate the report over the student's whole history, sending only
+        the new mock's questions.
+        
+        The new questions are folded into the per-student aggregates stored
+        in SQLite (services/analysis_state.py) and topic analysis is rebuilt
+        from those aggregates, so the cost is O(new questions), not
+        O(history). Resending a mock with the same mock_test_id does not
+        count it twice. Each new mock is also added to the student's
+        performance history.
+        """
+        from services import analysis_state, performance_history
+        
+        # Load only the new questions
+        self.load_data(mock_test_data, student_name, ocr_text)
+        
+        topic_deltas = analysis_state.apply_mock(student_id, self.exam_type, self.mock_test_id, self.questions)
+        if topic_deltas is not None:
+            performance_history.record_attempt(student_id, self.exam_type, [
+                {"name": t['topic'], "subject": t['subject'], "attempted": t['total'], "correct": t['correct']}
+                for t in topic_deltas.values()
+            ], mock_test_id=self.mock_test_id)
+        self.topic_analysis, total_q, correct_q = analysis_state.load_topic_analysis(
+            student_id, self.exam_type
+        )
+        
+        return self._build_report(total_q, correct_q, formatted)
+
+    def _build_report(self, total_q: int, correct_q: int, formatted: bool = True) -> Dict[str, Any]:
+        """Build the report from the current topic analysis and totals"""
         # Get weak topics
         weak_topics = self.identify_weak_topics(max_topics=10)
         
@@ -522,9 +523,6 @@ class StudyAgent:
         # Generate plan
         plan = self.generate_7day_plan(weak_topics, resources)
         
-        # Calculate stats
-        total_q = len(self.questions)
-        correct_q = sum(1 for q in self.questions if q.is_correct)
         accuracy = round(correct_q / total_q * 100, 1) if total_q > 0 else 0
         
         # Build report
@@ -539,64 +537,43 @@ class StudyAgent:
                 "accuracy_percentage": accuracy,
                 "weak_topic_count": len(weak_topics)
             },
-            "weak_topics": self._format_weak(weak_topics),
-            "recommended_resources": self._format_resources(resources),
-            "revision_plan_7_days": self._format_plan(plan),
-            "human_readable": self._generate_summary(weak_topics, plan, accuracy)
+            "weak_topics": weak_topics,
+            "recommended_resources": resources,
+            "revision_plan_7_days": plan,
+            "human_readable": self._generate_summary(weak_topics, plan, accuracy, total_q)
         }
+        if formatted:
+            report["weak_topics"] = self._format_weak(weak_topics)
+            report["recommended_resources"] = self._format_resources(resources)
+            report["revision_plan_7_days"] = self._format_plan(plan)
         
         return report
 
     def _format_weak(self, topics: List[TopicAnalysis]) -> List[Dict]:
         """Format weak topics for JSON"""
-        return [{
-            "topic": t.topic_name,
-            "subject": t.subject,
-            "accuracy": round(t.accuracy_percentage, 1),
-            "strength": t.strength_level.value,
-            "questions_count": t.total_questions,
-            "error_patterns": [p.value for p in t.error_patterns]
-        } for t in topics]
+        return [topic_to_json(t) for t in topics]
 
     def _format_resources(self, resources: Dict[str, List[StudyResource]]) -> Dict:
         """Format resources for JSON"""
-        formatted = {}
-        for topic, res_list in resources.items():
-            formatted[topic] = [{
-                "topic": r.topic,
-                "title": r.title,
-                "source": r.source,
-                "type": r.resource_type,
-                "time": r.estimated_time,
-                "link": r.url
-            } for r in res_list]
-        return formatted
-
-    def _format_plan(self, plan: List[DayPlan]) -> List[Dict]:
+        return {topic: [resource_to_json(r) for r in res_list] for topic, res_list in resources.items()}
+
+    def _format_plan(self, plan: Tuple[DayPlan, ...]) -> List[Dict]:
         """Format plan for JSON"""
-        return [{
-            "day": p.day,
-            "title": p.title,
-            "focus_subject": p.focus_subject,
-            "topics": p.topics,
-            "activities": p.activities,
-            "total_hours": p.total_hours,
-            "mcq_practice": p.mcq_practice,
-            "expected_outcome": p.expected_outcome
-        } for p in plan]
+        return [day_to_json(p) for p in plan]
 
     def _generate_summary(
         self,
         weak_topics: List[TopicAnalysis],
-        plan: List[DayPlan],
-        accuracy: float
+        plan: Tuple[DayPlan, ...],
+        accuracy: float,
+        total_questions: int
     ) -> str:
         """Generate student-friendly summary"""
         lines = [
             "📊 ANALYSIS SUMMARY",
             f"Hi {self.student_name}! Based on your {self.exam_type} mock test:",
             "",
-            f"🎯 You scored {accuracy}% accuracy across {len(self.questions)} questions.",
+            f"🎯 You scored {accuracy}% accuracy across {total_questions} questions.",
             "",
             "⚠️ AREAS NEEDING IMPROVEMENT:"
         ]
@@ -633,7 +610,8 @@ class StudyAgent:
 def analyze_and_plan(
     mock_test_data: Dict[str, Any],
     student_name: str = "Student",
-    ocr_text: Optional[str] = None
+    ocr_text: Optional[str] = None,
+    formatted: bool = True
 ) -> Dict[str, Any]:
     """
     Main entry point for the AI Study Agent.
@@ -641,4 +619,28 @@ def analyze_and_plan(
     Handles missing OCR gracefully - continues with structured data.
     """
     agent = StudyAgent(exam_type=mock_test_data.get('exam_type', 'JEE Mains'))
-    return agent.generate_report(mock_test_data, student_name, ocr_text)
+    return agent.generate_report(mock_test_data, student_name, ocr_text, formatted)
+
+
+def questions_from_topics(topics: List[Any]) -> List[Dict[str, Any]]:
+    """
+    Convert per-topic totals (name, subject, attempted, correct) into the
+    question format expected by StudyAgent - one synthetic question per topic.
+    """
+    questions_data = []
+    for topic in topics:
+        # Generate questions from topic data
+        if topic.attempted > 0:
+            is_correct = topic.correct > (topic.attempted / 2)
+            questions_data.append({
+                "question_id": f"Q_{topic.name}",
+                "topic": topic.name,
+                "subtopic": "General",
+                "subject": topic.subject,
+                "correct_answer": "A",
+                "student_answer": "B" if not is_correct else "A",
+                "is_correct": is_correct,
+                "time_spent_seconds": topic.attempted * 60,
+                "difficulty": "medium"
+            })
+    return questions_data
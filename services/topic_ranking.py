@@ -0,0 +1,98 @@
+"""
+Streaming top-k ranking of weak topics.
+
+Priorities are pushed through a bounded heap of size k, so ranking n
+topics takes O(n log k) time and O(k) memory, and the input can be any
+iterator: one student's TopicAnalysis map, or topic aggregates streamed
+straight from SQLite for a whole classroom without building a
+TopicAnalysis per row.
+"""
+
+import heapq
+from typing import Any, Dict, Generic, Iterable, List, Optional, Tuple, TypeVar
+
+from services import analysis_state
+from services.study_agent import WEAK_ACCURACY, WEAK_LEVELS
+from services.weightage import weightage_index
+
+T = TypeVar("T")
+
+
+def topic_priority(accuracy: float, weightage: float) -> float:
+    """Revision priority: how much is missed, scaled by exam weightage."""
+    return (100 - accuracy) * (weightage / 100)
+
+
+class TopK(Generic[T]):
+    """
+    The k highest-priority items pushed so far. Among equal priorities the
+    earlier item ranks higher, matching a stable descending sort.
+    """
+
+    def __init__(self, k: int):
+        self.k = k
+        self._heap: List[Tuple[float, int, T]] = []
+        self._count = 0
+
+    def push(self, priority: float, item: T) -> None:
+        self._count += 1
+        heap = self._heap
+        if len(heap) < self.k:
+            heapq.heappush(heap, (priority, -self._count, item))
+        elif heap and priority > heap[0][0]:
+            heapq.heapreplace(heap, (priority, -self._count, item))
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def ranked(self) -> List[Tuple[float, T]]:
+        """(priority, item) pairs, highest priority first."""
+        return [(priority, item) for priority, _, item in sorted(self._heap, reverse=True)]
+
+
+def rank_weak_topics(analyses: Iterable[Any], exam_type: str, k: int) -> List[Tuple[float, Any]]:
+    """
+    Top-k weak topics from TopicAnalysis objects, as (priority, analysis)
+    pairs.
+    """
+    top = TopK(k)
+    weightage = weightage_index.weightage
+    for analysis in analyses:
+        if analysis.strength_level in WEAK_LEVELS:
+            priority = topic_priority(
+                analysis.accuracy_percentage, weightage(exam_type, analysis.subject, analysis.topic_name)
+            )
+            top.push(priority, analysis)
+    return top.ranked()
+
+
+def classroom_weak_topics(
+    exam_type: str,
+    k: int = 20,
+    student_ids: Optional[List[str]] = None,
+    per_student: bool = False
+) -> List[Dict[str, Any]]:
+    """
+    Weakest topics across many students from the stored incremental
+    analysis aggregates (services/analysis_state.py).
+
+    By default each topic's results are pooled over the students first;
+    per_student=True ranks individual (student, topic) pairs instead.
+    Rows are streamed from the cursor, so memory stays O(k) however many
+    students are ranked. student_ids limits the ranking to those students.
+    """
+    top: TopK[Any] = TopK(k)
+    weightage = weightage_index.weightage
+    for row in analysis_state.iter_topic_aggregates(exam_type, student_ids, per_student):
+        accuracy = row["correct"] / row["total"] * 100
+        if accuracy <= WEAK_ACCURACY:
+            top.push(topic_priority(accuracy, weightage(exam_type, row["subject"], row["topic"])), row)
+
+    ranked = []
+    for priority, row in top.ranked():
+        entry = dict(row)
+        entry["accuracy"] = round(row["correct"] / row["total"] * 100, 1)
+        entry["weightage"] = weightage(exam_type, row["subject"], row["topic"])
+        entry["priority"] = round(priority, 2)
+        ranked.append(entry)
+    return ranked
@@ -0,0 +1,143 @@
+"""
+Exam weightage index.
+
+The per-exam subject/topic weightage tables are loaded from a JSON data
+file (settings.EXAM_WEIGHTAGE_FILE), so a new exam only needs a data
+change. At load time they are flattened into one index: every topic gets
+an integer id, names are matched case-insensitively ("&" and "and" are
+the same), and topic aliases map sub-topics or alternative names to the
+exam's parent topic ("Integration" -> "Calculus", "Current Electricity"
+-> "Electrodynamics"). Resolved lookups are memoized.
+"""
+
+import json
+import logging
+import re
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+# Resolved (exam, subject, topic) lookups kept per index
+LOOKUP_CACHE_SIZE = 8192
+
+
+def normalize_name(name: str) -> str:
+    """Case-, punctuation- and whitespace-insensitive key for a name."""
+    name = (name or "").lower().replace("&", " and ")
+    return " ".join(re.sub(r"[^a-z0-9]+", " ", name).split())
+
+
+class WeightageIndex:
+    """
+    Flat, alias-aware topic weightage lookup for every exam.
+    """
+
+    def __init__(
+        self,
+        exams: Dict[str, Dict[str, Dict[str, float]]],
+        topic_aliases: Optional[Dict[str, List[str]]] = None,
+        exam_aliases: Optional[Dict[str, str]] = None,
+        subject_aliases: Optional[Dict[str, str]] = None,
+        default_weightage: float = 10
+    ):
+        self.tables = exams
+        self._exam_tables = list(exams.values())
+        self.default_weightage = default_weightage
+        # Per topic id: (exam, subject, topic) and weightage
+        self.topics: List[Tuple[str, str, str]] = []
+        self.weights: List[float] = []
+
+        self._exam_ids: Dict[str, int] = {}
+        # (exam id, subject key, topic key) -> topic id, for direct hits
+        self._topic_ids: Dict[Tuple[int, str, str], int] = {}
+        # (exam id, topic key) -> topic ids in every subject, for fallbacks
+        self._topics_by_name: Dict[Tuple[int, str], List[int]] = {}
+        # alias key -> parent topic keys, in data-file order
+        self._aliases: Dict[str, List[str]] = {}
+        self._subject_aliases = {
+            normalize_name(alias): normalize_name(subject)
+            for alias, subject in (subject_aliases or {}).items()
+        }
+
+        for exam_id, (exam, table) in enumerate(exams.items()):
+            self._exam_ids[normalize_name(exam)] = exam_id
+            for subject, topics in table.items():
+                subject_key = self._subject_key(subject)
+                for topic, weight in topics.items():
+                    topic_key = normalize_name(topic)
+                    self._topic_ids[(exam_id, subject_key, topic_key)] = len(self.topics)
+                    self._topics_by_name.setdefault((exam_id, topic_key), []).append(len(self.topics))
+                    self.topics.append((exam, subject, topic))
+                    self.weights.append(weight)
+        for alias, exam in (exam_aliases or {}).items():
+            if normalize_name(exam) not in self._exam_ids:
+                raise ValueError(f"Exam alias {alias!r} points to unknown exam {exam!r}")
+            self._exam_ids[normalize_name(alias)] = self._exam_ids[normalize_name(exam)]
+        for parent, aliases in (topic_aliases or {}).items():
+            for alias in aliases:
+                self._aliases.setdefault(normalize_name(alias), []).append(normalize_name(parent))
+
+        self.topic_id = lru_cache(maxsize=LOOKUP_CACHE_SIZE)(self._resolve)
+
+    @classmethod
+    def from_file(cls, path: str) -> "WeightageIndex":
+        """Build the index from a JSON weightage file."""
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        index = cls(
+            data["exams"],
+            topic_aliases=data.get("topic_aliases"),
+            exam_aliases=data.get("exam_aliases"),
+            subject_aliases=data.get("subject_aliases"),
+            default_weightage=data.get("default_weightage", 10)
+        )
+        logger.info(f"Loaded weightage for {len(data['exams'])} exams ({len(index.topics)} topics) from {path}")
+        return index
+
+    def _subject_key(self, subject: str) -> str:
+        key = normalize_name(subject)
+        return self._subject_aliases.get(key, key)
+
+    def exam_id(self, exam_type: str) -> Optional[int]:
+        return self._exam_ids.get(normalize_name(exam_type))
+
+    def table(self, exam_type: str) -> Optional[Dict[str, Dict[str, float]]]:
+        """The exam's subject -> topic -> weightage table, or None."""
+        exam_id = self.exam_id(exam_type)
+        if exam_id is None:
+            return None
+        return self._exam_tables[exam_id]
+
+    def _resolve(self, exam_type: str, subject: str, topic: str) -> Optional[int]:
+        """Topic id for a name or alias, or None."""
+        exam_id = self.exam_id(exam_type)
+        if exam_id is None:
+            return None
+        key = normalize_name(topic)
+        subject_key = self._subject_key(subject)
+        topic_id = self._topic_ids.get((exam_id, subject_key, key))
+        if topic_id is not None:
+            return topic_id
+
+        # The name in another subject, or an alias, which may name parents in
+        # several subjects or exams; prefer a parent in the question's subject
+        candidates = [
+            candidate
+            for name in (key, *self._aliases.get(key, ()))
+            for candidate in self._topics_by_name.get((exam_id, name), ())
+        ]
+        for candidate in candidates:
+            if self._subject_key(self.topics[candidate][1]) == subject_key:
+                return candidate
+        return candidates[0] if candidates else None
+
+    def weightage(self, exam_type: str, subject: str, topic: str) -> float:
+        """Weightage of a topic (or its parent topic), else the default."""
+        topic_id = self.topic_id(exam_type, subject, topic)
+        return self.default_weightage if topic_id is None else self.weights[topic_id]
+
+
+weightage_index = WeightageIndex.from_file(settings.EXAM_WEIGHTAGE_FILE)
@@ -7,7 +7,7 @@ import PlanSection from './components/PlanSection';
 import ProgressSection from './components/ProgressSection';
 import ChatSection from './components/ChatSection';
 import Loader from './components/Loader';
-import { api, Topic } from './services/api';
+import { api, PlanStreamError, Topic } from './services/api';
 import { STUDENTS } from './data/students';
 
 import './styles/globals.css';
@@ -20,6 +20,7 @@ const App: React.FC = () => {
   const [activeStudentId, setActiveStudentId] = useState<string>('rahul');
   const [analysisData, setAnalysisData] = useState<{ weak: Topic[]; strong: Topic[]; score: number } | null>(null);
   const [planData, setPlanData] = useState<any[] | null>(null);
+  const [planError, setPlanError] = useState<string | null>(null);
   const [loading, setLoading] = useState<{ show: boolean; text: string; sub: string }>({
     show: false,
     text: '',
@@ -160,7 +161,12 @@ const App: React.FC = () => {
 
     try {
       // Call backend API
-      const result = await api.analyze({ topics: allTopics, exam: student.exam });
+      const result = await api.analyze({
+        topics: allTopics,
+        exam: student.exam,
+        student_id: selectedStudentId,
+        mock_test_id: student.mock
+      });
       
       setTimeout(() => {
         setLoading({ show: false, text: '', sub: '' });
@@ -210,18 +216,34 @@ const App: React.FC = () => {
     }
     
     setLoading({ show: true, text: 'Generating Your 7-Day Plan...', sub: 'AI is personalizing your revision schedule' });
+    setPlanError(null);
     
     try {
-      // Call backend API
-      const result = await api.generatePlan({ topics, exam });
-      
-      setTimeout(() => {
+      // Stream the plan; show it as soon as the first day arrives
+      let first = true;
+      await api.generatePlanStream({ topics, exam }, (day) => {
+        if (first) {
+          first = false;
+          setLoading({ show: false, text: '', sub: '' });
+          setPlanData([day]);
+          setActiveTab('plan');
+        } else {
+          setPlanData((days) => [...(days || []), day]);
+        }
+      });
+      if (first) {
         setLoading({ show: false, text: '', sub: '' });
-        setPlanData(result.plan);
         setActiveTab('plan');
-      }, 1800);
+      }
     } catch (error) {
       console.error('Plan generation failed:', error);
+      if (error instanceof PlanStreamError) {
+        // Days already shown stay on screen; say the plan is incomplete
+        setPlanError(`${error.message}: only ${error.plan.length} of 7 days were generated. Please try again.`);
+        setLoading({ show: false, text: '', sub: '' });
+        setActiveTab('plan');
+        return;
+      }
       setTimeout(() => {
         setLoading({ show: false, text: '', sub: '' });
         setActiveTab('plan');
@@ -258,6 +280,7 @@ const App: React.FC = () => {
         <PlanSection 
           studentId={activeStudentId}
           planData={planData}
+          planError={planError}
           onTrackProgress={() => setActiveTab('progress')} 
           onAskAI={() => setActiveTab('chat')} 
         />
@@ -1,7 +1,7 @@
 import React, { useState, useRef, useEffect } from 'react';
 import { STUDENTS } from '../data/students';
 import { AI_RESPONSES } from '../data/aiResponses';
-import { api } from '../services/api';
+import { api, ChatStreamError } from '../services/api';
 
 interface Message {
   id: string;
@@ -55,12 +55,28 @@ const ChatSection: React.FC<ChatSectionProps> = ({ studentId }) => {
     setInput('');
     setIsTyping(true);
 
+    const aiId = (Date.now() + 1).toString();
+    let started = false;
+
     try {
-      const result = await api.chat(text);
-      const aiMsg: Message = { id: (Date.now() + 1).toString(), role: 'ai', text: result.reply };
-      setMessages(prev => [...prev, aiMsg]);
+      await api.chatStream(text, (delta) => {
+        if (!started) {
+          // First token arrived - replace the typing indicator with the reply
+          started = true;
+          setIsTyping(false);
+          setMessages(prev => [...prev, { id: aiId, role: 'ai', text: delta }]);
+        } else {
+          setMessages(prev => prev.map(m => m.id === aiId ? { ...m, text: m.text + delta } : m));
+        }
+      });
     } catch (error) {
       console.error('Chat failed:', error);
+      if (error instanceof ChatStreamError && started) {
+        // Keep the partial reply but say it was cut off
+        const notice = `\n\n⚠️ ${error.message} - this answer is incomplete. Please ask again.`;
+        setMessages(prev => prev.map(m => m.id === aiId ? { ...m, text: m.text + notice } : m));
+        return;
+      }
       const errorMsg: Message = { id: (Date.now() + 1).toString(), role: 'ai', text: 'Sorry, I couldn\'t process your message. Please try again.' };
       setMessages(prev => [...prev, errorMsg]);
     } finally {
@@ -6,11 +6,12 @@ import { PlanDay } from '../services/api';
 interface PlanSectionProps {
   studentId: string;
   planData: PlanDay[] | null;
+  planError?: string | null;
   onTrackProgress: () => void;
   onAskAI: () => void;
 }
 
-const PlanSection: React.FC<PlanSectionProps> = ({ studentId, planData, onTrackProgress, onAskAI }) => {
+const PlanSection: React.FC<PlanSectionProps> = ({ studentId, planData, planError, onTrackProgress, onAskAI }) => {
   // Handle uploaded student case
   const isUploaded = studentId === 'uploaded';
   const s = isUploaded ? null : STUDENTS[studentId as keyof typeof STUDENTS];
@@ -49,6 +50,13 @@ const PlanSection: React.FC<PlanSectionProps> = ({ studentId, planData, onTrackP
         </div>
       </div>
 
+      {planError && (
+        <div className="plan-error" role="alert">
+          <div className="big-emoji">⚠️</div>
+          <p>{planError}</p>
+        </div>
+      )}
+
       <div className="days-grid">
         {finalPlan.map((d, i) => (
           <div key={i} className="day-card" style={{ background: d.light }}>
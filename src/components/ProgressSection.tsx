@@ -1,5 +1,6 @@
-import React, { useEffect, useState } from 'react';
+import React, { useEffect, useMemo, useState } from 'react';
 import { STUDENTS } from '../data/students';
+import { api, StudentHistory } from '../services/api';
 
 interface ProgressSectionProps {
   studentId: string;
@@ -31,7 +32,7 @@ const TrendChart: React.FC<{ data: number[] }> = ({ data }) => {
   const points = data.map((v, i) => [pad.left + i * xStep, pad.top + yScale(v)]);
   const pathD = points.map((p, i) => (i === 0 ? `M ${p[0]} ${p[1]}` : `L ${p[0]} ${p[1]}`)).join(' ');
   const areaD = pathD + ` L ${points[points.length - 1][0]} ${pad.top + cH} L ${points[0][0]} ${pad.top + cH} Z`;
-  const labels = ['Test 1', 'Test 2', 'Test 3', 'Test 4', 'Test 5'];
+  const labels = data.map((_, i) => `Test ${i + 1}`);
 
   return (
     <svg width="100%" height={H} viewBox={`0 0 ${w} ${H}`}>
@@ -64,6 +65,12 @@ const TrendChart: React.FC<{ data: number[] }> = ({ data }) => {
   );
 };
 
+// Colors for subjects in the strength bars
+const SUBJECT_COLORS = ["#6c47ff", "#ff6b35", "#00c896", "#ffb830"];
+
+// Mocks shown in the trend chart
+const TREND_POINTS = 5;
+
 // Default data for uploaded students
 const defaultUploadedData = {
   score: 65,
@@ -82,9 +89,35 @@ const defaultUploadedData = {
 const ProgressSection: React.FC<ProgressSectionProps> = ({ studentId, onStudentChange }) => {
   // Handle uploaded student case
   const isUploaded = studentId === 'uploaded';
-  const s = isUploaded ? defaultUploadedData : STUDENTS[studentId as keyof typeof STUDENTS];
+  const base = isUploaded ? defaultUploadedData : STUDENTS[studentId as keyof typeof STUDENTS];
+  const exam = isUploaded ? 'JEE Mains' : STUDENTS[studentId as keyof typeof STUDENTS].exam;
   
   const [barWidths, setBarWidths] = useState<string[]>([]);
+  const [history, setHistory] = useState<StudentHistory | null>(null);
+
+  // Stored results replace the sample trend once the student has at least two attempts
+  useEffect(() => {
+    let cancelled = false;
+    setHistory(null);
+    if (isUploaded) return;
+    api.history(studentId, exam)
+      .then(result => { if (!cancelled) setHistory(result); })
+      .catch(error => console.error('History fetch failed:', error));
+    return () => { cancelled = true; };
+  }, [studentId, exam, isUploaded]);
+
+  const s = useMemo(() => history && history.trend.length >= 2
+    ? {
+        ...base,
+        score: history.trend[history.trend.length - 1].score,
+        trend: history.trend.slice(-TREND_POINTS).map(point => point.score),
+        subjects: history.subjects.map((sub, i) => ({
+          name: sub.name,
+          pct: sub.pct,
+          color: base.subjects.find(b => b.name === sub.name)?.color || SUBJECT_COLORS[i % SUBJECT_COLORS.length]
+        }))
+      }
+    : base, [base, history]);
 
   useEffect(() => {
     const timer = setTimeout(() => {
@@ -133,7 +166,7 @@ const ProgressSection: React.FC<ProgressSectionProps> = ({ studentId, onStudentC
 
       <div className="progress-grid">
         <div className="card">
-          <div className="card-title">Score Trend (Last 5 Mocks)</div>
+          <div className="card-title">Score Trend (Last {s.trend.length} Mocks)</div>
           <div className="chart-container" id="trendChartContainer">
             <TrendChart data={s.trend} />
           </div>
@@ -28,6 +28,33 @@ export interface PlanDay {
 export interface AnalyzeRequest {
   topics: Topic[];
   exam: string;
+  student_id?: string;
+  mock_test_id?: string;
+}
+
+export interface HistoryPoint {
+  taken_at: number;
+  mock_test_id?: string;
+  attempted: number;
+  correct: number;
+  score: number;
+}
+
+export interface SubjectScore {
+  name: string;
+  attempted: number;
+  correct: number;
+  pct: number;
+}
+
+export interface StudentHistory {
+  student_id: string;
+  exam: string;
+  trend: HistoryPoint[];
+  subjects: SubjectScore[];
+  topic?: string;
+  subject?: string;
+  topic_trend?: HistoryPoint[];
 }
 
 export interface ChatRequest {
@@ -50,6 +77,34 @@ export interface OCRResult {
   message: string;
 }
 
+/**
+ * Raised by generatePlanStream when the server reports an error after
+ * some days were sent; plan holds the days received before it
+ */
+export class PlanStreamError extends Error {
+  plan: PlanDay[];
+
+  constructor(message: string, plan: PlanDay[]) {
+    super(message);
+    this.name = 'PlanStreamError';
+    this.plan = plan;
+  }
+}
+
+/**
+ * Raised by chatStream when the server reports an error after some of
+ * the reply was sent; reply holds the text received before it
+ */
+export class ChatStreamError extends Error {
+  reply: string;
+
+  constructor(message: string, reply: string) {
+    super(message);
+    this.name = 'ChatStreamError';
+    this.reply = reply;
+  }
+}
+
 /**
  * Helper function to log requests for debugging
  */
@@ -84,6 +139,10 @@ export const api = {
    *   ],
    *   "exam": "JEE Mains"
    * }
+   * 
+   * With student_id and mock_test_id the attempt is stored in the
+   * student's history once; re-analyzing the same mock does not add a
+   * second trend point.
    */
   async analyze(data: AnalyzeRequest): Promise<AnalysisResult> {
     logRequest('/analyze', data);
@@ -124,6 +183,66 @@ export const api = {
     return handleResponse(response, '/plan');
   },
 
+  /**
+   * Streaming plan - forwards plan days as the AI produces them
+   * 
+   * Reads the Server-Sent Events stream from /plan/stream and calls
+   * onDay for every validated day. Resolves with the full plan, or
+   * rejects with PlanStreamError if the server sends an error event
+   * (the plan was cut short).
+   */
+  async generatePlanStream(data: AnalyzeRequest, onDay: (day: PlanDay) => void): Promise<PlanDay[]> {
+    logRequest('/plan/stream', data);
+    
+    const response = await fetch(`${API_BASE}/plan/stream`, {
+      method: 'POST',
+      headers: { 
+        'Content-Type': 'application/json',
+        'Accept': 'text/event-stream'
+      },
+      body: JSON.stringify(data),
+    });
+    
+    if (!response.ok || !response.body) {
+      const errorText = await response.text();
+      console.error(`[API] /plan/stream error:`, errorText);
+      throw new Error(`HTTP ${response.status}: ${errorText}`);
+    }
+    
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+    const plan: PlanDay[] = [];
+    
+    while (true) {
+      const { done, value } = await reader.read();
+      if (done) break;
+      buffer += decoder.decode(value, { stream: true });
+      
+      // SSE events are separated by a blank line
+      let boundary = buffer.indexOf('\n\n');
+      while (boundary !== -1) {
+        const event = buffer.slice(0, boundary);
+        buffer = buffer.slice(boundary + 2);
+        boundary = buffer.indexOf('\n\n');
+        
+        if (!event.startsWith('data: ')) continue;
+        const data = JSON.parse(event.slice(6));
+        if (data.error) {
+          console.error(`[API] /plan/stream error event:`, data.error);
+          await reader.cancel();
+          throw new PlanStreamError(data.error, plan);
+        }
+        if (data.day) {
+          plan.push(data.day);
+          onDay(data.day);
+        }
+      }
+    }
+    
+    return plan;
+  },
+
   /**
    * Chat with AI - sends message and gets AI response
    * 
@@ -148,6 +267,92 @@ export const api = {
     return handleResponse(response, '/chat');
   },
 
+  /**
+   * Streaming chat - forwards tokens as the AI produces them
+   * 
+   * Reads the Server-Sent Events stream from /chat/stream and calls
+   * onDelta for every chunk. Resolves with the full reply text, or
+   * rejects with ChatStreamError if the server sends an error event
+   * (the reply was cut short).
+   */
+  async chatStream(message: string, onDelta: (delta: string) => void): Promise<string> {
+    const payload = { message };
+    logRequest('/chat/stream', payload);
+    
+    const response = await fetch(`${API_BASE}/chat/stream`, {
+      method: 'POST',
+      headers: { 
+        'Content-Type': 'application/json',
+        'Accept': 'text/event-stream'
+      },
+      body: JSON.stringify(payload),
+    });
+    
+    if (!response.ok || !response.body) {
+      const errorText = await response.text();
+      console.error(`[API] /chat/stream error:`, errorText);
+      throw new Error(`HTTP ${response.status}: ${errorText}`);
+    }
+    
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+    let reply = '';
+    
+    while (true) {
+      const { done, value } = await reader.read();
+      if (done) break;
+      buffer += decoder.decode(value, { stream: true });
+      
+      // SSE events are separated by a blank line
+      let boundary = buffer.indexOf('\n\n');
+      while (boundary !== -1) {
+        const event = buffer.slice(0, boundary);
+        buffer = buffer.slice(boundary + 2);
+        boundary = buffer.indexOf('\n\n');
+        
+        if (!event.startsWith('data: ')) continue;
+        const data = JSON.parse(event.slice(6));
+        if (data.error) {
+          console.error(`[API] /chat/stream error event:`, data.error);
+          await reader.cancel();
+          throw new ChatStreamError(data.error, reply);
+        }
+        if (data.delta) {
+          reply += data.delta;
+          onDelta(data.delta);
+        }
+      }
+    }
+    
+    return reply;
+  },
+
+  /**
+   * Performance history - stored score trend and subject accuracy
+   * 
+   * Query params: exam, start / end (epoch seconds, optional),
+   * topic (optional, adds that topic's trend), subject (optional,
+   * limits the topic trend to one subject)
+   */
+  async history(
+    studentId: string,
+    exam: string,
+    options: { start?: number; end?: number; topic?: string; subject?: string } = {}
+  ): Promise<StudentHistory> {
+    const params = new URLSearchParams({ exam });
+    if (options.start !== undefined) params.append('start', String(options.start));
+    if (options.end !== undefined) params.append('end', String(options.end));
+    if (options.topic) params.append('topic', options.topic);
+    if (options.subject) params.append('subject', options.subject);
+    
+    const response = await fetch(`${API_BASE}/history/${encodeURIComponent(studentId)}?${params}`, {
+      headers: { 'Accept': 'application/json' },
+    });
+    
+    return handleResponse(response, '/history');
+  },
+
   /**
    * OCR - Upload OMR/answer sheet image to extract answers
    * 
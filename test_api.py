@@ -0,0 +1,71 @@
+"""
+API-level checks, run with pytest or directly:
+    python test_api.py
+Uses a throwaway database and no Gemini API key, so every Gemini call
+fails fast and the local fallbacks are exercised.
+"""
+
+import asyncio
+import os
+import tempfile
+
+os.environ["GEMINI_API_KEY"] = ""
+
+from config import settings
+
+settings.GEMINI_API_KEY = None
+settings.DB_NAME = os.path.join(tempfile.mkdtemp(), "test.db")
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+import main  # noqa: E402
+from services.analyzer import analyze_topics  # noqa: E402
+from services.plan_engine import plan_for  # noqa: E402
+
+# Optics is weak by score although correct > attempted / 2; Genetics has
+# too few attempts to count; Organic Chemistry is strong
+TOPICS = [
+    {"name": "Optics", "subject": "Physics", "attempted": 10, "correct": 6, "score": 40},
+    {"name": "Genetics", "subject": "Biology", "attempted": 2, "correct": 0},
+    {"name": "Algebra", "subject": "Mathematics", "attempted": 10, "correct": 2},
+    {"name": "Organic Chemistry", "subject": "Chemistry", "attempted": 10, "correct": 9},
+]
+
+
+def _plan_topics(plan):
+    """Topic names a PlanDay list focuses on ("Subject: A, B")."""
+    return {name for day in plan for name in day["focus"].split(": ", 1)[1].split(", ")}
+
+
+def test_engines_plan_for_the_same_weak_topics():
+    weak_topics = analyze_topics(TOPICS)["weak_topics"]
+    expected = {t["name"] for t in weak_topics}
+    assert expected == {"Optics", "Algebra"}
+
+    for engine in ("local", "hybrid", "gemini"):
+        plan, source = asyncio.run(plan_for(weak_topics, "NEET", engine))
+        assert source == "local", engine
+        assert _plan_topics(plan) == expected, (engine, _plan_topics(plan))
+
+
+def test_batch_rejects_non_object_students():
+    with TestClient(main.app) as client:
+        for body in ([1, 2], "students", None):
+            response = client.post("/api/ai-agent/analyze/batch", json=body)
+            assert response.status_code == 422, (body, response.status_code)
+        for body in (b"[1, 2]\n", b'{"student_id": "s1"}\n"s2"\n', b"42"):
+            response = client.post(
+                "/api/ai-agent/analyze/batch", content=body,
+                headers={"Content-Type": "application/x-ndjson"}
+            )
+            assert response.status_code == 422, (body, response.status_code)
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith("test_"):
+            print("=" * 60)
+            print(f"TEST: {name}")
+            print("=" * 60)
+            test()
+            print("passed")